@@ -0,0 +1,218 @@
+"""asyncio front-end for audit_session.py.
+
+``AsyncAuditor`` runs AuditSession operations on a bounded thread pool, so an
+event loop can await audits and milestone commands on many repositories
+without starting a process per check:
+
+    import asyncio
+    import sys
+    sys.path.insert(0, ".bmad/scripts")
+    from audit_async import AsyncAuditor
+
+    async def main():
+        async with AsyncAuditor(max_concurrency=4) as auditor:
+            audits = await auditor.audit_many(["/repos/a", "/repos/b"])
+            verify = await auditor.verify("/repos/a", "M1")
+
+    asyncio.run(main())
+
+At most ``max_concurrency`` operations run at a time; further calls wait on a
+semaphore without holding a worker thread. Each operation hashes on its own
+``jobs`` threads (default: the CPU count shared out over ``max_concurrency``).
+Hashing and file reads release the GIL, so concurrent operations overlap.
+
+The auditor keeps one AuditSession per repository, so repeated calls reuse its
+caches; they are saved by ``save()`` and on leaving the ``async with`` block.
+A session runs one call at a time, so operations on the same repository
+(including ``audit_states``) are queued in the event loop and run in turn,
+while different repositories run concurrently. The semaphore and queues
+belong to the running event loop, and ``aclose()`` only stops the thread pool
+until the next call starts a new one, so an auditor may be used from
+successive ``asyncio.run()`` calls, each closing it with ``async with``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar, Union
+
+import milestone_lock
+from audit_session import (
+    AuditResult,
+    AuditSession,
+    CreateResult,
+    StatusResult,
+    UseResult,
+    VerifyMatrix,
+    VerifyResult,
+)
+from file_digest import default_jobs
+
+T = TypeVar("T")
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class AsyncAuditor:
+    """Awaitable audits and milestone operations over any number of repositories."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        workflow: str = milestone_lock.DEFAULT_WORKFLOW,
+        jobs: Optional[int] = None,
+        use_disk_caches: bool = True,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.workflow = workflow
+        self.jobs = jobs or max(1, default_jobs() // max_concurrency)
+        self._use_disk_caches = use_disk_caches
+        # Created on first use, and again after aclose().
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._sessions: Dict[Path, AuditSession] = {}
+        # asyncio primitives bind to the loop that first uses them: one set per
+        # loop, created on first use inside it.
+        self._loops: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, _LoopState
+        ] = weakref.WeakKeyDictionary()
+
+    async def __aenter__(self) -> "AsyncAuditor":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        await self.aclose()
+
+    def session(self, repo_root: Union[str, Path]) -> AuditSession:
+        """The auditor's session for ``repo_root``, created on first use."""
+        root = Path(repo_root).resolve()
+        session = self._sessions.get(root)
+        if session is None:
+            session = self._sessions[root] = AuditSession(
+                root,
+                workflow=self.workflow,
+                jobs=self.jobs,
+                use_disk_caches=self._use_disk_caches,
+            )
+        return session
+
+    async def _call(
+        self, session: AuditSession, fn: Callable[..., T], *args: Any, **kwargs: Any
+    ) -> T:
+        """Run ``fn`` on the pool once ``session`` is free and a slot is open;
+        waiting for the session holds neither a thread nor a slot."""
+        loop = asyncio.get_running_loop()
+        state = self._loops.get(loop)
+        if state is None:
+            state = self._loops[loop] = _LoopState(self.max_concurrency)
+        lock = state.sessions.setdefault(session.repo_root, asyncio.Lock())
+        async with lock, state.semaphore:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="bmad-async"
+                )
+            return await loop.run_in_executor(
+                self._executor, functools.partial(fn, *args, **kwargs)
+            )
+
+    async def audit(self, repo_root: Union[str, Path], **options: Any) -> AuditResult:
+        """AuditSession.audit() with the same keyword options."""
+        session = self.session(repo_root)
+        return await self._call(session, session.audit, **options)
+
+    async def verify(
+        self,
+        repo_root: Union[str, Path],
+        milestone_id: Optional[str] = None,
+        **options: Any,
+    ) -> VerifyResult:
+        """AuditSession.verify(); raises ValueError when the milestone cannot
+        be resolved."""
+        session = self.session(repo_root)
+        return await self._call(session, session.verify, milestone_id, **options)
+
+    async def verify_all(
+        self, repo_root: Union[str, Path], **options: Any
+    ) -> VerifyMatrix:
+        """AuditSession.verify_all(): every milestone of the repository."""
+        session = self.session(repo_root)
+        return await self._call(session, session.verify_all, **options)
+
+    async def status(self, repo_root: Union[str, Path]) -> StatusResult:
+        session = self.session(repo_root)
+        return await self._call(session, session.status)
+
+    async def use(
+        self,
+        repo_root: Union[str, Path],
+        milestone_id: Optional[str] = None,
+        **options: Any,
+    ) -> UseResult:
+        """AuditSession.use(); raises ValueError when the milestone cannot be
+        resolved."""
+        session = self.session(repo_root)
+        return await self._call(session, session.use, milestone_id, **options)
+
+    async def create(
+        self, repo_root: Union[str, Path], milestone_id: str, **options: Any
+    ) -> CreateResult:
+        """AuditSession.create(); a refused create is reported in
+        ``CreateResult.error``, not raised."""
+        session = self.session(repo_root)
+        return await self._call(session, session.create, milestone_id, **options)
+
+    async def audit_many(
+        self, repo_roots: Iterable[Union[str, Path]], **options: Any
+    ) -> List[AuditResult]:
+        """Audit several repositories concurrently; results in input order."""
+        return list(
+            await asyncio.gather(
+                *(self.audit(repo_root, **options) for repo_root in repo_roots)
+            )
+        )
+
+    async def audit_states(
+        self, repo_root: Union[str, Path], states: Iterable[str], **options: Any
+    ) -> List[AuditResult]:
+        """Audit one repository against several state files; results in input
+        order. Each result includes the workflow findings. The audits share
+        the repository's session, so they run one after another; pass a glob
+        or directory as ``state`` to audit() to check states in parallel."""
+        return list(
+            await asyncio.gather(
+                *(self.audit(repo_root, state=state, **options) for state in states)
+            )
+        )
+
+    async def save(self) -> None:
+        """Save the caches of every session."""
+        for session in list(self._sessions.values()):
+            await self._call(session, session.save)
+
+    async def aclose(self) -> None:
+        """Save the caches and shut the thread pool down; the next call
+        starts a new pool. Waiting for workers still running (e.g. of a
+        cancelled operation) happens off the event loop."""
+        try:
+            await self.save()
+        finally:
+            executor, self._executor = self._executor, None
+            if executor is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(executor.shutdown, wait=True)
+                )
+
+
+class _LoopState:
+    """An auditor's asyncio primitives for one event loop."""
+
+    def __init__(self, max_concurrency: int) -> None:
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # repo root -> lock serializing the calls on its session
+        self.sessions: Dict[Path, asyncio.Lock] = {}
@@ -0,0 +1,294 @@
+"""Importable API over audit_workflow.py and milestone_lock.py.
+
+``AuditSession(repo_root)`` runs audits and milestone commands in the calling
+process and returns structured results instead of printing. A session keeps
+its caches between calls: the digest cache, the parse cache (parsed workflows
+and locks), and the audit snapshot with its per-file stat fingerprints. Every
+cached entry is re-validated by stat fingerprint or content hash when used, so
+a long-lived session sees file changes on its next call.
+
+    import sys
+    sys.path.insert(0, ".bmad/scripts")
+    from audit_session import AuditSession
+
+    with AuditSession("/path/to/repo") as session:
+        audit = session.audit()
+        if not audit.passed:
+            for finding in audit.findings:
+                print(finding.severity, finding.code, finding.message)
+        verify = session.verify("M1")
+        print(verify.root_status, verify.drift)
+
+Nothing depends on the working directory. Caches are saved to .bmad/cache/ by
+``save()`` and on leaving the ``with`` block; ``use_disk_caches=False`` keeps
+them in memory only. A session runs one call at a time: calls from several
+threads wait for each other, since verify, use and create write reports,
+artifacts and locks. Sessions on different repositories run concurrently. Use
+one session per repository; audit_async.py wraps sessions for asyncio.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import audit_workflow
+import milestone_lock
+from audit_snapshot import AuditFs, AuditSnapshot
+from file_digest import DigestCache, default_jobs
+from parse_cache import ParsedCache, using_parsed_cache
+
+Finding = audit_workflow.Finding
+CreateResult = milestone_lock.CreateResult
+StatusResult = milestone_lock.StatusResult
+UseResult = milestone_lock.UseResult
+VerifyMatrix = milestone_lock.VerifyMatrix
+VerifyResult = milestone_lock.VerifyResult
+VERIFY_MODES = ("default", "quick", "paranoid")
+
+
+class AuditResult(NamedTuple):
+    """Findings of one audit: workflow findings first (state None), then one
+    group per state file."""
+
+    groups: List[Tuple[Optional[Path], List[Finding]]]
+
+    @property
+    def findings(self) -> List[Finding]:
+        return audit_workflow.flatten_groups(self.groups)
+
+    @property
+    def errors(self) -> int:
+        return audit_workflow.summarize(self.findings)[0]
+
+    @property
+    def warnings(self) -> int:
+        return audit_workflow.summarize(self.findings)[1]
+
+    @property
+    def passed(self) -> bool:
+        return self.errors == 0
+
+
+class AuditSession:
+    """Audits and milestone operations on one repository, with shared caches."""
+
+    def __init__(
+        self,
+        repo_root: Union[str, Path],
+        *,
+        workflow: str = milestone_lock.DEFAULT_WORKFLOW,
+        jobs: Optional[int] = None,
+        use_disk_caches: bool = True,
+    ) -> None:
+        self.repo_root = Path(repo_root).resolve()
+        self.workflow = workflow
+        self.jobs = jobs or default_jobs()
+        self.digests = DigestCache.for_repo(self.repo_root, enabled=use_disk_caches)
+        self.parsed = ParsedCache.for_repo(self.repo_root, enabled=use_disk_caches)
+        self._use_disk_caches = use_disk_caches
+        # audit salt (script versions + options) -> snapshot
+        self._snapshots: Dict[str, AuditSnapshot] = {}
+        self._lock = threading.RLock()
+
+    def __enter__(self) -> "AuditSession":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            self.digests.save()
+            self.parsed.save()
+            for snapshot in self._snapshots.values():
+                snapshot.save()
+
+    @contextlib.contextmanager
+    def _call(self, parsed: Optional[ParsedCache] = None) -> Iterator[None]:
+        """One call at a time per session, with its parse cache in scope."""
+        with self._lock, using_parsed_cache(parsed or self.parsed):
+            yield
+
+    def audit(
+        self,
+        *,
+        state: Optional[str] = None,
+        workflows: Optional[List[str]] = None,
+        quick: bool = False,
+        paranoid: bool = False,
+        max_errors: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ) -> AuditResult:
+        """audit_workflow.py with the same options; ``state`` may be a path, a
+        glob or a directory of state files, relative to the repository.
+        Raises ValueError for options the CLI would reject."""
+        if quick and paranoid:
+            raise ValueError("quick and paranoid cannot be combined")
+        if max_errors is not None and max_errors < 1:
+            raise ValueError("max_errors must be at least 1")
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("time_budget must be positive")
+        args = argparse.Namespace(
+            workflow=list(workflows) if workflows else None,
+            state=audit_workflow.DEFAULT_STATE_PATH if state is None else state,
+            template=audit_workflow.DEFAULT_TEMPLATE_PATH,
+            no_digest_cache=False,
+            jobs=self.jobs,
+            quick=quick,
+            paranoid=paranoid,
+            no_incremental=False,
+            watch=False,
+            debounce=audit_workflow.DEFAULT_DEBOUNCE,
+            poll=False,
+            repos=None,
+            repos_file=None,
+            processes=default_jobs(),
+            max_errors=max_errors,
+            time_budget=time_budget,
+            format="text",
+        )
+
+        with self._call(ParsedCache(None) if paranoid else None):
+            if paranoid:
+                digests = DigestCache(None)
+                snapshot = AuditSnapshot(None, "")
+            else:
+                digests = self.digests
+                snapshot = self._snapshot(audit_workflow.audit_snapshot_salt(args))
+            return AuditResult(
+                audit_workflow.run_audit(
+                    args,
+                    self.repo_root,
+                    fs=AuditFs(),
+                    snapshot=snapshot,
+                    digests=digests,
+                )
+            )
+
+    def _snapshot(self, salt: str) -> AuditSnapshot:
+        snapshot = self._snapshots.get(salt)
+        if snapshot is None:
+            snapshot = self._snapshots[salt] = AuditSnapshot.for_repo(
+                self.repo_root, salt, enabled=self._use_disk_caches
+            )
+        return snapshot
+
+    def verify(
+        self,
+        milestone_id: Optional[str] = None,
+        *,
+        mode: str = "default",
+        report: Optional[str] = milestone_lock.DEFAULT_VERIFY_REPORT,
+    ) -> VerifyResult:
+        """``milestone_lock.py verify``; ``milestone_id`` defaults to the active
+        milestone. Raises ValueError when the milestone cannot be resolved.
+        Writes the markdown report unless ``report`` is None."""
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"mode must be one of: {'|'.join(VERIFY_MODES)}")
+        with self._call():
+            result = milestone_lock.verify_milestone(
+                repo_root=self.repo_root,
+                workflow_path=self.workflow,
+                milestone_id=milestone_id,
+                digests=DigestCache(None) if mode == "paranoid" else self.digests,
+                jobs=self.jobs,
+                mode=mode,
+            )
+            if report is not None:
+                milestone_lock.write_verify_report(
+                    self.repo_root / report, result, self.repo_root
+                )
+        return result
+
+    def verify_all(
+        self,
+        *,
+        mode: str = "default",
+        report: Optional[str] = milestone_lock.DEFAULT_VERIFY_REPORT,
+    ) -> VerifyMatrix:
+        """``milestone_lock.py verify --all``: every milestone, each shared
+        file hashed once. Writes the matrix report unless ``report`` is None."""
+        if mode not in VERIFY_MODES:
+            raise ValueError(f"mode must be one of: {'|'.join(VERIFY_MODES)}")
+        with self._call():
+            matrix = milestone_lock.verify_milestones(
+                repo_root=self.repo_root,
+                workflow_path=self.workflow,
+                digests=DigestCache(None) if mode == "paranoid" else self.digests,
+                jobs=self.jobs,
+                mode=mode,
+            )
+            if report is not None:
+                milestone_lock.write_verify_matrix_report(
+                    self.repo_root / report, matrix, self.repo_root
+                )
+        return matrix
+
+    def status(self) -> StatusResult:
+        """``milestone_lock.py status``: configuration and active lock state."""
+        with self._call():
+            return milestone_lock.milestone_status(
+                repo_root=self.repo_root,
+                workflow_path=self.workflow,
+                digests=self.digests,
+                jobs=self.jobs,
+            )
+
+    def use(
+        self,
+        milestone_id: Optional[str] = None,
+        *,
+        force: bool = False,
+        report: Optional[str] = milestone_lock.DEFAULT_USE_REPORT,
+    ) -> UseResult:
+        """``milestone_lock.py use``: seed .bmad/artifacts from a milestone
+        (default: the active one). Raises ValueError when the milestone cannot
+        be resolved. Writes the markdown report unless ``report`` is None."""
+        with self._call():
+            result = milestone_lock.seed_milestone(
+                repo_root=self.repo_root,
+                workflow_path=self.workflow,
+                milestone_id=milestone_id,
+                digests=self.digests,
+                jobs=self.jobs,
+                force=force,
+                catalog=self._use_disk_caches,
+            )
+            if report is not None:
+                milestone_lock.write_use_report(
+                    self.repo_root / report, result, self.repo_root
+                )
+        return result
+
+    def create(
+        self,
+        milestone_id: str,
+        *,
+        force: bool = False,
+        allow_partial: bool = False,
+        set_active: bool = True,
+        algo: Optional[str] = None,
+        report: str = milestone_lock.DEFAULT_CREATE_REPORT,
+    ) -> CreateResult:
+        """``milestone_lock.py create`` from .bmad/artifacts; a refused create
+        is reported in ``CreateResult.error``, not raised."""
+        with self._call():
+            return milestone_lock.create_lock(
+                repo_root=self.repo_root,
+                workflow_path=self.workflow,
+                source_dir=self.repo_root / ".bmad/artifacts",
+                source_label="artifacts",
+                milestone_id=milestone_id,
+                force=force,
+                allow_partial=allow_partial,
+                set_active=set_active,
+                report_path=self.repo_root / report,
+                digests=self.digests,
+                jobs=self.jobs,
+                algo=algo,
+                catalog=self._use_disk_caches,
+            )
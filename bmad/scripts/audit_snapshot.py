@@ -0,0 +1,331 @@
+"""Incremental audit support for audit_workflow.py.
+
+An audit run is split into units: one per workflow definition, the state
+checks, each artifact's content markers and the milestone checks. Each unit
+runs against an ``AuditFs`` that records the stat fingerprint (size, mtime_ns,
+inode, ctime_ns, or "missing") of every path the unit looked at.
+``AuditSnapshot`` persists the unit's result together with those fingerprints
+(default: .bmad/cache/audit-snapshot.json). On the next run, a unit whose
+dependencies all still have the same fingerprint is replayed from the snapshot
+instead of executed, so the findings are identical to a cold run.
+
+Units run inside other units add their dependencies to the enclosing unit, so
+an outer unit is replayed only when nothing below it changed. Units that read a
+file modified within the racy window (see file_digest), or that skipped checks
+(AuditFs.mark_incomplete(), e.g. on a spent audit budget), are not persisted. The
+snapshot salt covers the audit scripts themselves and the options that change
+results, so upgrading the scripts invalidates every entry.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from file_digest import LRU_TOUCH_INTERVAL_NS, RACY_WINDOW_NS, resident, stat_key
+
+T = TypeVar("T")
+
+DEFAULT_SNAPSHOT_PATH = ".bmad/cache/audit-snapshot.json"
+SNAPSHOT_FORMAT = 1
+DEFAULT_MAX_UNITS = 512
+# Pseudo-dependency of units that skipped checks; see AuditFs.mark_incomplete().
+INCOMPLETE = "<incomplete>"
+
+# stat_key() of a path, or None when it does not exist.
+Fingerprint = Optional[List[int]]
+
+
+def snapshot_salt(sources: Iterable[Path], *options: str) -> str:
+    """Salt that changes whenever one of the ``sources`` or ``options`` does."""
+    parts: List[Any] = [SNAPSHOT_FORMAT, list(options)]
+    for source in sources:
+        try:
+            parts.append([str(source), stat_key(source.stat())])
+        except OSError:
+            parts.append([str(source), None])
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+class AuditFs:
+    """Filesystem snapshot for one audit run that records what each unit depends on.
+
+    Each directory is listed once with ``os.scandir`` when one of its entries is
+    first looked up: absent names are answered from the listing without a stat
+    call, present ones are stat'ed through their ``DirEntry`` (free on Windows,
+    one call elsewhere). Every path is stat'ed at most once per run, so a unit
+    and the replay check of the units around it always see the same fingerprint.
+
+    Units may run on several threads; each thread records into its own frames.
+    """
+
+    def __init__(self) -> None:
+        self._stats: Dict[str, Optional[os.stat_result]] = {}
+        self._listings: Dict[str, Optional[Dict[str, os.DirEntry]]] = {}
+        self._resolved: Dict[str, Path] = {}
+        self._local = threading.local()
+
+    @property
+    def _frames(self) -> List[Dict[str, Fingerprint]]:
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = []
+        return frames
+
+    def _listing(self, directory: str) -> Optional[Dict[str, os.DirEntry]]:
+        """Entries of ``directory`` by name; {} if it is missing, None if unlistable."""
+        try:
+            return self._listings[directory]
+        except KeyError:
+            pass
+        listing: Optional[Dict[str, os.DirEntry]]
+        try:
+            with os.scandir(directory) as it:
+                listing = {entry.name: entry for entry in it}
+        except (FileNotFoundError, NotADirectoryError):
+            listing = {}
+        except OSError:
+            listing = None  # e.g. search-only permission: stat paths directly
+        self._listings[directory] = listing
+        return listing
+
+    def _stat_uncached(self, key: str) -> Optional[os.stat_result]:
+        directory, name = os.path.split(key)
+        listing = self._listing(directory) if name else None
+        try:
+            if listing is None:
+                return os.stat(key)
+            entry = listing.get(name)
+            return None if entry is None else entry.stat(follow_symlinks=True)
+        except OSError:
+            return None
+
+    def stat(self, path: Path) -> Optional[os.stat_result]:
+        key = os.path.abspath(path)
+        try:
+            st = self._stats[key]
+        except KeyError:
+            st = self._stats[key] = self._stat_uncached(key)
+        if self._frames:
+            self._frames[-1][key] = None if st is None else stat_key(st)
+        return st
+
+    def resolve(self, path: Path) -> Path:
+        """``path.resolve()``, memoized (it lstat's every path component)."""
+        key = str(path)
+        resolved = self._resolved.get(key)
+        if resolved is None:
+            resolved = self._resolved[key] = path.resolve()
+        return resolved
+
+    def forget(self, keep: Callable[[str], bool]) -> None:
+        """Drop memoized stats, except those of paths for which ``keep`` is true.
+
+        Directory listings and resolved paths are always dropped.
+        """
+        self._stats = {path: st for path, st in self._stats.items() if keep(path)}
+        self._listings = {}
+        self._resolved = {}
+
+    def exists(self, path: Path) -> bool:
+        return self.stat(path) is not None
+
+    def fingerprint(self, path: str) -> Fingerprint:
+        st = self.stat(Path(path))
+        return None if st is None else stat_key(st)
+
+    def mark_incomplete(self) -> None:
+        """Flag the units being computed as having skipped checks: never stored."""
+        if self._frames:
+            self._frames[-1][INCOMPLETE] = None
+
+    def push(self) -> None:
+        self._frames.append({})
+
+    def pop(self) -> Dict[str, Fingerprint]:
+        deps = self._frames.pop()
+        if self._frames:
+            self._frames[-1].update(deps)
+        return deps
+
+
+def _is_racy(deps: Dict[str, Fingerprint], now_ns: int) -> bool:
+    return any(
+        fp is not None and now_ns - max(fp[1], fp[3]) < RACY_WINDOW_NS
+        for fp in deps.values()
+    )
+
+
+def _round_trips(value: Any) -> bool:
+    try:
+        return json.loads(json.dumps(value)) == value
+    except (TypeError, ValueError):
+        return False
+
+
+class AuditSnapshot:
+    """Persistent unit -> (dependencies, result) memo for the audit.
+
+    A snapshot constructed with ``path=None`` memoizes in memory only.
+    """
+
+    def __init__(
+        self, path: Optional[Path], salt: str, max_units: int = DEFAULT_MAX_UNITS
+    ) -> None:
+        self.path = path
+        self.salt = salt
+        self.max_units = max_units
+        self.hits = 0
+        self.misses = 0
+        self._units: Optional[Dict[str, Dict[str, Any]]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_repo(
+        cls, repo_root: Path, salt: str, enabled: bool = True
+    ) -> "AuditSnapshot":
+        if not enabled:
+            return cls(None, salt)
+        path = repo_root / DEFAULT_SNAPSHOT_PATH
+        return resident(("snapshot", str(path), salt), lambda: cls(path, salt))
+
+    def run(
+        self,
+        fs: AuditFs,
+        unit: str,
+        compute: Callable[[], T],
+        encode: Callable[[T], Any],
+        decode: Callable[[Any], T],
+    ) -> T:
+        """Return ``compute()``, replayed from the snapshot if its inputs are unchanged."""
+        entry = self._replayable(fs, unit)
+        if entry is not None:
+            return decode(entry["value"])
+
+        with self._lock:
+            self.misses += 1
+        fs.push()
+        try:
+            value = compute()
+        finally:
+            deps = fs.pop()
+        self._store(unit, deps, encode(value))
+        return value
+
+    def stream(
+        self,
+        fs: AuditFs,
+        unit: str,
+        compute: Callable[[], Iterable[T]],
+        encode: Callable[[List[T]], Any],
+        decode: Callable[[Any], List[T]],
+    ) -> Iterator[T]:
+        """Like run(), for a unit that yields its results.
+
+        Items are passed on as ``compute()`` produces them. The unit is stored
+        only if the caller consumes it to the end; an abandoned unit is not.
+        """
+        entry = self._replayable(fs, unit)
+        if entry is not None:
+            yield from decode(entry["value"])
+            return
+
+        with self._lock:
+            self.misses += 1
+        items: List[T] = []
+        fs.push()
+        try:
+            for item in compute():
+                items.append(item)
+                yield item
+        finally:
+            deps = fs.pop()
+        self._store(unit, deps, encode(items))
+
+    def _replayable(self, fs: AuditFs, unit: str) -> Optional[Dict[str, Any]]:
+        """The stored entry for ``unit`` if none of its inputs changed."""
+        entry = self._load().get(unit)
+        if entry is None or not all(
+            fs.fingerprint(path) == fp for path, fp in entry["deps"].items()
+        ):
+            return None
+        now_ns = time.time_ns()
+        with self._lock:
+            self.hits += 1
+            if now_ns - entry["used_ns"] > LRU_TOUCH_INTERVAL_NS:
+                entry["used_ns"] = now_ns
+                self._dirty = True
+        return entry
+
+    def _store(self, unit: str, deps: Dict[str, Fingerprint], value: Any) -> None:
+        now_ns = time.time_ns()
+        units = self._load()
+        if INCOMPLETE in deps or _is_racy(deps, now_ns) or not _round_trips(value):
+            with self._lock:
+                units.pop(unit, None)
+            return
+        with self._lock:
+            units[unit] = {"deps": deps, "value": value, "used_ns": now_ns}
+            self._dirty = True
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._units is None:
+            with self._lock:
+                if self._units is None:
+                    self._units = (
+                        {} if self.path is None else self._read_units(self.path)
+                    )
+        return self._units
+
+    def _read_units(self, path: Path) -> Dict[str, Dict[str, Any]]:
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("format") != SNAPSHOT_FORMAT
+            or data.get("salt") != self.salt
+            or not isinstance(data.get("units"), dict)
+        ):
+            return {}
+        return {
+            unit: entry
+            for unit, entry in data["units"].items()
+            if isinstance(entry, dict)
+            and isinstance(entry.get("deps"), dict)
+            and isinstance(entry.get("used_ns"), int)
+            and "value" in entry
+        }
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        units = self._load()
+        with self._lock:
+            if len(units) > self.max_units:
+                newest = sorted(
+                    units.items(), key=lambda item: item[1]["used_ns"], reverse=True
+                )
+                units = self._units = dict(newest[: self.max_units])
+            # Units stored while the file is written are saved next time.
+            units = dict(units)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(
+                    {"format": SNAPSHOT_FORMAT, "salt": self.salt, "units": units}, f
+                )
+            os.replace(tmp, self.path)
+        except OSError:
+            # The snapshot is an optimization only; never fail the audit over it.
+            self._dirty = True
@@ -5,30 +5,210 @@ Usage:
   python3 .bmad/scripts/audit_workflow.py
   python3 .bmad/scripts/audit_workflow.py --workflow .bmad/workflows/workflow.yml
   python3 .bmad/scripts/audit_workflow.py --state .bmad/artifacts/workflow-state.json
+  python3 .bmad/scripts/audit_workflow.py --state '.bmad/runs/*/workflow-state.json'
+  python3 .bmad/scripts/audit_workflow.py --watch [--debounce 0.3] [--poll]
+  python3 .bmad/scripts/audit_workflow.py --repos ../svc-a ../svc-b [--processes N]
+  python3 .bmad/scripts/audit_workflow.py --repos-file repos.txt
+  python3 .bmad/scripts/audit_workflow.py --format jsonl|sarif
+  python3 .bmad/scripts/audit_workflow.py --max-errors 1 --time-budget 0.2
+
+Runs are incremental: checks whose inputs (workflow, state, template, artifact,
+lock and locked files) are unchanged since the previous run are replayed from
+.bmad/cache/audit-snapshot.json (see audit_snapshot.py); --no-incremental or
+--paranoid re-runs everything. Either way, each directory is listed once per
+run and each path stat'ed at most once (AuditFs). Workflow and lock YAML is
+parsed with libyaml when available, and parsed documents and validated workflow
+metadata are reused by content hash from .bmad/cache/parsed.marshal
+(parse_cache.py), even when mtimes change. JSON locks (lock_format: json) are
+read with the stdlib JSON parser instead.
+
+Artifact content checks combine built-in marker rules (DEFAULT_CONTENT_RULES)
+with stage exit_gate.content_rules from the workflow; both are compiled once
+into a ContentRuleIndex.
+
+--watch keeps one process running: after each debounced batch of changes in the
+workflow, state, artifacts and milestone dirs (inotify, or scandir polling) it
+re-audits, re-stat'ing only the changed paths, and prints only new (+) and
+resolved (-) findings.
+
+--state also accepts a glob or a directory (its *.json files). Each matching
+state is validated against its resolved workflow on a thread pool (--jobs),
+sharing parsed workflows and the digest cache; findings are grouped per state.
+
+--repos/--repos-file audit many repositories in one invocation on a process
+pool (--processes). Workflow files with identical content are parsed once, in
+the parent, and shared with the workers; each repo keeps its own .bmad/cache/.
+Output is each repo's findings followed by one aggregated summary.
+
+--format jsonl|sarif (single-repo audits) writes each finding as soon as the
+generator-based checks produce it, then a summary trailer: a {"type":
+"summary"} line, or the SARIF run's properties. Text output streams the same
+way, except per-state sections, which are printed once their counts are known.
+
+Checks run cheapest first: workflow and state structure, then stat-only
+artifact checks, then content scans, then milestone hashing. --max-errors and
+--time-budget stop starting further checks once spent; the skipped checks are
+listed in a final AUDIT_CHECKS_SKIPPED error (an incomplete audit never passes)
+and their units are not cached.
 """
 
 from __future__ import annotations
 
+import sys
+
+if __name__ == "__main__":
+    # Thin-client fast path: let a running bmad_daemon.py execute the audit
+    # before paying for the imports below.
+    from bmad_daemon import forward
+
+    forward("audit_workflow", sys.argv[1:])
+
+import abc
 import argparse
 import datetime as dt
 import hashlib
 import json
-import sys
-from dataclasses import dataclass
+import os
+import re
+import threading
+import time
+from collections import Counter
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-
-import yaml
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from audit_snapshot import AuditFs, AuditSnapshot, snapshot_salt
+from file_digest import (
+    ALGORITHMS,
+    DEFAULT_ALGO,
+    LOCK_SCHEMA_VERSIONS,
+    DigestCache,
+    default_jobs,
+    entry_stat_matches,
+    iter_parallel,
+    lock_entry_digest,
+)
+from parse_cache import (
+    DEFAULT_LOCK_FILENAMES,
+    DEFAULT_LOCK_FORMAT,
+    LOCK_FORMATS,
+    ParsedCache,
+    load_document,
+    lock_filename_candidates,
+    lock_filename_mismatch,
+    parse_yaml,
+    parsed_cache,
+    use_parsed_cache,
+)
+
+if TYPE_CHECKING:
+    # fs_watch loads ctypes; it is imported at runtime only by --watch.
+    from fs_watch import Root
 
 DEFAULT_MILESTONE_KEYS = ["prd", "scope", "adr", "impact", "ui_ux_spec", "api_design"]
+MARKER_SCAN_CHUNK_CHARS = 1024 * 1024
+DEFAULT_STATE_PATH = ".bmad/artifacts/workflow-state.json"
+DEFAULT_TEMPLATE_PATH = ".bmad/templates/workflow-state.template.json"
+DEFAULT_DEBOUNCE = 0.3
 
 
-@dataclass
 class Finding:
-    severity: str  # ERROR | WARN | INFO
-    code: str
-    message: str
-    ref: Optional[str] = None
+    """One audit result. Slotted: large audits hold and stream many of these."""
+
+    __slots__ = ("severity", "code", "message", "ref")
+
+    def __init__(
+        self, severity: str, code: str, message: str, ref: Optional[str] = None
+    ) -> None:
+        self.severity = severity  # ERROR | WARN | INFO
+        self.code = code
+        self.message = message
+        self.ref = ref
+
+    def astuple(self) -> Tuple[str, str, str, Optional[str]]:
+        return (self.severity, self.code, self.message, self.ref)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Finding):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __repr__(self) -> str:
+        return "Finding(%r, %r, %r, %r)" % self.astuple()
+
+
+def encode_findings(findings: List[Finding]) -> List[List[Any]]:
+    return [list(f.astuple()) for f in findings]
+
+
+def decode_findings(rows: List[List[Any]]) -> List[Finding]:
+    return [Finding(*row) for row in rows]
+
+
+class AuditBudget:
+    """--max-errors / --time-budget, consulted between checks.
+
+    Errors are counted as findings pass through track(). Once the error limit
+    is reached or the deadline has passed, allows() refuses each further check
+    and records it as skipped.
+    """
+
+    def __init__(
+        self, max_errors: Optional[int] = None, seconds: Optional[float] = None
+    ) -> None:
+        self.max_errors = max_errors
+        self.seconds = seconds
+        self.deadline = None if seconds is None else time.monotonic() + seconds
+        self.errors = 0
+        self.skipped: List[str] = []
+        self._lock = threading.Lock()
+
+    def spent(self) -> bool:
+        if self.max_errors is not None and self.errors >= self.max_errors:
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def allows(self, fs: AuditFs, check: str) -> bool:
+        if not self.spent():
+            return True
+        # A unit that skipped checks must not be replayed as a complete result.
+        fs.mark_incomplete()
+        with self._lock:
+            self.skipped.append(check)
+        return False
+
+    def track(self, findings: Iterable[Finding]) -> Iterator[Finding]:
+        for item in findings:
+            if item.severity == "ERROR":
+                with self._lock:
+                    self.errors += 1
+            yield item
+
+    def findings(self) -> List[Finding]:
+        if not self.skipped:
+            return []
+        if self.max_errors is not None and self.errors >= self.max_errors:
+            reason = f"--max-errors {self.max_errors} reached"
+        else:
+            reason = f"--time-budget {self.seconds:g}s elapsed"
+        # An audit that skipped checks must not pass.
+        return [
+            Finding(
+                "ERROR",
+                "AUDIT_CHECKS_SKIPPED",
+                f"{reason}; skipped {len(self.skipped)} check(s): "
+                + ", ".join(self.skipped),
+            )
+        ]
 
 
 def iso_to_datetime(value: str) -> Optional[dt.datetime]:
@@ -41,22 +221,16 @@ def iso_to_datetime(value: str) -> Optional[dt.datetime]:
         return None
 
 
-def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
-def load_yaml(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+def yaml_mapping(data: Any, path: Path) -> Dict[str, Any]:
     if not isinstance(data, dict):
         raise ValueError(f"YAML root must be object: {path}")
     return data
 
 
+def load_yaml(path: Path) -> Dict[str, Any]:
+    return yaml_mapping(parsed_cache().load(path, "yaml", parse_yaml), path)
+
+
 def load_json(path: Path) -> Dict[str, Any]:
     with path.open("r", encoding="utf-8") as f:
         data = json.load(f)
@@ -65,9 +239,12 @@ def load_json(path: Path) -> Dict[str, Any]:
     return data
 
 
-def check_workflow_definition(path: Path) -> Tuple[List[Finding], Dict[str, Any]]:
+def check_workflow_definition(
+    path: Path, wf: Optional[Dict[str, Any]] = None
+) -> Tuple[List[Finding], Dict[str, Any]]:
     findings: List[Finding] = []
-    wf = load_yaml(path)
+    if wf is None:
+        wf = load_yaml(path)
 
     artifacts = wf.get("artifacts")
     stages = wf.get("stages")
@@ -109,9 +286,23 @@ def check_workflow_definition(path: Path) -> Tuple[List[Finding], Dict[str, Any]
     milestone_enabled = milestone.get("enabled", True)
     milestone_dir = milestone.get("dir", ".bmad/milestones")
     milestone_pointer = milestone.get("active_pointer", ".bmad/milestones/ACTIVE")
-    milestone_lock_filename = milestone.get("lock_filename", "milestone-lock.yml")
+    milestone_lock_format = milestone.get("lock_format", DEFAULT_LOCK_FORMAT)
+    if milestone_lock_format not in LOCK_FORMATS:
+        findings.append(
+            Finding(
+                "ERROR",
+                "WF_MILESTONE_LOCK_FORMAT_INVALID",
+                f"workflow.milestone.lock_format must be one of: {'|'.join(LOCK_FORMATS)}",
+                str(path),
+            )
+        )
+        milestone_lock_format = DEFAULT_LOCK_FORMAT
+    milestone_lock_filename = milestone.get(
+        "lock_filename", DEFAULT_LOCK_FILENAMES[milestone_lock_format]
+    )
     milestone_keys = milestone.get("keys", DEFAULT_MILESTONE_KEYS)
     milestone_enforce_stage = milestone.get("enforce_from_stage", "parallel_dev")
+    milestone_hash_algo = milestone.get("hash_algo", DEFAULT_ALGO)
 
     if not isinstance(milestone_enabled, bool):
         findings.append(
@@ -156,6 +347,17 @@ def check_workflow_definition(path: Path) -> Tuple[List[Finding], Dict[str, Any]
                 str(path),
             )
         )
+    else:
+        mismatch = lock_filename_mismatch(milestone_lock_filename, milestone_lock_format)
+        if mismatch:
+            findings.append(
+                Finding(
+                    "ERROR",
+                    "WF_MILESTONE_LOCK_FILENAME_FORMAT_MISMATCH",
+                    mismatch,
+                    str(path),
+                )
+            )
 
     if not isinstance(milestone_keys, list):
         findings.append(
@@ -179,6 +381,17 @@ def check_workflow_definition(path: Path) -> Tuple[List[Finding], Dict[str, Any]
         )
         milestone_enforce_stage = ""
 
+    if milestone_hash_algo not in ALGORITHMS:
+        findings.append(
+            Finding(
+                "ERROR",
+                "WF_MILESTONE_HASH_ALGO_INVALID",
+                f"workflow.milestone.hash_algo must be one of: {'|'.join(ALGORITHMS)}",
+                str(path),
+            )
+        )
+        milestone_hash_algo = DEFAULT_ALGO
+
     if milestone_enabled:
         for key in milestone_keys:
             if key not in artifacts:
@@ -192,6 +405,7 @@ def check_workflow_definition(path: Path) -> Tuple[List[Finding], Dict[str, Any]
                 )
 
     stage_ids: List[str] = []
+    content_rules: List[Dict[str, Any]] = []
     for idx, stage in enumerate(stages):
         if not isinstance(stage, dict):
             findings.append(
@@ -264,6 +478,39 @@ def check_workflow_definition(path: Path) -> Tuple[List[Finding], Dict[str, Any]
                 )
             )
 
+        raw_rules = (
+            exit_gate.get("content_rules", []) if isinstance(exit_gate, dict) else []
+        )
+        if not isinstance(raw_rules, list):
+            findings.append(
+                Finding(
+                    "ERROR",
+                    "WF_CONTENT_RULE_INVALID",
+                    f"stage '{sid}' exit_gate.content_rules must be a list",
+                    str(path),
+                )
+            )
+            raw_rules = []
+        for rule_idx, raw_rule in enumerate(raw_rules):
+            rule, problems = normalize_content_rule(raw_rule)
+            if rule is not None:
+                problems = [
+                    f"key '{key}' is not mapped in workflow.artifacts"
+                    for key in rule.get("keys", [])
+                    if key not in artifacts
+                ]
+            for problem in problems:
+                findings.append(
+                    Finding(
+                        "ERROR",
+                        "WF_CONTENT_RULE_INVALID",
+                        f"stage '{sid}' exit_gate.content_rules[{rule_idx}]: {problem}",
+                        str(path),
+                    )
+                )
+            if rule is not None:
+                content_rules.append(rule)
+
     if len(stage_ids) != len(set(stage_ids)):
         findings.append(
             Finding(
@@ -294,14 +541,17 @@ def check_workflow_definition(path: Path) -> Tuple[List[Finding], Dict[str, Any]
         "artifacts": artifacts,
         "stages": stages,
         "stage_ids": stage_ids,
+        "content_rules": content_rules,
         "workflow": wf.get("workflow", {}),
         "milestone": {
             "enabled": milestone_enabled,
             "dir": milestone_dir,
             "active_pointer": milestone_pointer,
             "lock_filename": milestone_lock_filename,
+            "lock_format": milestone_lock_format,
             "keys": [str(k) for k in milestone_keys],
             "enforce_from_stage": milestone_enforce_stage,
+            "hash_algo": milestone_hash_algo,
         },
     }
     return findings, metadata
@@ -311,48 +561,284 @@ def resolve_artifact_path(repo_root: Path, artifacts_dir: str, filename: str) ->
     return repo_root / artifacts_dir / filename
 
 
+# Built-in content rules, applied before any exit_gate.content_rules declared in
+# the workflow. Same schema as the YAML rules (see normalize_content_rule).
+DEFAULT_CONTENT_RULES: List[Dict[str, Any]] = [
+    {
+        "key_suffix": "_gate_report",
+        "filename_suffix": "-gate-report.md",
+        "markers": ["Gate Status", "Blockers"],
+    },
+    {
+        "keys": ["qa_test_plan"],
+        "markers": [
+            "Summary",
+            "Smoke Set",
+            "Regression",
+            "Coverage by Task",
+            "Milestone ID",
+        ],
+    },
+    {
+        "keys": ["qa_test_report"],
+        "markers": ["Verification Method", "Overall Status", "Milestone ID"],
+    },
+    {
+        "keys": ["architecture_review_gate_report"],
+        "markers": [
+            "Review Scope",
+            "Gate Status",
+            "Milestone ID",
+            "Reviewed Artifacts",
+            "Evidence Index",
+            "Decision Rationale",
+        ],
+    },
+    {
+        "keys": ["parallel_dev_gate_report"],
+        "markers": ["Task Coverage", "Gate Status"],
+    },
+    {
+        "keys": ["release_candidate_gate_report"],
+        "markers": ["Milestone ID", "Final Decision", "Gate Status"],
+    },
+    {
+        "keys": ["milestone_lock_report"],
+        "markers": ["Milestone ID", "Locked Keys", "Lock File"],
+    },
+]
+
+CONTENT_RULE_FIELDS = {"keys", "key_suffix", "filename_suffix", "markers", "patterns"}
+# Pattern syntax scan_content() cannot honour: it searches windows of whole
+# lines, so a newline never joins two lines and \A / \Z anchor to a window.
+# ``\\`` is matched (and ignored) so an escaped backslash is not misread.
+_LINE_SPANNING_SYNTAX = re.compile(
+    r"\\\\|\\[nAZ]|\\x0[aA]|\\u000[aA]|\\U0000000[aA]|\\012|\n"
+)
+
+
+def normalize_content_rule(rule: Any) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """Validate one exit_gate.content_rules item.
+
+    A rule selects artifacts by ``keys`` (list), ``key_suffix`` and/or
+    ``filename_suffix`` (any selector matching is enough) and requires literal
+    ``markers`` and/or regex ``patterns`` (matched per line, re.MULTILINE;
+    patterns with a newline, ``\\A`` or ``\\Z`` are rejected).
+    Returns (normalized rule or None, problems).
+    """
+    if not isinstance(rule, dict):
+        return None, ["rule must be a mapping"]
+    problems = [f"unknown field '{k}'" for k in rule if k not in CONTENT_RULE_FIELDS]
+    normalized: Dict[str, Any] = {}
+
+    keys = rule.get("keys", [])
+    if not isinstance(keys, list) or not all(isinstance(k, str) for k in keys):
+        problems.append("keys must be a list of artifact keys")
+    elif keys:
+        normalized["keys"] = list(keys)
+    for field in ("key_suffix", "filename_suffix"):
+        value = rule.get(field)
+        if value is None:
+            continue
+        if not isinstance(value, str) or not value:
+            problems.append(f"{field} must be a non-empty string")
+        else:
+            normalized[field] = value
+    if not {"keys", "key_suffix", "filename_suffix"} & normalized.keys():
+        problems.append("rule needs keys, key_suffix or filename_suffix")
+
+    markers = rule.get("markers", [])
+    if not isinstance(markers, list) or not all(
+        isinstance(m, str) and m for m in markers
+    ):
+        problems.append("markers must be a list of non-empty strings")
+    elif markers:
+        normalized["markers"] = list(markers)
+    patterns = rule.get("patterns", [])
+    if not isinstance(patterns, list) or not all(isinstance(p, str) for p in patterns):
+        problems.append("patterns must be a list of regex strings")
+    else:
+        for pattern in patterns:
+            try:
+                re.compile(pattern, re.MULTILINE)
+            except re.error as exc:
+                problems.append(f"invalid pattern {pattern!r}: {exc}")
+                continue
+            if any(
+                m.group() != "\\\\" for m in _LINE_SPANNING_SYNTAX.finditer(pattern)
+            ):
+                problems.append(
+                    f"pattern {pattern!r} uses a newline, \\A or \\Z; patterns "
+                    "are matched line by line, so it cannot match as intended"
+                )
+        if patterns:
+            normalized["patterns"] = list(patterns)
+    if not {"markers", "patterns"} & normalized.keys():
+        problems.append("rule needs markers or patterns")
+
+    return (None if problems else normalized), problems
+
+
+class ContentRuleIndex:
+    """Content rules compiled for O(1) lookup per (artifact key, filename).
+
+    Rules are bucketed by key and by suffix, regexes are compiled once, and the
+    requirements of every artifact in the workflow mapping are resolved up front.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]], artifacts: Dict[str, Any]) -> None:
+        self._compiled: List[Tuple[Tuple[str, ...], Tuple["re.Pattern[str]", ...]]] = []
+        self._by_key: Dict[str, List[int]] = {}
+        self._by_key_suffix: Dict[str, List[int]] = {}
+        self._by_filename_suffix: Dict[str, List[int]] = {}
+        for idx, rule in enumerate(rules):
+            self._compiled.append(
+                (
+                    tuple(rule.get("markers", [])),
+                    tuple(re.compile(p, re.MULTILINE) for p in rule.get("patterns", [])),
+                )
+            )
+            for key in rule.get("keys", []):
+                self._by_key.setdefault(key, []).append(idx)
+            if "key_suffix" in rule:
+                self._by_key_suffix.setdefault(rule["key_suffix"], []).append(idx)
+            if "filename_suffix" in rule:
+                self._by_filename_suffix.setdefault(rule["filename_suffix"], []).append(
+                    idx
+                )
+        self._resolved: Dict[
+            Tuple[str, str], Tuple[Tuple[str, ...], Tuple["re.Pattern[str]", ...]]
+        ] = {}
+        for key, filename in artifacts.items():
+            if isinstance(key, str) and isinstance(filename, str):
+                self.lookup(key, filename)
+
+    def lookup(
+        self, artifact_key: str, filename: str
+    ) -> Tuple[Tuple[str, ...], Tuple["re.Pattern[str]", ...]]:
+        """(required markers, required patterns) for one artifact, in rule order."""
+        cached = self._resolved.get((artifact_key, filename))
+        if cached is not None:
+            return cached
+        matched = set(self._by_key.get(artifact_key, []))
+        for suffix, idxs in self._by_key_suffix.items():
+            if artifact_key.endswith(suffix):
+                matched.update(idxs)
+        for suffix, idxs in self._by_filename_suffix.items():
+            if filename.endswith(suffix):
+                matched.update(idxs)
+        markers: List[str] = []
+        patterns: List["re.Pattern[str]"] = []
+        for idx in sorted(matched):
+            markers.extend(self._compiled[idx][0])
+            patterns.extend(self._compiled[idx][1])
+        resolved = (tuple(markers), tuple(patterns))
+        self._resolved[(artifact_key, filename)] = resolved
+        return resolved
+
+
+_RULE_INDEXES: Dict[str, ContentRuleIndex] = {}
+
+
+def content_rule_index(workflow_meta: Optional[Dict[str, Any]] = None) -> ContentRuleIndex:
+    """Compiled built-in + workflow content rules, built once per distinct workflow."""
+    rules = DEFAULT_CONTENT_RULES + list(
+        (workflow_meta or {}).get("content_rules", [])
+    )
+    artifacts = (workflow_meta or {}).get("artifacts", {})
+    cache_key = json.dumps([rules, artifacts], sort_keys=True, default=str)
+    index = _RULE_INDEXES.get(cache_key)
+    if index is None:
+        index = _RULE_INDEXES[cache_key] = ContentRuleIndex(rules, artifacts)
+    return index
+
+
 def required_tokens_for_artifact(artifact_key: str, filename: str) -> List[str]:
-    tokens: List[str] = []
-    if artifact_key.endswith("_gate_report") or filename.endswith("-gate-report.md"):
-        tokens.extend(["Gate Status", "Blockers"])
-    if artifact_key == "qa_test_plan":
-        tokens.extend(
-            ["Summary", "Smoke Set", "Regression", "Coverage by Task", "Milestone ID"]
-        )
-    if artifact_key == "qa_test_report":
-        tokens.extend(["Verification Method", "Overall Status", "Milestone ID"])
-    if artifact_key == "architecture_review_gate_report":
-        tokens.extend(
-            [
-                "Review Scope",
-                "Gate Status",
-                "Milestone ID",
-                "Reviewed Artifacts",
-                "Evidence Index",
-                "Decision Rationale",
-            ]
-        )
-    if artifact_key == "parallel_dev_gate_report":
-        tokens.extend(["Task Coverage", "Gate Status"])
-    if artifact_key == "release_candidate_gate_report":
-        tokens.extend(["Milestone ID", "Final Decision", "Gate Status"])
-    if artifact_key == "milestone_lock_report":
-        tokens.extend(["Milestone ID", "Locked Keys", "Lock File"])
-    return tokens
+    """Built-in required markers for an artifact (workflow rules not included)."""
+    return list(content_rule_index().lookup(artifact_key, filename)[0])
+
+
+def _search_lines(
+    pattern: "re.Pattern[str]", window: str, start: int, end: int, at_eof: bool
+) -> bool:
+    """Whether ``pattern`` matches within ``window[start:end]``.
+
+    Before EOF, ``end`` is the start of a line that is not complete yet, but
+    the regex engine sees it as the end of the text, so an empty match there
+    (e.g. ``^$``) would be a false hit. It is ignored; that position is
+    searched again with the rest of its line in the next window.
+    """
+    for match in pattern.finditer(window, start, end):
+        if at_eof or match.end() > match.start() or match.start() < end:
+            return True
+    return False
+
+
+def scan_content(
+    path: Path,
+    markers: Iterable[str],
+    patterns: Iterable["re.Pattern[str]"] = (),
+    chunk_chars: int = MARKER_SCAN_CHUNK_CHARS,
+) -> Tuple[Set[str], Set["re.Pattern[str]"]]:
+    """Return the markers and patterns found in ``path``, in one streaming pass.
+
+    The text is read in fixed-size chunks. The last (longest marker - 1)
+    characters of each window are carried into the next so markers spanning a
+    chunk boundary are still found; patterns are searched over complete lines
+    only, so an unfinished last line is carried over as well. Reading stops
+    once everything is found.
+    """
+    remaining = set(markers)
+    found = {marker for marker in remaining if not marker}
+    remaining -= found
+    pending = set(patterns)
+    matched: Set["re.Pattern[str]"] = set()
+    if not remaining and not pending:
+        return found, matched
+    overlap = max((len(marker) for marker in remaining), default=1) - 1
+    tail = ""
+    lines_from = 0  # start of the first line in ``tail`` not yet pattern-searched
+    with path.open("r", encoding="utf-8", errors="ignore") as f:
+        while remaining or pending:
+            chunk = f.read(chunk_chars)
+            window = tail + chunk
+            hits = {marker for marker in remaining if marker in window}
+            found |= hits
+            remaining -= hits
+            # At EOF the unfinished last line is complete too.
+            complete = window.rfind("\n") + 1 if chunk else len(window)
+            # At EOF, an empty remainder can still hold an empty match.
+            if complete > lines_from or not chunk:
+                hits = {
+                    p
+                    for p in pending
+                    if _search_lines(p, window, lines_from, complete, not chunk)
+                }
+                matched |= hits
+                pending -= hits
+            if not chunk:
+                break
+            cut = max(len(window) - overlap, 0)
+            if pending:
+                cut = min(cut, max(complete, lines_from))
+            lines_from = max(max(complete, lines_from) - cut, 0)
+            tail = window[cut:]
+    return found, matched
 
 
 def check_artifact_minimum_content(
     artifact_path: Path,
     artifact_key: str,
     filename: str,
+    rules: Optional[ContentRuleIndex] = None,
 ) -> List[Finding]:
     findings: List[Finding] = []
-    required = required_tokens_for_artifact(artifact_key, filename)
-    if not required:
+    required, patterns = (rules or content_rule_index()).lookup(artifact_key, filename)
+    if not required and not patterns:
         return findings
 
     try:
-        content = artifact_path.read_text(encoding="utf-8", errors="ignore")
+        present, matched = scan_content(artifact_path, required, patterns)
     except OSError as exc:
         findings.append(
             Finding(
@@ -364,19 +850,56 @@ def check_artifact_minimum_content(
         )
         return findings
 
-    missing = [token for token in required if token not in content]
+    problems: List[str] = []
+    missing = [token for token in required if token not in present]
     if missing:
+        problems.append(f"missing required markers: {', '.join(missing)}")
+    unmatched = [p.pattern for p in patterns if p not in matched]
+    if unmatched:
+        problems.append(f"no match for required patterns: {', '.join(unmatched)}")
+    if problems:
         findings.append(
             Finding(
                 "ERROR",
                 "ARTIFACT_CONTENT_INCOMPLETE",
-                f"artifact '{filename}' missing required markers: {', '.join(missing)}",
+                f"artifact '{filename}' {'; '.join(problems)}",
                 str(artifact_path),
             )
         )
     return findings
 
 
+def check_artifact_content_unit(
+    fs: AuditFs,
+    snapshot: AuditSnapshot,
+    artifact_path: Path,
+    artifact_key: str,
+    filename: str,
+    rules: ContentRuleIndex,
+) -> List[Finding]:
+    required, patterns = rules.lookup(artifact_key, filename)
+    if not required and not patterns:
+        return []
+
+    def compute() -> List[Finding]:
+        fs.stat(artifact_path)
+        return check_artifact_minimum_content(
+            artifact_path, artifact_key, filename, rules
+        )
+
+    # The rules are part of the unit's identity, not a file dependency.
+    rule_key = hashlib.sha256(
+        json.dumps([required, [p.pattern for p in patterns]]).encode("utf-8")
+    ).hexdigest()[:16]
+    return snapshot.run(
+        fs,
+        f"content:{artifact_path}:{artifact_key}:{filename}:{rule_key}",
+        compute,
+        encode_findings,
+        decode_findings,
+    )
+
+
 def resolve_lock_path(repo_root: Path, state_value: str) -> Path:
     p = Path(state_value)
     if p.is_absolute():
@@ -384,7 +907,12 @@ def resolve_lock_path(repo_root: Path, state_value: str) -> Path:
     return repo_root / p
 
 
-def check_milestone_consistency(
+def stat_matches_entry(fs: AuditFs, entry: Dict[str, Any], path: Path) -> bool:
+    st = fs.stat(path)
+    return st is not None and entry_stat_matches(entry, st)
+
+
+def iter_milestone_consistency(
     *,
     repo_root: Path,
     state_path: Path,
@@ -393,11 +921,16 @@ def check_milestone_consistency(
     stage_index: Dict[str, int],
     current_stage: Any,
     completed: List[str],
-) -> List[Finding]:
-    findings: List[Finding] = []
+    digests: DigestCache,
+    jobs: int = 1,
+    quick: bool = False,
+    fs: Optional[AuditFs] = None,
+) -> Iterator[Finding]:
+    """Yield milestone lock/artifact findings for one state, as they are found."""
+    fs = fs or AuditFs()
     milestone: Dict[str, Any] = workflow_meta.get("milestone", {})
     if not milestone.get("enabled", True):
-        return findings
+        return
 
     milestone_id = state.get("milestone_id")
     milestone_lock_path_value = state.get("milestone_lock_path")
@@ -420,95 +953,106 @@ def check_milestone_consistency(
                 require_milestone = True
 
     if not require_milestone:
-        return findings
+        return
 
     if not isinstance(milestone_id, str) or not milestone_id.strip():
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_MILESTONE_ID_MISSING",
-                "milestone is required at current stage but state.milestone_id is missing",
-                str(state_path),
-            )
+        yield Finding(
+            "ERROR",
+            "STATE_MILESTONE_ID_MISSING",
+            "milestone is required at current stage but state.milestone_id is missing",
+            str(state_path),
         )
-        return findings
+        return
 
     if (
         not isinstance(milestone_lock_path_value, str)
         or not milestone_lock_path_value.strip()
     ):
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_MILESTONE_LOCK_PATH_MISSING",
-                "milestone is required at current stage but state.milestone_lock_path is missing",
-                str(state_path),
-            )
+        yield Finding(
+            "ERROR",
+            "STATE_MILESTONE_LOCK_PATH_MISSING",
+            "milestone is required at current stage but state.milestone_lock_path is missing",
+            str(state_path),
         )
-        return findings
+        return
 
     lock_path = resolve_lock_path(repo_root, milestone_lock_path_value)
-    expected_lock = (
-        repo_root
-        / str(milestone.get("dir", ".bmad/milestones"))
-        / milestone_id
-        / str(milestone.get("lock_filename", "milestone-lock.yml"))
+    lock_format = milestone.get("lock_format", DEFAULT_LOCK_FORMAT)
+    lock_filename = str(
+        milestone.get(
+            "lock_filename",
+            DEFAULT_LOCK_FILENAMES.get(lock_format, DEFAULT_LOCK_FILENAMES["yaml"]),
+        )
     )
-    if lock_path.resolve() != expected_lock.resolve():
-        findings.append(
-            Finding(
-                "WARN",
-                "STATE_MILESTONE_LOCK_PATH_UNEXPECTED",
-                f"state.milestone_lock_path differs from expected convention: {expected_lock}",
-                str(state_path),
-            )
+    # Like milestone_lock.py, accept a lock under either format's default name.
+    expected_locks = [
+        repo_root / str(milestone.get("dir", ".bmad/milestones")) / milestone_id / name
+        for name in lock_filename_candidates(lock_filename)
+    ]
+    expected_lock = next(
+        (path for path in expected_locks if fs.exists(path)), expected_locks[0]
+    )
+    resolved = fs.resolve(lock_path)
+    if resolved not in {fs.resolve(path) for path in expected_locks}:
+        yield Finding(
+            "WARN",
+            "STATE_MILESTONE_LOCK_PATH_UNEXPECTED",
+            f"state.milestone_lock_path differs from expected convention: {expected_lock}",
+            str(state_path),
         )
-
-    if not lock_path.exists():
-        findings.append(
-            Finding(
-                "ERROR",
-                "MILESTONE_LOCK_MISSING",
-                f"milestone lock file does not exist: {lock_path}",
-                str(lock_path),
-            )
+    elif not fs.exists(lock_path) and fs.exists(expected_lock):
+        # The lock was re-created in the other format after the state was written.
+        lock_path = expected_lock
+
+    if not fs.exists(lock_path):
+        yield Finding(
+            "ERROR",
+            "MILESTONE_LOCK_MISSING",
+            f"milestone lock file does not exist: {lock_path}",
+            str(lock_path),
         )
-        return findings
+        return
 
     try:
-        lock_data = load_yaml(lock_path)
+        lock_data = load_document(lock_path)
+        if not isinstance(lock_data, dict):
+            raise ValueError("lock root must be object")
     except Exception as exc:
-        findings.append(
-            Finding(
-                "ERROR",
-                "MILESTONE_LOCK_INVALID",
-                f"failed to parse milestone lock: {exc}",
-                str(lock_path),
-            )
+        yield Finding(
+            "ERROR",
+            "MILESTONE_LOCK_INVALID",
+            f"failed to parse milestone lock: {exc}",
+            str(lock_path),
         )
-        return findings
+        return
+
+    schema_version = lock_data.get("schema_version", 1)
+    if schema_version not in LOCK_SCHEMA_VERSIONS:
+        yield Finding(
+            "ERROR",
+            "MILESTONE_LOCK_SCHEMA_UNSUPPORTED",
+            f"unsupported milestone lock schema_version: {schema_version!r}",
+            str(lock_path),
+        )
+        return
 
     files = lock_data.get("files")
     if not isinstance(files, dict):
-        findings.append(
-            Finding(
-                "ERROR",
-                "MILESTONE_LOCK_FILES_INVALID",
-                "milestone lock must include files mapping",
-                str(lock_path),
-            )
+        yield Finding(
+            "ERROR",
+            "MILESTONE_LOCK_FILES_INVALID",
+            "milestone lock must include files mapping",
+            str(lock_path),
         )
-        return findings
+        return
 
     lock_id = lock_data.get("milestone_id")
     if isinstance(lock_id, str) and lock_id.strip() and lock_id != milestone_id:
-        findings.append(
-            Finding(
-                "ERROR",
-                "MILESTONE_ID_MISMATCH",
-                f"state milestone_id '{milestone_id}' does not match lock milestone_id '{lock_id}'",
-                str(lock_path),
-            )
+        yield Finding(
+            "ERROR",
+            "MILESTONE_ID_MISMATCH",
+            f"state milestone_id '{milestone_id}' does not match lock milestone_id '{lock_id}'",
+            str(lock_path),
         )
 
     artifacts: Dict[str, str] = workflow_meta["artifacts"]
@@ -517,138 +1061,160 @@ def check_milestone_consistency(
     if not isinstance(milestone_keys, list):
         milestone_keys = []
 
+    digest_targets: List[Tuple[Path, str]] = []
+    for key in milestone_keys:
+        entry = files.get(key)
+        filename = artifacts.get(key)
+        if not isinstance(entry, dict) or not filename:
+            continue
+        algo, _ = lock_entry_digest(entry)
+        candidates = [resolve_artifact_path(repo_root, artifacts_dir, filename)]
+        locked_path_value = entry.get("locked_path")
+        if isinstance(locked_path_value, str) and locked_path_value.strip():
+            candidates.append(resolve_lock_path(repo_root, locked_path_value))
+        for path in candidates:
+            if quick and stat_matches_entry(fs, entry, path):
+                continue
+            digest_targets.append((path, algo))
+    digests.prefetch(digest_targets, jobs, stat=fs.stat)
+
     for key in milestone_keys:
         filename = artifacts.get(key)
         if not filename:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_ARTIFACT_UNMAPPED",
-                    f"milestone key '{key}' is not mapped in workflow artifacts",
-                    str(state_path),
-                )
+            yield Finding(
+                "ERROR",
+                "MILESTONE_ARTIFACT_UNMAPPED",
+                f"milestone key '{key}' is not mapped in workflow artifacts",
+                str(state_path),
             )
             continue
 
         entry = files.get(key)
         if not isinstance(entry, dict):
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_LOCK_ENTRY_MISSING",
-                    f"milestone lock missing entry for key '{key}'",
-                    str(lock_path),
-                )
+            yield Finding(
+                "ERROR",
+                "MILESTONE_LOCK_ENTRY_MISSING",
+                f"milestone lock missing entry for key '{key}'",
+                str(lock_path),
             )
             continue
 
         locked_path_value = entry.get("locked_path")
-        expected_hash = entry.get("sha256")
+        algo, expected_hash = lock_entry_digest(entry)
         lock_artifact_name = entry.get("artifact")
 
         if not isinstance(locked_path_value, str) or not locked_path_value.strip():
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_LOCKED_PATH_INVALID",
-                    f"milestone entry '{key}' has invalid locked_path",
-                    str(lock_path),
-                )
+            yield Finding(
+                "ERROR",
+                "MILESTONE_LOCKED_PATH_INVALID",
+                f"milestone entry '{key}' has invalid locked_path",
+                str(lock_path),
             )
             continue
 
-        if not isinstance(expected_hash, str) or not expected_hash.strip():
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_LOCK_HASH_INVALID",
-                    f"milestone entry '{key}' has invalid sha256",
-                    str(lock_path),
-                )
+        if algo not in ALGORITHMS or not expected_hash.strip():
+            yield Finding(
+                "ERROR",
+                "MILESTONE_LOCK_HASH_INVALID",
+                f"milestone entry '{key}' has invalid or unsupported digest ({algo or 'no algo'})",
+                str(lock_path),
             )
             continue
 
         if isinstance(lock_artifact_name, str) and lock_artifact_name != filename:
-            findings.append(
-                Finding(
-                    "WARN",
-                    "MILESTONE_LOCK_ARTIFACT_NAME_DRIFT",
-                    f"milestone entry '{key}' artifact name '{lock_artifact_name}' differs from workflow mapping '{filename}'",
-                    str(lock_path),
-                )
+            yield Finding(
+                "WARN",
+                "MILESTONE_LOCK_ARTIFACT_NAME_DRIFT",
+                f"milestone entry '{key}' artifact name '{lock_artifact_name}' differs from workflow mapping '{filename}'",
+                str(lock_path),
             )
 
         locked_path = resolve_lock_path(repo_root, locked_path_value)
-        if not locked_path.exists() or locked_path.stat().st_size == 0:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_LOCKED_FILE_MISSING",
-                    f"milestone locked file missing/empty for key '{key}': {locked_path}",
-                    str(locked_path),
-                )
+        locked_st = fs.stat(locked_path)
+        if locked_st is None or locked_st.st_size == 0:
+            yield Finding(
+                "ERROR",
+                "MILESTONE_LOCKED_FILE_MISSING",
+                f"milestone locked file missing/empty for key '{key}': {locked_path}",
+                str(locked_path),
             )
             continue
 
-        locked_hash = sha256_file(locked_path)
+        if quick and entry_stat_matches(entry, locked_st):
+            locked_hash = expected_hash
+        else:
+            locked_hash = digests.digest(locked_path, locked_st, algo=algo)
         if locked_hash != expected_hash:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_LOCK_HASH_MISMATCH",
-                    f"milestone locked file hash mismatch for key '{key}'",
-                    str(locked_path),
-                )
+            yield Finding(
+                "ERROR",
+                "MILESTONE_LOCK_HASH_MISMATCH",
+                f"milestone locked file hash mismatch for key '{key}'",
+                str(locked_path),
             )
             continue
 
         artifact_path = resolve_artifact_path(repo_root, artifacts_dir, filename)
-        if not artifact_path.exists() or artifact_path.stat().st_size == 0:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_ARTIFACT_MISSING",
-                    f"artifact missing/empty for milestone key '{key}': {artifact_path}",
-                    str(artifact_path),
-                )
+        artifact_st = fs.stat(artifact_path)
+        if artifact_st is None or artifact_st.st_size == 0:
+            yield Finding(
+                "ERROR",
+                "MILESTONE_ARTIFACT_MISSING",
+                f"artifact missing/empty for milestone key '{key}': {artifact_path}",
+                str(artifact_path),
             )
             continue
 
-        artifact_hash = sha256_file(artifact_path)
+        if quick and entry_stat_matches(entry, artifact_st):
+            continue
+
+        artifact_hash = digests.digest(artifact_path, artifact_st, algo=algo)
         if artifact_hash != expected_hash:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "MILESTONE_ARTIFACT_DRIFT",
-                    f"artifact drift detected for milestone key '{key}'",
-                    str(artifact_path),
-                )
+            yield Finding(
+                "ERROR",
+                "MILESTONE_ARTIFACT_DRIFT",
+                f"artifact drift detected for milestone key '{key}'",
+                str(artifact_path),
             )
 
-    return findings
+    return
+
+
+def check_milestone_consistency(**kwargs: Any) -> List[Finding]:
+    return list(iter_milestone_consistency(**kwargs))
 
 
-def check_state_against_workflow(
+def iter_state_against_workflow(
     repo_root: Path,
     state_path: Path,
     template_path: Path,
     workflow_meta: Dict[str, Any],
-) -> List[Finding]:
-    findings: List[Finding] = []
-
-    if not state_path.exists():
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_MISSING",
-                "workflow-state.json does not exist",
-                str(state_path),
-            )
+    digests: Optional[DigestCache] = None,
+    jobs: int = 1,
+    quick: bool = False,
+    fs: Optional[AuditFs] = None,
+    snapshot: Optional[AuditSnapshot] = None,
+    budget: Optional[AuditBudget] = None,
+) -> Iterator[Finding]:
+    """Yield state/evidence findings, cheapest checks first.
+
+    Structural checks of the state itself come first, then stat-only artifact
+    checks, then artifact content scans, then milestone hashing. ``budget`` is
+    consulted before each later group; checks it refuses are skipped.
+    """
+    fs = fs or AuditFs()
+    snapshot = snapshot or AuditSnapshot(None, "")
+
+    if not fs.exists(state_path):
+        yield Finding(
+            "ERROR",
+            "STATE_MISSING",
+            "workflow-state.json does not exist",
+            str(state_path),
         )
-        return findings
+        return
 
     state = load_json(state_path)
-    template = load_json(template_path) if template_path.exists() else {}
+    template = load_json(template_path) if fs.exists(template_path) else {}
 
     expected_fields = set(template.keys())
     state_fields = set(state.keys())
@@ -656,23 +1222,19 @@ def check_state_against_workflow(
     unknown_fields = sorted(state_fields - expected_fields)
 
     for field in missing_fields:
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_FIELD_MISSING",
-                f"workflow-state missing required field '{field}'",
-                str(state_path),
-            )
+        yield Finding(
+            "ERROR",
+            "STATE_FIELD_MISSING",
+            f"workflow-state missing required field '{field}'",
+            str(state_path),
         )
 
     for field in unknown_fields:
-        findings.append(
-            Finding(
-                "WARN",
-                "STATE_FIELD_UNKNOWN",
-                f"workflow-state has unknown field '{field}'",
-                str(state_path),
-            )
+        yield Finding(
+            "WARN",
+            "STATE_FIELD_UNKNOWN",
+            f"workflow-state has unknown field '{field}'",
+            str(state_path),
         )
 
     stage_ids: List[str] = workflow_meta["stage_ids"]
@@ -680,136 +1242,161 @@ def check_state_against_workflow(
     artifacts: Dict[str, str] = workflow_meta["artifacts"]
     artifacts_dir: str = workflow_meta["artifacts_dir"]
     stage_index = {sid: i for i, sid in enumerate(stage_ids)}
+    content_rules = content_rule_index(workflow_meta)
 
     current_stage = state.get("current_stage")
     completed = state.get("completed_stages")
     if not isinstance(completed, list):
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_COMPLETED_INVALID",
-                "completed_stages must be a list",
-                str(state_path),
-            )
+        yield Finding(
+            "ERROR",
+            "STATE_COMPLETED_INVALID",
+            "completed_stages must be a list",
+            str(state_path),
         )
         completed = []
 
     if not isinstance(current_stage, str) or current_stage not in stage_index:
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_CURRENT_STAGE_INVALID",
-                "current_stage is missing or not in workflow stages",
-                str(state_path),
-            )
+        yield Finding(
+            "ERROR",
+            "STATE_CURRENT_STAGE_INVALID",
+            "current_stage is missing or not in workflow stages",
+            str(state_path),
         )
     else:
         expected_prefix = stage_ids[: stage_index[current_stage]]
         if completed != expected_prefix:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "STATE_STAGE_SEQUENCE_INVALID",
-                    "completed_stages must exactly match stages before current_stage",
-                    str(state_path),
-                )
-            )
-
-    if len(completed) != len(set(completed)):
-        findings.append(
-            Finding(
+            yield Finding(
                 "ERROR",
-                "STATE_COMPLETED_DUPLICATE",
-                "completed_stages contains duplicates",
+                "STATE_STAGE_SEQUENCE_INVALID",
+                "completed_stages must exactly match stages before current_stage",
                 str(state_path),
             )
+
+    if len(completed) != len(set(completed)):
+        yield Finding(
+            "ERROR",
+            "STATE_COMPLETED_DUPLICATE",
+            "completed_stages contains duplicates",
+            str(state_path),
         )
 
     for sid in completed:
         if sid not in stage_index:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "STATE_COMPLETED_UNKNOWN",
-                    f"completed stage '{sid}' is unknown",
-                    str(state_path),
-                )
+            yield Finding(
+                "ERROR",
+                "STATE_COMPLETED_UNKNOWN",
+                f"completed stage '{sid}' is unknown",
+                str(state_path),
             )
 
     artifacts_created = state.get("artifacts_created", [])
     if not isinstance(artifacts_created, list):
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_ARTIFACTS_CREATED_INVALID",
-                "artifacts_created must be a list",
-                str(state_path),
-            )
+        yield Finding(
+            "ERROR",
+            "STATE_ARTIFACTS_CREATED_INVALID",
+            "artifacts_created must be a list",
+            str(state_path),
         )
         artifacts_created = []
 
+    # Checks run cheapest first: structural, then stat-only, then content
+    # scans, then milestone hashing, with the budget consulted in between.
+    budget = budget or AuditBudget()
+    outputs_done: List[Tuple[str, str, str]] = []  # (stage id, key, filename)
     for sid in completed:
         stage = stages[stage_index[sid]]
-        outputs = stage.get("outputs_required", [])
-        for key in outputs:
+        for key in stage.get("outputs_required", []):
             filename = artifacts.get(key)
             if not filename:
-                findings.append(
-                    Finding(
-                        "ERROR",
-                        "STATE_OUTPUT_UNMAPPED",
-                        f"stage '{sid}' output key '{key}' has no artifact mapping",
-                    )
+                yield Finding(
+                    "ERROR",
+                    "STATE_OUTPUT_UNMAPPED",
+                    f"stage '{sid}' output key '{key}' has no artifact mapping",
                 )
                 continue
+            outputs_done.append((sid, key, filename))
 
-            artifact_path = resolve_artifact_path(repo_root, artifacts_dir, filename)
-            if not artifact_path.exists():
-                findings.append(
-                    Finding(
-                        "ERROR",
-                        "STATE_OUTPUT_MISSING_FILE",
-                        f"stage '{sid}' expected artifact missing: {artifact_path}",
-                        str(artifact_path),
-                    )
-                )
-                continue
+    last_updated = iso_to_datetime(str(state.get("last_updated_at", "")))
+    if last_updated is None:
+        yield Finding(
+            "ERROR",
+            "STATE_LAST_UPDATED_INVALID",
+            "last_updated_at is missing or not valid ISO8601",
+            str(state_path),
+        )
 
-            if artifact_path.stat().st_size == 0:
-                findings.append(
-                    Finding(
-                        "ERROR",
-                        "STATE_OUTPUT_EMPTY_FILE",
-                        f"stage '{sid}' expected artifact is empty: {artifact_path}",
-                        str(artifact_path),
-                    )
-                )
-            else:
-                findings.extend(
-                    check_artifact_minimum_content(artifact_path, key, filename)
-                )
+    verification_policy = state.get("verification_policy")
+    if verification_policy not in {"default", "ask", "strict"}:
+        yield Finding(
+            "ERROR",
+            "STATE_VERIFICATION_POLICY_INVALID",
+            "verification_policy must be one of: default|ask|strict",
+            str(state_path),
+        )
 
-            if filename not in artifacts_created:
-                findings.append(
-                    Finding(
-                        "WARN",
-                        "STATE_OUTPUT_NOT_TRACKED",
-                        f"artifact '{filename}' exists for completed stage '{sid}' but is missing from state.artifacts_created",
-                        str(state_path),
-                    )
-                )
+    verification_decision = state.get("verification_decision")
+    if verification_decision not in {"unknown", "execute", "skip"}:
+        yield Finding(
+            "ERROR",
+            "STATE_VERIFICATION_DECISION_INVALID",
+            "verification_decision must be one of: unknown|execute|skip",
+            str(state_path),
+        )
 
-    last_updated = iso_to_datetime(str(state.get("last_updated_at", "")))
-    if last_updated is None:
-        findings.append(
-            Finding(
+    task_ids = state.get("task_ids", [])
+    if not isinstance(task_ids, list):
+        yield Finding(
+            "ERROR",
+            "STATE_TASK_IDS_INVALID",
+            "task_ids must be a list",
+            str(state_path),
+        )
+    elif "parallel_dev" in completed and not task_ids:
+        yield Finding(
+            "ERROR",
+            "STATE_TASK_IDS_EMPTY",
+            "parallel_dev is completed but task_ids is empty",
+            str(state_path),
+        )
+
+    if not budget.allows(fs, f"outputs:{state_path}"):
+        return
+    content_targets: List[Tuple[str, str, Path]] = []
+    for sid, key, filename in outputs_done:
+        artifact_path = resolve_artifact_path(repo_root, artifacts_dir, filename)
+        artifact_st = fs.stat(artifact_path)
+        if artifact_st is None:
+            yield Finding(
+                "ERROR",
+                "STATE_OUTPUT_MISSING_FILE",
+                f"stage '{sid}' expected artifact missing: {artifact_path}",
+                str(artifact_path),
+            )
+            continue
+
+        if artifact_st.st_size == 0:
+            yield Finding(
                 "ERROR",
-                "STATE_LAST_UPDATED_INVALID",
-                "last_updated_at is missing or not valid ISO8601",
+                "STATE_OUTPUT_EMPTY_FILE",
+                f"stage '{sid}' expected artifact is empty: {artifact_path}",
+                str(artifact_path),
+            )
+        else:
+            content_targets.append((key, filename, artifact_path))
+
+        if filename not in artifacts_created:
+            yield Finding(
+                "WARN",
+                "STATE_OUTPUT_NOT_TRACKED",
+                f"artifact '{filename}' exists for completed stage '{sid}' but is missing from state.artifacts_created",
                 str(state_path),
             )
-        )
-    elif isinstance(current_stage, str) and current_stage in stage_index:
+
+    if (
+        last_updated is not None
+        and isinstance(current_stage, str)
+        and current_stage in stage_index
+    ):
         stage = stages[stage_index[current_stage]]
         outputs = stage.get("outputs_required", [])
         stale_outputs: List[str] = []
@@ -818,70 +1405,39 @@ def check_state_against_workflow(
             if not filename:
                 continue
             artifact_path = resolve_artifact_path(repo_root, artifacts_dir, filename)
-            if artifact_path.exists():
+            artifact_st = fs.stat(artifact_path)
+            if artifact_st is not None:
                 mtime = dt.datetime.fromtimestamp(
-                    artifact_path.stat().st_mtime, tz=last_updated.tzinfo
+                    artifact_st.st_mtime, tz=last_updated.tzinfo
                 )
                 if mtime < last_updated:
                     stale_outputs.append(filename)
         if stale_outputs:
-            findings.append(
-                Finding(
-                    "WARN",
-                    "STATE_CURRENT_STAGE_STALE_OUTPUTS",
-                    (
-                        "current_stage already has older output artifacts before last_updated_at; "
-                        "possible stale evidence reuse: "
-                        + ", ".join(sorted(stale_outputs))
-                    ),
-                    str(state_path),
-                )
-            )
-
-    verification_policy = state.get("verification_policy")
-    if verification_policy not in {"default", "ask", "strict"}:
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_VERIFICATION_POLICY_INVALID",
-                "verification_policy must be one of: default|ask|strict",
+            yield Finding(
+                "WARN",
+                "STATE_CURRENT_STAGE_STALE_OUTPUTS",
+                (
+                    "current_stage already has older output artifacts before last_updated_at; "
+                    "possible stale evidence reuse: "
+                    + ", ".join(sorted(stale_outputs))
+                ),
                 str(state_path),
             )
-        )
 
-    verification_decision = state.get("verification_decision")
-    if verification_decision not in {"unknown", "execute", "skip"}:
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_VERIFICATION_DECISION_INVALID",
-                "verification_decision must be one of: unknown|execute|skip",
-                str(state_path),
+    for key, filename, artifact_path in content_targets:
+        if budget.allows(fs, f"content:{artifact_path}"):
+            yield from check_artifact_content_unit(
+                fs, snapshot, artifact_path, key, filename, content_rules
             )
-        )
 
-    task_ids = state.get("task_ids", [])
-    if not isinstance(task_ids, list):
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_TASK_IDS_INVALID",
-                "task_ids must be a list",
-                str(state_path),
-            )
-        )
-    elif "parallel_dev" in completed and not task_ids:
-        findings.append(
-            Finding(
-                "ERROR",
-                "STATE_TASK_IDS_EMPTY",
-                "parallel_dev is completed but task_ids is empty",
-                str(state_path),
-            )
-        )
+    if not budget.allows(fs, f"milestone:{state_path}"):
+        return
 
-    findings.extend(
-        check_milestone_consistency(
+    def milestone_unit() -> Iterator[Finding]:
+        # Inputs passed in from the caller: the state and workflow files.
+        fs.stat(state_path)
+        fs.stat(workflow_meta["path"])
+        return iter_milestone_consistency(
             repo_root=repo_root,
             state_path=state_path,
             state=state,
@@ -889,13 +1445,31 @@ def check_state_against_workflow(
             stage_index=stage_index,
             current_stage=current_stage,
             completed=completed,
+            digests=digests if digests is not None else DigestCache(None),
+            jobs=jobs,
+            quick=quick,
+            fs=fs,
         )
+
+    yield from snapshot.stream(
+        fs,
+        f"milestone:{state_path}:{workflow_meta['path']}",
+        milestone_unit,
+        encode_findings,
+        decode_findings,
     )
 
-    return findings
 
+def check_state_against_workflow(*args: Any, **kwargs: Any) -> List[Finding]:
+    return list(iter_state_against_workflow(*args, **kwargs))
 
-def print_findings(findings: Iterable[Finding]) -> int:
+
+def format_finding(item: Finding) -> str:
+    suffix = f" [{item.ref}]" if item.ref else ""
+    return f"{item.severity} {item.code}: {item.message}{suffix}"
+
+
+def summarize(findings: Iterable[Finding]) -> Tuple[int, int, int]:
     errors = 0
     warnings = 0
     infos = 0
@@ -906,14 +1480,238 @@ def print_findings(findings: Iterable[Finding]) -> int:
             warnings += 1
         else:
             infos += 1
-        suffix = f" [{item.ref}]" if item.ref else ""
-        print(f"{item.severity} {item.code}: {item.message}{suffix}")
+    return errors, warnings, infos
+
 
+def print_findings(findings: Iterable[Finding]) -> int:
+    findings = list(findings)
+    for item in findings:
+        print(format_finding(item))
+
+    errors, warnings, infos = summarize(findings)
     print(f"\nSummary: {errors} error(s), {warnings} warning(s), {infos} info")
     return 1 if errors else 0
 
 
-def parse_args() -> argparse.Namespace:
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+SARIF_LEVELS = {"ERROR": "error", "WARN": "warning", "INFO": "note"}
+
+
+class FindingEmitter(abc.ABC):
+    """Writes findings as they are produced, then a summary trailer.
+
+    ``grouped`` is true when several state files are audited; groups are
+    (None, workflow findings) followed by one group per state file.
+    """
+
+    def __init__(self, out: Any, repo_root: Path, grouped: bool) -> None:
+        self.out = out
+        self.repo_root = repo_root
+        self.grouped = grouped
+
+    def start(self) -> None:
+        pass
+
+    def begin(self, state_path: Optional[Path]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def finding(self, item: Finding, state_path: Optional[Path]) -> None:
+        """Write one finding (or hold it until ``end``)."""
+
+    def end(self, state_path: Optional[Path], counts: List[int]) -> None:
+        pass
+
+    @abc.abstractmethod
+    def finish(self, counts: List[int], states: int, failing: int) -> None:
+        """Write the trailer: totals (errors, warnings, infos), states audited
+        and states with errors."""
+
+
+class TextEmitter(FindingEmitter):
+    """The classic report; with several states, one counted section per state."""
+
+    def begin(self, state_path: Optional[Path]) -> None:
+        self._held: List[Finding] = []
+
+    def finding(self, item: Finding, state_path: Optional[Path]) -> None:
+        if self.grouped and state_path is not None:
+            # The section header carries the state's counts: hold its lines.
+            self._held.append(item)
+        else:
+            print(format_finding(item), file=self.out, flush=True)
+
+    def end(self, state_path: Optional[Path], counts: List[int]) -> None:
+        if not self.grouped or state_path is None:
+            return
+        print(
+            f"== {state_path}: {counts[0]} error(s), {counts[1]} warning(s),"
+            f" {counts[2]} info",
+            file=self.out,
+        )
+        for item in self._held:
+            print(format_finding(item), file=self.out)
+        self.out.flush()
+
+    def finish(self, counts: List[int], states: int, failing: int) -> None:
+        print(file=self.out)
+        if self.grouped:
+            print(f"States: {states} audited, {failing} with errors", file=self.out)
+        print(
+            f"Summary: {counts[0]} error(s), {counts[1]} warning(s), {counts[2]} info",
+            file=self.out,
+        )
+
+
+class JsonLinesEmitter(FindingEmitter):
+    """One JSON object per line: {"type": "finding", ...}, then {"type": "summary"}."""
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self.out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.out.flush()
+
+    def finding(self, item: Finding, state_path: Optional[Path]) -> None:
+        self._write(
+            {
+                "type": "finding",
+                "severity": item.severity,
+                "code": item.code,
+                "message": item.message,
+                "ref": item.ref,
+                "state": None if state_path is None else str(state_path),
+            }
+        )
+
+    def finish(self, counts: List[int], states: int, failing: int) -> None:
+        self._write(
+            {
+                "type": "summary",
+                "errors": counts[0],
+                "warnings": counts[1],
+                "infos": counts[2],
+                "states": states,
+                "states_with_errors": failing,
+            }
+        )
+
+
+class SarifEmitter(FindingEmitter):
+    """A SARIF 2.1.0 log written incrementally: each result is flushed as it is
+    found, and the summary goes into the run's properties at the end."""
+
+    def start(self) -> None:
+        self._first = True
+        header = json.dumps(
+            {
+                "version": "2.1.0",
+                "$schema": SARIF_SCHEMA,
+                "runs": [
+                    {
+                        "tool": {"driver": {"name": "bmad-audit-workflow"}},
+                        "originalUriBaseIds": {
+                            "REPO": {"uri": self.repo_root.resolve().as_uri() + "/"}
+                        },
+                        "results": [],
+                    }
+                ],
+            }
+        )
+        # Leave the document open after "results": [ and stream into it.
+        self.out.write(header[: -len("]}]}")])
+        self.out.flush()
+
+    def _location(self, ref: str) -> Dict[str, Any]:
+        path = Path(ref)
+        try:
+            rel = path.relative_to(self.repo_root)
+        except ValueError:
+            return {"uri": path.as_uri() if path.is_absolute() else path.as_posix()}
+        return {"uri": rel.as_posix(), "uriBaseId": "REPO"}
+
+    def finding(self, item: Finding, state_path: Optional[Path]) -> None:
+        result: Dict[str, Any] = {
+            "ruleId": item.code,
+            "level": SARIF_LEVELS.get(item.severity, "note"),
+            "message": {"text": item.message},
+        }
+        if item.ref:
+            result["locations"] = [
+                {"physicalLocation": {"artifactLocation": self._location(item.ref)}}
+            ]
+        if state_path is not None:
+            result["properties"] = {"state": str(state_path)}
+        self.out.write(("" if self._first else ",") + "\n" + json.dumps(result))
+        self._first = False
+        self.out.flush()
+
+    def finish(self, counts: List[int], states: int, failing: int) -> None:
+        summary = {
+            "errors": counts[0],
+            "warnings": counts[1],
+            "infos": counts[2],
+            "states": states,
+            "states_with_errors": failing,
+        }
+        self.out.write(
+            "\n],"
+            + json.dumps(
+                {
+                    "invocations": [{"executionSuccessful": True}],
+                    "properties": {"summary": summary},
+                }
+            )[1:]
+            + "]}\n"
+        )
+        self.out.flush()
+
+
+EMITTERS = {"text": TextEmitter, "jsonl": JsonLinesEmitter, "sarif": SarifEmitter}
+
+
+def emit_findings(groups: LazyFindingGroups, emitter: FindingEmitter) -> int:
+    """Feed lazily produced finding groups to ``emitter``; exit code as print_findings."""
+    totals = [0, 0, 0]
+    states = failing = 0
+    emitter.start()
+    for state_path, findings in groups:
+        counts = [0, 0, 0]
+        emitter.begin(state_path)
+        for item in findings:
+            counts[{"ERROR": 0, "WARN": 1}.get(item.severity, 2)] += 1
+            emitter.finding(item, state_path)
+        emitter.end(state_path, counts)
+        if state_path is not None:
+            states += 1
+            failing += 1 if counts[0] else 0
+        totals = [total + count for total, count in zip(totals, counts)]
+    emitter.finish(totals, states, failing)
+    return 1 if totals[0] else 0
+
+
+def finding_delta(
+    before: List[Finding], after: List[Finding]
+) -> Tuple[List[Finding], List[Finding]]:
+    """(new, resolved) findings between two runs, each in its run's order."""
+    before_counts = Counter(format_finding(item) for item in before)
+    after_counts = Counter(format_finding(item) for item in after)
+    new: List[Finding] = []
+    for item in after:
+        key = format_finding(item)
+        if before_counts[key] > 0:
+            before_counts[key] -= 1
+        else:
+            new.append(item)
+    resolved: List[Finding] = []
+    for item in before:
+        key = format_finding(item)
+        if after_counts[key] > 0:
+            after_counts[key] -= 1
+        else:
+            resolved.append(item)
+    return new, resolved
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Audit BMAD workflow and state consistency."
     )
@@ -924,118 +1722,744 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument(
         "--state",
-        default=".bmad/artifacts/workflow-state.json",
-        help="workflow-state.json path",
+        default=DEFAULT_STATE_PATH,
+        help="workflow-state.json path, or a glob / directory of state files",
     )
     parser.add_argument(
         "--template",
-        default=".bmad/templates/workflow-state.template.json",
+        default=DEFAULT_TEMPLATE_PATH,
         help="workflow-state template path",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--no-digest-cache",
+        action="store_true",
+        help="do not read or update the on-disk digest and parse caches (.bmad/cache/)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="parallel threads for state audits and milestone hashing "
+        "(default: CPU count)",
+    )
+    depth = parser.add_mutually_exclusive_group()
+    depth.add_argument(
+        "--quick",
+        action="store_true",
+        help="trust milestone files whose size and mtime_ns match the lock entry",
+    )
+    depth.add_argument(
+        "--paranoid",
+        action="store_true",
+        help="rehash every milestone file, ignoring the digest and audit caches",
+    )
+    parser.add_argument(
+        "--no-incremental",
+        action="store_true",
+        help="re-run every check instead of replaying unchanged ones from .bmad/cache/",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running; re-audit on changes and print new/resolved findings",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=DEFAULT_DEBOUNCE,
+        help="with --watch: seconds without further changes before re-auditing",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="with --watch: poll with scandir instead of using inotify",
+    )
+    parser.add_argument(
+        "--repos",
+        nargs="+",
+        metavar="ROOT",
+        help="audit these repository roots instead of the current directory",
+    )
+    parser.add_argument(
+        "--repos-file",
+        help="file listing repository roots, one per line (# comments; relative "
+        "paths are relative to the file)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=default_jobs(),
+        help="with --repos/--repos-file: worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        metavar="N",
+        help="stop running further checks once N errors were found",
+    )
+    parser.add_argument(
+        "--time-budget",
+        type=float,
+        metavar="SECONDS",
+        help="stop running further checks after SECONDS; checks run cheapest "
+        "first (structural, stat-only, content scans, milestone hashing)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=sorted(EMITTERS),
+        default="text",
+        help="output format; jsonl and sarif stream findings as they are found",
+    )
+    args = parser.parse_args(argv)
+    if args.watch and (args.repos or args.repos_file):
+        parser.error("--watch cannot be combined with --repos/--repos-file")
+    if args.max_errors is not None and args.max_errors < 1:
+        parser.error("--max-errors must be at least 1")
+    if args.time_budget is not None and args.time_budget <= 0:
+        parser.error("--time-budget must be positive")
+    if args.format != "text" and (args.watch or args.repos or args.repos_file):
+        parser.error("--format jsonl|sarif cannot be combined with --watch or --repos")
+    return args
+
+
+def encode_workflow_result(
+    result: Tuple[List[Finding], Dict[str, Any]]
+) -> Dict[str, Any]:
+    wf_findings, meta = result
+    return {
+        "findings": encode_findings(wf_findings),
+        "meta": {**meta, "path": str(meta["path"])},
+    }
 
 
-def main() -> int:
-    args = parse_args()
-    repo_root = Path.cwd()
+def decode_workflow_result(
+    value: Dict[str, Any]
+) -> Tuple[List[Finding], Dict[str, Any]]:
+    meta = dict(value["meta"])
+    meta["path"] = Path(meta["path"])
+    return decode_findings(value["findings"]), meta
+
+
+# Batch mode: content hash -> check_workflow_definition() result, parsed once
+# in the parent and handed to every worker.
+_SHARED_WORKFLOWS: Dict[str, Tuple[List[Finding], Dict[str, Any]]] = {}
+
+
+def file_content_hash(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+_WORKFLOW_CHECK_SALT: List[str] = []
+
+
+def workflow_check_salt() -> str:
+    """Changes whenever check_workflow_definition (or the lock format defaults
+    it reads from parse_cache) does."""
+    if not _WORKFLOW_CHECK_SALT:
+        here = Path(__file__).resolve().parent
+        _WORKFLOW_CHECK_SALT.append(
+            snapshot_salt([here / "audit_workflow.py", here / "parse_cache.py"])[:16]
+        )
+    return _WORKFLOW_CHECK_SALT[0]
+
+
+def check_workflow_shared(path: Path) -> Tuple[List[Finding], Dict[str, Any]]:
+    """check_workflow_definition(), reusing a result for identical content: one
+    shared by the batch parent, or one from the parsed cache."""
+    shared = (
+        _SHARED_WORKFLOWS.get(file_content_hash(path)) if _SHARED_WORKFLOWS else None
+    )
+    if shared is None:
+        shared = decode_workflow_result(
+            parsed_cache().load(
+                path,
+                f"workflow:{workflow_check_salt()}",
+                lambda data: encode_workflow_result(
+                    check_workflow_definition(
+                        path, yaml_mapping(parse_yaml(data), path)
+                    )
+                ),
+            )
+        )
+    # The result depends only on the content; re-point it at this file.
+    wf_findings, meta = shared
+    source = str(meta["path"])
+    return (
+        [
+            Finding(item.severity, item.code, item.message, str(path))
+            if item.ref == source
+            else item
+            for item in wf_findings
+        ],
+        {**meta, "path": path},
+    )
+
+
+def check_workflow_unit(
+    fs: AuditFs, snapshot: AuditSnapshot, path: Path
+) -> Tuple[List[Finding], Dict[str, Any]]:
+    def compute() -> Tuple[List[Finding], Dict[str, Any]]:
+        fs.stat(path)
+        return check_workflow_shared(path)
+
+    return snapshot.run(
+        fs,
+        f"workflow:{path}",
+        compute,
+        encode_workflow_result,
+        decode_workflow_result,
+    )
+
+
+def iter_state_audit(
+    *,
+    repo_root: Path,
+    state_path: Path,
+    template_path: Path,
+    workflow_meta_by_path: Dict[str, Dict[str, Any]],
+    fs: AuditFs,
+    snapshot: AuditSnapshot,
+    digests: DigestCache,
+    jobs: int,
+    quick: bool,
+    budget: Optional[AuditBudget] = None,
+) -> Iterator[Finding]:
+    if not fs.exists(state_path):
+        yield Finding(
+            "WARN",
+            "STATE_NOT_FOUND",
+            "workflow-state file not found; runtime checks skipped",
+            str(state_path),
+        )
+        return
 
-    workflow_paths = args.workflow or [
+    try:
+        state = load_json(state_path)
+        state_workflow_path = state.get("workflow_path")
+        if isinstance(state_workflow_path, str) and state_workflow_path.strip():
+            resolved = fs.resolve(repo_root / state_workflow_path)
+            meta = workflow_meta_by_path.get(str(resolved))
+            if meta is None and fs.exists(resolved):
+                wf_findings, meta = check_workflow_unit(fs, snapshot, resolved)
+                yield from wf_findings
+                workflow_meta_by_path[str(resolved)] = meta
+
+            if meta:
+                yield from iter_state_against_workflow(
+                    repo_root=repo_root,
+                    state_path=state_path,
+                    template_path=template_path,
+                    workflow_meta=meta,
+                    digests=digests,
+                    jobs=jobs,
+                    quick=quick,
+                    fs=fs,
+                    snapshot=snapshot,
+                    budget=budget,
+                )
+            else:
+                yield Finding(
+                    "ERROR",
+                    "STATE_WORKFLOW_UNRESOLVED",
+                    "state.workflow_path cannot be resolved for state validation",
+                    str(state_path),
+                )
+        else:
+            yield Finding(
+                "ERROR",
+                "STATE_WORKFLOW_PATH_MISSING",
+                "state.workflow_path is missing",
+                str(state_path),
+            )
+    except Exception as exc:
+        yield Finding(
+            "ERROR",
+            "STATE_LOAD_FAILED",
+            f"failed to parse state: {exc}",
+            str(state_path),
+        )
+    return
+
+
+def workflow_paths(args: argparse.Namespace) -> List[str]:
+    return args.workflow or [
         ".bmad/workflows/workflow.yml",
         ".bmad/workflows/bugfix.yml",
     ]
-    workflow_paths_resolved = [repo_root / p for p in workflow_paths]
 
-    findings: List[Finding] = []
-    workflow_meta_by_path: Dict[str, Dict[str, Any]] = {}
 
+def is_glob(value: str) -> bool:
+    return any(ch in value for ch in "*?[")
+
+
+def state_paths(repo_root: Path, value: str) -> List[Path]:
+    """State files named by --state: one path, a glob, or a directory's *.json."""
+    path = repo_root / value
+    if is_glob(value):
+        import glob
+
+        return sorted(
+            Path(match)
+            for match in glob.glob(str(path), recursive=True)
+            if os.path.isfile(match)
+        )
+    if path.is_dir():
+        return sorted(child for child in path.glob("*.json") if child.is_file())
+    return [path]
+
+
+def state_watch_root(repo_root: Path, value: str) -> Root:
+    """Directory to watch for --state: a glob's static prefix, or the state dir."""
+    path = repo_root / value
+    if is_glob(value):
+        base = Path(path.anchor)
+        for part in path.parts[len(base.parts) :]:
+            if is_glob(part):
+                break
+            base = base / part
+        return base, True
+    if path.is_dir():
+        return path, False
+    return path.parent, False
+
+
+# run_audit() groups: (None, workflow findings) first, then (state path, findings).
+FindingGroups = List[Tuple[Optional[Path], List[Finding]]]
+LazyFindingGroups = Iterator[Tuple[Optional[Path], Iterator[Finding]]]
+
+
+def flatten_groups(groups: FindingGroups) -> List[Finding]:
+    return [item for _, findings in groups for item in findings]
+
+
+def iter_workflow_findings(
+    workflow_paths_resolved: List[Path],
+    workflow_meta_by_path: Dict[str, Dict[str, Any]],
+    *,
+    fs: AuditFs,
+    snapshot: AuditSnapshot,
+) -> Iterator[Finding]:
+    """Check each workflow file, recording its metadata in ``workflow_meta_by_path``."""
     for wf_path in workflow_paths_resolved:
-        if not wf_path.exists():
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "WF_FILE_MISSING",
-                    "workflow file does not exist",
-                    str(wf_path),
-                )
+        if not fs.exists(wf_path):
+            yield Finding(
+                "ERROR",
+                "WF_FILE_MISSING",
+                "workflow file does not exist",
+                str(wf_path),
             )
             continue
 
         try:
-            wf_findings, meta = check_workflow_definition(wf_path)
-            findings.extend(wf_findings)
-            workflow_meta_by_path[str(wf_path.resolve())] = meta
+            wf_findings, meta = check_workflow_unit(fs, snapshot, wf_path)
         except Exception as exc:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "WF_LOAD_FAILED",
-                    f"failed to parse workflow: {exc}",
-                    str(wf_path),
-                )
+            yield Finding(
+                "ERROR",
+                "WF_LOAD_FAILED",
+                f"failed to parse workflow: {exc}",
+                str(wf_path),
             )
+            continue
+        workflow_meta_by_path[str(fs.resolve(wf_path))] = meta
+        yield from wf_findings
+
+
+def iter_audit(
+    args: argparse.Namespace,
+    repo_root: Path,
+    *,
+    fs: AuditFs,
+    snapshot: AuditSnapshot,
+    digests: DigestCache,
+    paths: Optional[List[Path]] = None,
+) -> LazyFindingGroups:
+    """run_audit(), lazily: each group's findings are produced as the caller
+    consumes them. Exhaust a group before asking for the next one.
+    ``paths`` are the state files, if the caller already expanded --state.
+
+    Checks run cheapest first under the --max-errors / --time-budget budget;
+    if it skipped anything, a final (None, [AUDIT_CHECKS_SKIPPED]) group says what.
+    """
+    budget = AuditBudget(args.max_errors, args.time_budget)
+    workflow_meta_by_path: Dict[str, Dict[str, Any]] = {}
+    yield None, budget.track(
+        iter_workflow_findings(
+            [repo_root / p for p in workflow_paths(args)],
+            workflow_meta_by_path,
+            fs=fs,
+            snapshot=snapshot,
+        )
+    )
 
-    state_path = repo_root / args.state
     template_path = repo_root / args.template
+    # Shared, read-only, by every state. iter_state_audit() adds workflows only
+    # a state names to its own copy, so states never write to shared state and
+    # each one reports such workflows regardless of scheduling.
+    workflow_metas = list(workflow_meta_by_path.values())
+    workflow_keys = ",".join(sorted(workflow_meta_by_path))
+
+    if paths is None:
+        paths = state_paths(repo_root, args.state)
+    # Split --jobs between the states and the hashing inside each one, so the
+    # nested pools stay within the budget.
+    state_jobs = max(1, min(len(paths), args.jobs))
+    hash_jobs = max(1, args.jobs // state_jobs)
+
+    def audit_one(state_path: Path) -> Iterator[Finding]:
+        if not budget.allows(fs, f"state:{state_path}"):
+            return iter(())
+
+        def state_unit() -> Iterator[Finding]:
+            # Workflow metadata comes from the units above; depend on their files.
+            for meta in workflow_metas:
+                fs.stat(meta["path"])
+            return iter_state_audit(
+                repo_root=repo_root,
+                state_path=state_path,
+                template_path=template_path,
+                workflow_meta_by_path=dict(workflow_meta_by_path),
+                fs=fs,
+                snapshot=snapshot,
+                digests=digests,
+                jobs=hash_jobs,
+                quick=args.quick,
+                budget=budget,
+            )
+
+        return snapshot.stream(
+            fs,
+            f"state:{state_path}:{template_path}:{workflow_keys}",
+            state_unit,
+            encode_findings,
+            decode_findings,
+        )
+
+    if not paths:
+        yield repo_root / args.state, iter(
+            [
+                Finding(
+                    "WARN",
+                    "STATE_NOT_FOUND",
+                    "no workflow-state files match; runtime checks skipped",
+                    str(repo_root / args.state),
+                )
+            ]
+        )
+    elif len(paths) == 1:
+        yield paths[0], budget.track(audit_one(paths[0]))
+    else:
+        results = iter_parallel(
+            lambda path: list(budget.track(audit_one(path))), paths, state_jobs
+        )
+        for state_path, findings in zip(paths, results):
+            yield state_path, iter(findings)
+
+    skipped = budget.findings()
+    if skipped:
+        yield None, iter(skipped)
+
+
+def run_audit(
+    args: argparse.Namespace,
+    repo_root: Path,
+    *,
+    fs: AuditFs,
+    snapshot: AuditSnapshot,
+    digests: DigestCache,
+) -> FindingGroups:
+    return [
+        (state_path, list(findings))
+        for state_path, findings in iter_audit(
+            args, repo_root, fs=fs, snapshot=snapshot, digests=digests
+        )
+    ]
+
+
+def audit_snapshot_salt(args: argparse.Namespace) -> str:
+    here = Path(__file__).resolve().parent
+    return snapshot_salt(
+        [
+            here / "audit_workflow.py",
+            here / "audit_snapshot.py",
+            here / "file_digest.py",
+            here / "parse_cache.py",
+        ],
+        f"quick={args.quick}",
+    )
+
+
+def watch_roots(
+    args: argparse.Namespace, repo_root: Path, fs: AuditFs, snapshot: AuditSnapshot
+) -> List[Root]:
+    """Directories whose changes can affect findings: the workflow, state and
+    template directories, plus each workflow's artifacts and milestone dirs."""
+    roots: Dict[str, bool] = {}
 
-    if state_path.exists():
+    def add(path: Path, recursive: bool) -> None:
+        key = os.path.abspath(path)
+        roots[key] = roots.get(key, False) or recursive
+
+    for value in workflow_paths(args):
+        wf_path = repo_root / value
+        add(wf_path.parent, False)
+        if not fs.exists(wf_path):
+            continue
         try:
-            state = load_json(state_path)
-            state_workflow_path = state.get("workflow_path")
-            if isinstance(state_workflow_path, str) and state_workflow_path.strip():
-                resolved = (repo_root / state_workflow_path).resolve()
-                meta = workflow_meta_by_path.get(str(resolved))
-                if meta is None and resolved.exists():
-                    wf_findings, meta = check_workflow_definition(resolved)
-                    findings.extend(wf_findings)
-                    workflow_meta_by_path[str(resolved)] = meta
-
-                if meta:
-                    findings.extend(
-                        check_state_against_workflow(
-                            repo_root=repo_root,
-                            state_path=state_path,
-                            template_path=template_path,
-                            workflow_meta=meta,
-                        )
+            _, meta = check_workflow_unit(fs, snapshot, wf_path)
+        except Exception:
+            continue
+        if isinstance(meta["artifacts_dir"], str):
+            add(repo_root / meta["artifacts_dir"], True)
+        milestone_dir = meta["milestone"]["dir"]
+        if meta["milestone"]["enabled"] and isinstance(milestone_dir, str):
+            add(repo_root / milestone_dir, True)
+    add(*state_watch_root(repo_root, args.state))
+    add((repo_root / args.template).parent, False)
+    return [(Path(path), recursive) for path, recursive in sorted(roots.items())]
+
+
+def watch(
+    args: argparse.Namespace,
+    repo_root: Path,
+    digests: DigestCache,
+    snapshot: AuditSnapshot,
+) -> int:
+    """Audit once, then re-audit after every debounced batch of changes and
+    print only new (+) and resolved (-) findings."""
+    from fs_watch import is_under, open_watcher, wait_for_changes
+
+    fs = AuditFs()
+    findings = flatten_groups(
+        run_audit(args, repo_root, fs=fs, snapshot=snapshot, digests=digests)
+    )
+    print_findings(findings)
+    save_caches(digests, snapshot)
+
+    roots = watch_roots(args, repo_root, fs, snapshot)
+    watcher = open_watcher(roots, force_polling=args.poll)
+    cache_dir = os.path.abspath(repo_root / ".bmad" / "cache")
+    print(
+        f"\nWatching {len(roots)} dir(s) with {type(watcher).__name__}; Ctrl-C to stop."
+    )
+    try:
+        while True:
+            changed = {
+                path
+                for path in wait_for_changes(watcher, args.debounce)
+                if not is_under(path, [(Path(cache_dir), True)])
+            }
+            if not changed:
+                continue
+            changed_roots = [(Path(path), True) for path in changed]
+            # Keep memoized stats only for watched paths that did not change;
+            # anything outside the watched dirs is stat'ed again.
+            fs.forget(
+                lambda path: is_under(path, roots)
+                and not is_under(path, changed_roots)
+            )
+            current = flatten_groups(
+                run_audit(args, repo_root, fs=fs, snapshot=snapshot, digests=digests)
+            )
+            save_caches(digests, snapshot)
+
+            new, resolved = finding_delta(findings, current)
+            findings = current
+            stamp = dt.datetime.now().strftime("%H:%M:%S")
+            print(f"\n[{stamp}] {len(changed)} changed path(s)")
+            for item in new:
+                print(f"+ {format_finding(item)}")
+            for item in resolved:
+                print(f"- {format_finding(item)}")
+            errors, warnings, infos = summarize(findings)
+            print(
+                f"Summary: {errors} error(s), {warnings} warning(s), {infos} info"
+                f" ({len(new)} new, {len(resolved)} resolved)"
+            )
+            sys.stdout.flush()
+
+            new_roots = watch_roots(args, repo_root, fs, snapshot)
+            if new_roots != roots:
+                watcher.close()
+                roots = new_roots
+                watcher = open_watcher(roots, force_polling=args.poll)
+    except KeyboardInterrupt:
+        return 1 if summarize(findings)[0] else 0
+    finally:
+        watcher.close()
+
+
+def repo_caches(
+    args: argparse.Namespace, repo_root: Path
+) -> Tuple[DigestCache, AuditSnapshot]:
+    digests = DigestCache.for_repo(
+        repo_root, enabled=not (args.no_digest_cache or args.paranoid)
+    )
+    snapshot = AuditSnapshot.for_repo(
+        repo_root,
+        audit_snapshot_salt(args),
+        enabled=not (args.no_incremental or args.paranoid),
+    )
+    use_parsed_cache(
+        ParsedCache.for_repo(
+            repo_root, enabled=not (args.no_digest_cache or args.paranoid)
+        )
+    )
+    return digests, snapshot
+
+
+def save_caches(digests: DigestCache, snapshot: AuditSnapshot) -> None:
+    digests.save()
+    snapshot.save()
+    parsed_cache().save()
+
+
+def audit_repo(args: argparse.Namespace, repo_root: Path) -> FindingGroups:
+    """One full audit of ``repo_root``, saving its caches afterwards."""
+    digests, snapshot = repo_caches(args, repo_root)
+    groups = run_audit(
+        args, repo_root, fs=AuditFs(), snapshot=snapshot, digests=digests
+    )
+    save_caches(digests, snapshot)
+    return groups
+
+
+def read_repo_list(args: argparse.Namespace) -> List[Path]:
+    """Repository roots from --repos and --repos-file, deduplicated, in order."""
+    values: List[Path] = [Path(value) for value in args.repos or []]
+    if args.repos_file:
+        list_path = Path(args.repos_file)
+        for line in list_path.read_text(encoding="utf-8").splitlines():
+            line = line.split("#", 1)[0].strip()
+            if line:
+                values.append(list_path.parent / line)
+    roots: Dict[str, Path] = {}
+    for value in values:
+        roots.setdefault(os.path.abspath(value), Path(os.path.abspath(value)))
+    return list(roots.values())
+
+
+def shared_workflow_results(
+    args: argparse.Namespace, repo_roots: List[Path]
+) -> Dict[str, Tuple[List[Finding], Dict[str, Any]]]:
+    """Parse each distinct workflow file content across ``repo_roots`` once."""
+    shared: Dict[str, Tuple[List[Finding], Dict[str, Any]]] = {}
+    failed: Set[str] = set()
+    for repo_root in repo_roots:
+        for value in workflow_paths(args):
+            wf_path = repo_root / value
+            try:
+                digest = file_content_hash(wf_path)
+            except OSError:
+                continue
+            if digest in shared or digest in failed:
+                continue
+            try:
+                shared[digest] = check_workflow_definition(wf_path)
+            except Exception:
+                # Let each repo's own audit report the parse failure.
+                failed.add(digest)
+    return shared
+
+
+def _init_batch_worker(
+    shared: Dict[str, Tuple[List[Finding], Dict[str, Any]]]
+) -> None:
+    _SHARED_WORKFLOWS.update(shared)
+
+
+def batch_audit(args: argparse.Namespace) -> int:
+    """Audit every repo from --repos/--repos-file on a process pool."""
+    try:
+        repo_roots = read_repo_list(args)
+    except OSError as exc:
+        print(f"ERROR: cannot read --repos-file: {exc}", file=sys.stderr)
+        return 2
+    from concurrent.futures import ProcessPoolExecutor
+
+    shared = shared_workflow_results(args, repo_roots)
+
+    results: List[Tuple[Path, List[Finding]]] = []
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(args.processes, len(repo_roots) or 1)),
+        initializer=_init_batch_worker,
+        initargs=(shared,),
+    ) as pool:
+        futures = {
+            repo_root: pool.submit(audit_repo, args, repo_root)
+            for repo_root in repo_roots
+            if repo_root.is_dir()
+        }
+        for repo_root in repo_roots:
+            future = futures.get(repo_root)
+            if future is None:
+                findings = [
+                    Finding(
+                        "ERROR",
+                        "REPO_NOT_FOUND",
+                        "repository root is not a directory",
+                        str(repo_root),
                     )
-                else:
-                    findings.append(
+                ]
+            else:
+                try:
+                    findings = flatten_groups(future.result())
+                except Exception as exc:
+                    findings = [
                         Finding(
                             "ERROR",
-                            "STATE_WORKFLOW_UNRESOLVED",
-                            "state.workflow_path cannot be resolved for state validation",
-                            str(state_path),
+                            "REPO_AUDIT_FAILED",
+                            f"audit failed: {exc}",
+                            str(repo_root),
                         )
-                    )
-            else:
-                findings.append(
-                    Finding(
-                        "ERROR",
-                        "STATE_WORKFLOW_PATH_MISSING",
-                        "state.workflow_path is missing",
-                        str(state_path),
-                    )
-                )
-        except Exception as exc:
-            findings.append(
-                Finding(
-                    "ERROR",
-                    "STATE_LOAD_FAILED",
-                    f"failed to parse state: {exc}",
-                    str(state_path),
-                )
-            )
-    else:
-        findings.append(
-            Finding(
-                "WARN",
-                "STATE_NOT_FOUND",
-                "workflow-state file not found; runtime checks skipped",
-                str(state_path),
-            )
+                    ]
+            results.append((repo_root, findings))
+
+    totals = [0, 0, 0]
+    failing = 0
+    for repo_root, findings in results:
+        counts = summarize(findings)
+        totals = [total + count for total, count in zip(totals, counts)]
+        failing += 1 if counts[0] else 0
+        print(
+            f"== {repo_root}: {counts[0]} error(s), {counts[1]} warning(s),"
+            f" {counts[2]} info"
         )
+        for item in findings:
+            print(format_finding(item))
+    print(
+        f"\nRepos: {len(results)} audited, {failing} with errors,"
+        f" {len(shared)} distinct workflow file(s) parsed once"
+    )
+    print(f"Summary: {totals[0]} error(s), {totals[1]} warning(s), {totals[2]} info")
+    return 1 if totals[0] else 0
+
 
-    return print_findings(findings)
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.repos or args.repos_file:
+        return batch_audit(args)
+
+    repo_root = Path.cwd()
+    if args.watch:
+        digests, snapshot = repo_caches(args, repo_root)
+        return watch(args, repo_root, digests, snapshot)
+    digests, snapshot = repo_caches(args, repo_root)
+    paths = state_paths(repo_root, args.state)
+    emitter = EMITTERS[args.format](sys.stdout, repo_root, grouped=len(paths) > 1)
+    try:
+        return emit_findings(
+            iter_audit(
+                args,
+                repo_root,
+                fs=AuditFs(),
+                snapshot=snapshot,
+                digests=digests,
+                paths=paths,
+            ),
+            emitter,
+        )
+    finally:
+        save_caches(digests, snapshot)
 
 
 if __name__ == "__main__":
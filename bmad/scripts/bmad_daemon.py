@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""Optional resident daemon for audit_workflow.py and milestone_lock.py.
+
+Every CLI invocation pays interpreter startup, module imports, workflow parsing
+and cache loading. The daemon pays them once: it imports both scripts, keeps
+their caches (digests, parsed documents, audit snapshot) resident in memory
+(see file_digest.keep_caches_resident) and runs commands in-process on request.
+Cached entries are re-validated against stat fingerprints or content hashes on
+every use, so file changes are picked up by the next command without a watcher.
+
+Commands:
+  serve   - run the daemon in the foreground
+  start   - start the daemon in the background (no-op when already running)
+  stop    - ask a running daemon to exit
+  status  - show whether a daemon is running, with request and cache counters
+
+The daemon listens on a Unix domain socket, by default
+<repo>/.bmad/cache/bmad-daemon.sock (override with BMAD_DAEMON_SOCKET; socket
+paths are limited to ~100 bytes). The protocol is JSON-RPC 2.0 with one JSON
+document per line; methods are ``run`` (params: script, argv, cwd, and
+optionally env and stream), ``ping``, ``stats`` and ``shutdown``. ``run``
+returns ``{exit_code, stdout, stderr}``. With ``stream: true`` output is not
+buffered: each complete line is sent as it is written, in an ``output``
+notification (params: stream, data), and the result's stdout and stderr hold
+only what was left unflushed. ``forward`` streams, so audit --format jsonl or
+sarif reaches the caller finding by finding as it does in-process.
+
+Both CLIs call ``forward`` before importing anything else: when a daemon is
+listening in the current directory they print its result and exit, otherwise
+they run the command themselves. Set BMAD_NO_DAEMON=1 to always run
+in-process. Long-running or process-pool modes (audit --watch, --repos,
+--repos-file) are never forwarded.
+
+The client path imports only os and sys unless a socket file exists, so
+forwarding costs CLI startup nothing when no daemon is running.
+
+Commands run one at a time: both scripts use the process-wide working
+directory, environment and stdout. Each command runs with the environment the
+client sent (``forward`` sends its own), BMAD_HASH_* tuning included, and the
+daemon's is restored afterwards. The daemon refuses work (and exits) once the
+scripts on disk differ from the code it loaded, and exits after --idle-timeout
+seconds without requests. ``serve`` holds an exclusive lock on
+<socket>.lock while it runs, so concurrent ``start`` calls cannot remove each
+other's socket.
+
+The daemon runs commands as its owner, so only its owner may use it: the
+socket is created mode 0600, connections from another uid (SO_PEERCRED, where
+the platform has it) are refused, and ``run`` only accepts the repository the
+daemon was started in as ``cwd``. A refused client (another user, or another
+repository sharing BMAD_DAEMON_SOCKET) runs its command in-process instead.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_SOCKET_PATH = ".bmad/cache/bmad-daemon.sock"
+DEFAULT_IDLE_TIMEOUT = 1800.0
+CONNECT_TIMEOUT = 0.5
+SCRIPTS = ("audit_workflow", "milestone_lock")
+# Options whose commands stay in the calling process.
+LOCAL_ONLY_OPTIONS = {"audit_workflow": ("--watch", "--repos", "--repos-file")}
+
+# JSON-RPC error codes (the -32000..-32099 range is implementation defined).
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+STALE_CODE = -32001
+WRONG_REPO = -32002
+FORBIDDEN = -32003
+
+
+def socket_path(repo_root: str) -> str:
+    return os.environ.get("BMAD_DAEMON_SOCKET") or os.path.join(
+        repo_root, DEFAULT_SOCKET_PATH
+    )
+
+
+def call(
+    path: str,
+    method: str,
+    params: Optional[Dict[str, Any]] = None,
+    on_notification: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> Any:
+    """One JSON-RPC call; raises OSError when no daemon answers, DaemonError
+    for an error response. Notifications received before the response are
+    passed to ``on_notification``."""
+    import json
+    import socket
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(path)
+        sock.settimeout(None)
+        request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params or {}}
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            for line in f:
+                response = json.loads(line)
+                if "id" in response:
+                    break
+                if on_notification is not None:
+                    on_notification(response)
+            else:
+                raise ConnectionError(
+                    "daemon closed the connection without a response"
+                )
+    finally:
+        sock.close()
+    error = response.get("error")
+    if error:
+        raise DaemonError(error.get("code", 0), error.get("message", ""))
+    return response.get("result")
+
+
+def _relay_output(message: Dict[str, Any]) -> None:
+    params = message.get("params")
+    if message.get("method") != "output" or not isinstance(params, dict):
+        return
+    stream = sys.stderr if params.get("stream") == "stderr" else sys.stdout
+    try:
+        stream.write(str(params.get("data", "")))
+        stream.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`): stop as an in-process run would.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), stream.fileno())
+        raise SystemExit(1)
+
+
+class DaemonError(RuntimeError):
+    def __init__(self, code: int, message: str) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+def forward(script: str, argv: List[str]) -> None:
+    """Run ``script argv`` on a daemon serving the current directory, then
+    exit with its status; return (to run in-process) when there is none."""
+    if os.environ.get("BMAD_NO_DAEMON"):
+        return
+    for option in LOCAL_ONLY_OPTIONS.get(script, ()):
+        if any(arg == option or arg.startswith(option + "=") for arg in argv):
+            return
+    cwd = os.getcwd()
+    path = socket_path(cwd)
+    if not os.path.exists(path):
+        return
+    try:
+        result = call(
+            path,
+            "run",
+            {
+                "script": script,
+                "argv": argv,
+                "cwd": cwd,
+                "env": dict(os.environ),
+                "stream": True,
+            },
+            on_notification=_relay_output,
+        )
+    except (ConnectionRefusedError, FileNotFoundError, TimeoutError):
+        return  # stale socket file or a daemon that is shutting down
+    except DaemonError as exc:
+        if exc.code in (STALE_CODE, WRONG_REPO, FORBIDDEN):
+            return
+        print(f"bmad daemon error: {exc}", file=sys.stderr)
+        raise SystemExit(2)
+    except (OSError, ValueError) as exc:
+        # The command may have run partially; do not silently run it twice.
+        print(
+            f"bmad daemon failed: {exc} (set BMAD_NO_DAEMON=1 to bypass it)",
+            file=sys.stderr,
+        )
+        raise SystemExit(2)
+    sys.stdout.write(result["stdout"])
+    sys.stderr.write(result["stderr"])
+    raise SystemExit(result["exit_code"])
+
+
+class _OutputStream:
+    """Text stream for a command's stdout or stderr that sends each complete
+    line to the client as an ``output`` notification."""
+
+    encoding = "utf-8"
+
+    def __init__(
+        self, name: str, notify: Callable[[Dict[str, Any]], None]
+    ) -> None:
+        self.name = name
+        self.notify = notify
+        self.pending = ""
+        self.closed = False
+
+    def write(self, text: str) -> int:
+        self.pending += text
+        end = self.pending.rfind("\n") + 1
+        if end:
+            self._send(self.pending[:end])
+            self.pending = self.pending[end:]
+        return len(text)
+
+    def flush(self) -> None:
+        if self.pending:
+            self._send(self.pending)
+            self.pending = ""
+
+    def _send(self, data: str) -> None:
+        if self.closed:
+            return
+        try:
+            self.notify(
+                {
+                    "jsonrpc": "2.0",
+                    "method": "output",
+                    "params": {"stream": self.name, "data": data},
+                }
+            )
+        except OSError:
+            # The client went away; let the command finish without output.
+            self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def isatty(self) -> bool:
+        return False
+
+    def getvalue(self) -> str:
+        return self.pending
+
+
+class Daemon:
+    """Runs forwarded commands against resident caches, one at a time."""
+
+    def __init__(self, repo_root: str, idle_timeout: float) -> None:
+        import threading
+        import time
+
+        from file_digest import keep_caches_resident
+
+        keep_caches_resident()
+        self.modules = {name: __import__(name) for name in SCRIPTS}
+        # Commands that parse YAML on a cache miss should not pay its import.
+        import yaml  # noqa: F401
+
+        self.code_salt = self._code_salt()
+        self.repo_root = os.path.realpath(repo_root)
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.requests = 0
+        self.run_lock = threading.Lock()
+        self.server: Any = None
+
+    def _code_salt(self) -> str:
+        from pathlib import Path
+
+        from audit_snapshot import snapshot_salt
+
+        here = Path(__file__).resolve().parent
+        return snapshot_salt(sorted(here.glob("*.py")))
+
+    def handle(
+        self,
+        request: Any,
+        notify: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        import time
+
+        self.last_request = time.monotonic()
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return self._error(None, INVALID_REQUEST, "invalid request")
+        request_id = request.get("id")
+        params = request.get("params")
+        if params is None:
+            params = {}
+        elif not isinstance(params, dict):
+            return self._error(request_id, INVALID_PARAMS, "params must be an object")
+        method = request["method"]
+        try:
+            if method == "run":
+                result: Any = self.run(params, notify)
+            elif method == "ping":
+                result = "pong"
+            elif method == "stats":
+                result = self.stats()
+            elif method == "shutdown":
+                self.stop()
+                result = "stopping"
+            else:
+                return self._error(
+                    request_id, METHOD_NOT_FOUND, f"unknown method {method!r}"
+                )
+        except DaemonError as exc:
+            return self._error(request_id, exc.code, str(exc))
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    @staticmethod
+    def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+        return {
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "error": {"code": code, "message": message},
+        }
+
+    def run(
+        self,
+        params: Dict[str, Any],
+        notify: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        import contextlib
+        import io
+        import traceback
+
+        import file_digest
+        from file_digest import DigestCache, HashTuning, resident_caches
+
+        script, argv, cwd = params.get("script"), params.get("argv"), params.get("cwd")
+        env = params.get("env")
+        if (
+            script not in self.modules
+            or not isinstance(argv, list)
+            or not all(isinstance(arg, str) for arg in argv)
+            or not isinstance(cwd, str)
+        ):
+            raise DaemonError(INVALID_PARAMS, "run needs script, argv and cwd")
+        if env is not None and not (
+            isinstance(env, dict)
+            and all(isinstance(k, str) and isinstance(v, str) for k, v in env.items())
+        ):
+            raise DaemonError(INVALID_PARAMS, "env must map strings to strings")
+        if os.path.realpath(cwd) != self.repo_root:
+            # The loaded scripts and caches belong to this repository only.
+            raise DaemonError(WRONG_REPO, f"daemon serves {self.repo_root}, not {cwd}")
+
+        with self.run_lock:
+            if self._code_salt() != self.code_salt:
+                self.stop()
+                raise DaemonError(STALE_CODE, "scripts changed on disk; daemon exiting")
+            for cache in resident_caches():
+                if isinstance(cache, DigestCache):
+                    cache.forget_volatile()
+            module = self.modules[script]
+            stdout: Any
+            stderr: Any
+            if params.get("stream") and notify is not None:
+                stdout = _OutputStream("stdout", notify)
+                stderr = _OutputStream("stderr", notify)
+            else:
+                stdout, stderr = io.StringIO(), io.StringIO()
+            saved_cwd, saved_argv = os.getcwd(), sys.argv
+            saved_env, saved_tuning = dict(os.environ), file_digest.TUNING
+            try:
+                os.chdir(cwd)
+                sys.argv = [module.__file__] + argv
+                if env is not None:
+                    os.environ.clear()
+                    os.environ.update(env)
+                    file_digest.TUNING = HashTuning.from_env()
+                with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(
+                    stderr
+                ):
+                    try:
+                        exit_code = module.main(argv)
+                    except SystemExit as exc:
+                        exit_code = exc.code
+                    except Exception:
+                        traceback.print_exc()
+                        exit_code = 1
+            except OSError as exc:
+                raise DaemonError(INVALID_PARAMS, f"cannot run in {cwd}: {exc}")
+            finally:
+                if env is not None:
+                    os.environ.clear()
+                    os.environ.update(saved_env)
+                    file_digest.TUNING = saved_tuning
+                sys.argv = saved_argv
+                os.chdir(saved_cwd)
+            self.requests += 1
+
+        if exit_code is None:
+            exit_code = 0
+        elif not isinstance(exit_code, int):
+            # SystemExit("message"): printed to stderr with status 1, as Python does.
+            stderr.write(f"{exit_code}\n")
+            exit_code = 1
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.getvalue(),
+            "stderr": stderr.getvalue(),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        import time
+
+        from file_digest import resident_caches
+
+        return {
+            "pid": os.getpid(),
+            "repo_root": self.repo_root,
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "caches": [
+                {
+                    "kind": type(cache).__name__,
+                    "path": str(cache.path),
+                    "hits": cache.hits,
+                    "misses": cache.misses,
+                }
+                for cache in resident_caches()
+            ],
+        }
+
+    def stop(self) -> None:
+        import threading
+
+        if self.server is not None:
+            # shutdown() waits for serve_forever(), so it cannot run on a
+            # request thread directly.
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def idle_watch(self) -> None:
+        import time
+
+        while True:
+            time.sleep(min(self.idle_timeout, 30.0))
+            if time.monotonic() - self.last_request >= self.idle_timeout:
+                self.stop()
+                return
+
+
+def peer_uid(sock: Any) -> Optional[int]:
+    """uid of the process at the other end of a Unix socket, or None where
+    the platform does not report it (the socket's 0600 mode still applies)."""
+    import socket
+    import struct
+
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = sock.getsockopt(
+        socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i")
+    )
+    return struct.unpack("3i", creds)[1]
+
+
+def serve(path: str, idle_timeout: float) -> int:
+    import fcntl
+    import json
+    import socketserver
+
+    daemon = Daemon(os.getcwd(), idle_timeout)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            uid = peer_uid(self.request)
+            foreign = uid is not None and uid != os.getuid()
+            for line in self.rfile:
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = Daemon._error(None, PARSE_ERROR, "parse error")
+                else:
+                    if foreign:
+                        response = Daemon._error(
+                            request.get("id") if isinstance(request, dict) else None,
+                            FORBIDDEN,
+                            "daemon belongs to another user",
+                        )
+                    else:
+                        response = daemon.handle(request, self.send)
+                try:
+                    self.send(response)
+                except OSError:
+                    return  # the client went away
+
+        def send(self, message: Dict[str, Any]) -> None:
+            self.wfile.write(json.dumps(message).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Held until exit: only the lock holder may unlink and bind the socket.
+    lock = open(path + ".lock", "a")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock.close()
+        print(f"daemon already running on {path}", file=sys.stderr)
+        return 1
+    try:
+        return _serve_locked(path, daemon, Handler, Server)
+    finally:
+        lock.close()
+
+
+def _serve_locked(path: str, daemon: Daemon, handler: Any, server_class: Any) -> int:
+    import threading
+
+    try:
+        call(path, "ping")
+    except (OSError, ValueError, DaemonError):
+        pass
+    else:
+        # A daemon from before the lock file existed.
+        print(f"daemon already running on {path}", file=sys.stderr)
+        return 1
+    if os.path.exists(path):
+        os.unlink(path)  # left behind by a daemon that did not exit cleanly
+    # Owner only: whoever can connect runs commands as the daemon's user.
+    saved_umask = os.umask(0o077)
+    try:
+        server = server_class(path, handler)
+    except OSError as exc:
+        print(
+            f"cannot listen on {path}: {exc} "
+            "(set BMAD_DAEMON_SOCKET to a shorter path)",
+            file=sys.stderr,
+        )
+        return 1
+    finally:
+        os.umask(saved_umask)
+    daemon.server = server
+    threading.Thread(target=daemon.idle_watch, daemon=True).start()
+    print(f"bmad daemon pid={os.getpid()} socket={path}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.unlink(path)
+    return 0
+
+
+def start(path: str, idle_timeout: float) -> int:
+    import subprocess
+    import time
+
+    try:
+        call(path, "ping")
+    except (OSError, ValueError, DaemonError):
+        pass
+    else:
+        print(f"daemon already running on {path}")
+        return 0
+    log_path = os.path.join(os.path.dirname(os.path.abspath(path)), "bmad-daemon.log")
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, "ab") as log:
+        subprocess.Popen(
+            [
+                sys.executable,
+                os.path.abspath(__file__),
+                "serve",
+                "--idle-timeout",
+                str(idle_timeout),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=log,
+            start_new_session=True,
+        )
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            call(path, "ping")
+        except (OSError, ValueError, DaemonError):
+            time.sleep(0.05)
+            continue
+        print(f"daemon started on {path}")
+        return 0
+    print(f"daemon did not come up; see {log_path}", file=sys.stderr)
+    return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Resident BMAD audit/lock daemon")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (
+        ("serve", "run in the foreground"),
+        ("start", "start in the background"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument(
+            "--idle-timeout",
+            type=float,
+            default=DEFAULT_IDLE_TIMEOUT,
+            help="exit after this many seconds without requests (default: 1800)",
+        )
+    sub.add_parser("stop", help="stop a running daemon")
+    sub.add_parser("status", help="show daemon status and cache counters")
+    args = parser.parse_args(argv)
+
+    path = socket_path(os.getcwd())
+    if args.command == "serve":
+        return serve(path, args.idle_timeout)
+    if args.command == "start":
+        return start(path, args.idle_timeout)
+    try:
+        result = call(path, "shutdown" if args.command == "stop" else "stats")
+    except (OSError, ValueError, DaemonError):
+        print(f"no daemon running on {path}")
+        return 1
+    if args.command == "stop":
+        print("daemon stopping")
+    else:
+        print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,603 @@
+"""File hashing helpers shared by audit_workflow.py and milestone_lock.py.
+
+Digests are remembered in a small on-disk cache (default: .bmad/cache/digests.json)
+keyed by path, size, mtime_ns, inode and ctime_ns, so unchanged files are never
+re-hashed across runs. The cache is bounded (LRU eviction) and safe to share
+between concurrent processes: writers merge under a lock file and replace the
+cache atomically, and a lost update only costs a future re-hash.
+
+``DigestCache.prefetch`` hashes many files on a bounded thread pool (hashlib
+releases the GIL on large buffers); callers then read results back in their own
+deterministic order through ``digest``.
+
+Hashing never copies file content into per-chunk ``bytes`` objects: small files
+are read in one call, medium files through a reused ``readinto`` buffer, and
+large files are memory-mapped and fed to hashlib as ``memoryview`` slices.
+Thresholds come from ``HashTuning`` (overridable via BMAD_HASH_* environment
+variables).
+
+``copy_with_digest`` copies and hashes in one pass: when the source digest is
+already known (digest cache hit) the bytes stay in the kernel via
+``os.copy_file_range``/``os.sendfile``; otherwise a tee buffer hashes each chunk
+as it is written.
+
+Supported digest algorithms are listed in ``ALGORITHMS``; ``lock_entry_digest``
+reads the (algo, digest) pair from both schema_version 1 (``sha256``) and
+schema_version 2 (``algo`` + ``digest``) lock entries.
+
+``merkle_root`` folds a lock's sorted (key, algo, digest) entries into a single
+sha256 root, so two spec sets compare equal with one string comparison.
+
+Importing this module is cheap: hashlib, json, mmap, shutil and the thread pool
+are imported by the functions that use them, so CLI commands that never hash
+(e.g. milestone_lock.py set-active) do not pay for them.
+
+A long-running process (bmad_daemon.py) calls ``keep_caches_resident`` so that
+the ``for_repo`` constructors of this and the other cache modules hand out one
+live cache per repository instead of reloading it from disk on every command.
+Resident caches stay correct because every entry is re-validated against the
+file's stat fingerprint or content hash when used.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_CACHE_PATH = ".bmad/cache/digests.json"
+DEFAULT_MAX_ENTRIES = 4096
+CACHE_FORMAT = 2
+
+DEFAULT_ALGO = "sha256"
+# hashlib constructor names; see new_hasher().
+ALGORITHMS: Tuple[str, ...] = ("sha256", "blake2b")
+LOCK_SCHEMA_VERSIONS = (1, 2)
+# Tree hash for merkle_root; independent of the per-file digest algorithm.
+MERKLE_ALGO = "sha256"
+
+# Files modified this recently may still change within the same timestamp tick,
+# so their digests are used but never persisted.
+RACY_WINDOW_NS = 2_000_000_000
+
+# Cache hits refresh their LRU timestamp at most this often, so a fully warm run
+# does not rewrite the cache file.
+LRU_TOUCH_INTERVAL_NS = 3600 * 1_000_000_000
+
+
+MIB = 1024 * 1024
+
+
+def _env_bytes(name: str, default: int) -> int:
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        parsed = int(value)
+    except ValueError:
+        return default
+    return parsed if parsed > 0 else default
+
+
+class HashTuning(NamedTuple):
+    small_file_limit: int = 1 * MIB  # at or below: single read()
+    mmap_threshold: int = 16 * MIB  # at or above: mmap + memoryview slices
+    chunk_size: int = 8 * MIB  # upper bound for buffer / slice size
+
+    @classmethod
+    def from_env(cls) -> "HashTuning":
+        base = cls()
+        return cls(
+            small_file_limit=_env_bytes(
+                "BMAD_HASH_SMALL_FILE_LIMIT", base.small_file_limit
+            ),
+            mmap_threshold=_env_bytes("BMAD_HASH_MMAP_THRESHOLD", base.mmap_threshold),
+            chunk_size=_env_bytes("BMAD_HASH_CHUNK_SIZE", base.chunk_size),
+        )
+
+    def chunk_for(self, size: int) -> int:
+        # Aim for ~16 slices per file, between 1 MiB and chunk_size.
+        return max(min(MIB, self.chunk_size), min(self.chunk_size, size // 16))
+
+
+TUNING = HashTuning.from_env()
+
+
+def _hash_read_all(h: Any, f: Any) -> None:
+    data = f.read()
+    while data:
+        h.update(data)
+        data = f.read()
+
+
+def _hash_readinto(h: Any, f: Any, chunk_size: int) -> None:
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    try:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+    finally:
+        view.release()
+
+
+def _hash_mmap(h: Any, f: Any, chunk_size: int) -> None:
+    import mmap
+
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        mapped = len(mm)
+        view = memoryview(mm)
+        try:
+            for offset in range(0, mapped, chunk_size):
+                h.update(view[offset : offset + chunk_size])
+        finally:
+            view.release()
+    # Pick up anything appended after the mapping was taken. The mapping
+    # covers the file as it was when mapped, which may exceed its stat size.
+    f.seek(mapped)
+    _hash_read_all(h, f)
+
+
+def new_hasher(algo: str) -> Any:
+    if algo not in ALGORITHMS:
+        raise ValueError(f"unsupported hash algo: {algo}")
+    import hashlib
+
+    return getattr(hashlib, algo)()
+
+
+def lock_entry_digest(entry: Dict[str, Any]) -> Tuple[str, str]:
+    """Return (algo, digest) of a lock file entry; empty digest when absent."""
+    if "digest" in entry or "algo" in entry:
+        return str(entry.get("algo", "")), str(entry.get("digest", "") or "")
+    return "sha256", str(entry.get("sha256", "") or "")
+
+
+def entry_stat_matches(entry: Dict[str, Any], st: os.stat_result) -> bool:
+    """True when a lock entry's recorded size and mtime_ns match ``st``."""
+    return entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns
+
+
+def lock_merkle_leaves(files: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """(key, algo, digest) leaves of a lock's ``files`` mapping."""
+    return [
+        (str(key), *lock_entry_digest(entry))
+        for key, entry in files.items()
+        if isinstance(entry, dict)
+    ]
+
+
+def merkle_root(leaves: Iterable[Tuple[str, str, str]]) -> str:
+    """Merkle root over (key, algo, digest) leaves, independent of input order.
+
+    Leaves and inner nodes are domain-separated (0x00 / 0x01 prefixes); an odd
+    node at the end of a level is promoted unchanged.
+    """
+    import hashlib
+
+    level = [
+        hashlib.new(
+            MERKLE_ALGO, b"\x00" + "\x00".join(leaf).encode("utf-8")
+        ).digest()
+        for leaf in sorted(leaves)
+    ]
+    if not level:
+        return hashlib.new(MERKLE_ALGO, b"\x00").hexdigest()
+    while len(level) > 1:
+        paired = [
+            hashlib.new(MERKLE_ALGO, b"\x01" + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def hash_file(
+    path: Path, algo: str = DEFAULT_ALGO, tuning: Optional[HashTuning] = None
+) -> str:
+    tuning = tuning or TUNING
+    h = new_hasher(algo)
+    with path.open("rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= tuning.small_file_limit:
+            _hash_read_all(h, f)
+        elif size >= tuning.mmap_threshold:
+            try:
+                _hash_mmap(h, f, tuning.chunk_for(size))
+            except (OSError, ValueError):
+                # Not mappable (e.g. special filesystems): stream it instead.
+                h = new_hasher(algo)
+                f.seek(0)
+                _hash_readinto(h, f, tuning.chunk_for(size))
+        else:
+            _hash_readinto(h, f, tuning.chunk_for(size))
+    return h.hexdigest()
+
+
+def default_jobs() -> int:
+    return os.cpu_count() or 1
+
+
+def run_parallel(fn: Callable[[T], R], items: List[T], jobs: int) -> List[R]:
+    """Map ``fn`` over ``items`` on a bounded thread pool, keeping input order."""
+    return list(iter_parallel(fn, items, jobs))
+
+
+def iter_parallel(fn: Callable[[T], R], items: List[T], jobs: int) -> Iterator[R]:
+    """Like run_parallel(), yielding each result as soon as it and all earlier
+    ones are done."""
+    if jobs <= 1 or len(items) <= 1:
+        yield from (fn(item) for item in items)
+        return
+    import contextvars
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Workers see the caller's context variables (e.g. its scoped parse cache).
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        yield from pool.map(lambda item: context.copy().run(fn, item), items)
+
+
+def stat_key(st: os.stat_result) -> List[int]:
+    return [st.st_size, st.st_mtime_ns, st.st_ino, st.st_ctime_ns]
+
+
+def is_racy(st: os.stat_result, now_ns: Optional[int] = None) -> bool:
+    now = time.time_ns() if now_ns is None else now_ns
+    return now - max(st.st_mtime_ns, st.st_ctime_ns) < RACY_WINDOW_NS
+
+
+def _write_all(fout: Any, data: memoryview) -> None:
+    while data:
+        written = fout.write(data)
+        data = data[written:]
+
+
+def _tee_copy(fin: Any, fout: Any, chunk_size: int, algo: str) -> str:
+    h = new_hasher(algo)
+    buf = bytearray(chunk_size)
+    view = memoryview(buf)
+    try:
+        while True:
+            n = fin.readinto(buf)
+            if not n:
+                break
+            h.update(view[:n])
+            _write_all(fout, view[:n])
+    finally:
+        view.release()
+    return h.hexdigest()
+
+
+def _kernel_copy(fin: Any, fout: Any, size: int) -> bool:
+    """Copy without moving bytes through userspace; False if unsupported."""
+    in_fd, out_fd = fin.fileno(), fout.fileno()
+    for name in ("copy_file_range", "sendfile"):
+        if not hasattr(os, name):
+            continue
+        try:
+            while True:
+                if name == "copy_file_range":
+                    n = os.copy_file_range(in_fd, out_fd, max(size, MIB))
+                else:
+                    n = os.sendfile(out_fd, in_fd, None, max(size, MIB))
+                if not n:
+                    return True
+        except OSError:
+            # EXDEV/ENOSYS/EINVAL etc.: rewind any partial copy, try the next way.
+            fin.seek(0)
+            fout.seek(0)
+            fout.truncate()
+    return False
+
+
+def copy_with_digest(
+    src: Path,
+    dst: Path,
+    known_digest: Optional[str] = None,
+    tuning: Optional[HashTuning] = None,
+    algo: str = DEFAULT_ALGO,
+) -> str:
+    """Copy ``src`` to ``dst`` (with metadata, like shutil.copy2), returning the
+    digest of the bytes written while reading the source only once."""
+    tuning = tuning or TUNING
+    new_hasher(algo)  # reject unknown algos before touching dst
+    with src.open("rb", buffering=0) as fin, dst.open("wb", buffering=0) as fout:
+        before = os.fstat(fin.fileno())
+        digest = None
+        if known_digest is not None and _kernel_copy(fin, fout, before.st_size):
+            if stat_key(os.fstat(fin.fileno())) == stat_key(before):
+                digest = known_digest
+            else:
+                fin.seek(0)
+                fout.seek(0)
+                fout.truncate()
+        if digest is None:
+            digest = _tee_copy(fin, fout, tuning.chunk_for(before.st_size), algo)
+    import shutil
+
+    shutil.copystat(src, dst)
+    return digest
+
+
+# (cache kind, repo root, ...) -> cache object, or None outside the daemon.
+_RESIDENT: Optional[Dict[Tuple[str, ...], Any]] = None
+_RESIDENT_LOCK = threading.Lock()
+
+
+def keep_caches_resident() -> None:
+    global _RESIDENT
+    if _RESIDENT is None:
+        _RESIDENT = {}
+
+
+def resident_caches() -> List[Any]:
+    with _RESIDENT_LOCK:
+        return list((_RESIDENT or {}).values())
+
+
+def resident(key: Tuple[str, ...], build: Callable[[], T]) -> T:
+    """The cache registered under ``key``, building it on first use; without
+    ``keep_caches_resident`` simply ``build()``."""
+    if _RESIDENT is None:
+        return build()
+    with _RESIDENT_LOCK:
+        value = _RESIDENT.get(key)
+        if value is None:
+            value = _RESIDENT[key] = build()
+        return value
+
+
+class DigestCache:
+    """Persistent path -> digest cache keyed by file metadata.
+
+    A cache constructed with ``path=None`` keeps entries in memory only.
+    """
+
+    def __init__(
+        self, path: Optional[Path], max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: Optional[Dict[str, List[Any]]] = None
+        self._dirty: Dict[str, List[Any]] = {}
+        # Digests of racy files, valid for this process only.
+        self._volatile: Dict[str, Tuple[List[int], str]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_repo(cls, repo_root: Path, enabled: bool = True) -> "DigestCache":
+        if not enabled:
+            return cls(None)
+        path = repo_root / DEFAULT_CACHE_PATH
+        return resident(("digests", str(path)), lambda: cls(path))
+
+    def forget_volatile(self) -> None:
+        """Drop digests of racy files; a long-lived process calls this between
+        commands, since such a file may change without its fingerprint."""
+        with self._lock:
+            self._volatile.clear()
+
+    @staticmethod
+    def _read_entries(path: Path) -> Dict[str, List[Any]]:
+        import json
+
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(data, dict) or data.get("format") != CACHE_FORMAT:
+            return {}
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return {}
+        return {
+            key: entry
+            for key, entry in entries.items()
+            if isinstance(entry, list) and len(entry) == 6
+        }
+
+    def digest(
+        self,
+        path: Path,
+        st: Optional[os.stat_result] = None,
+        algo: str = DEFAULT_ALGO,
+    ) -> str:
+        """Return the ``algo`` hex digest of ``path``, hashing only on a cache miss."""
+        if st is None:
+            st = path.stat()
+        key = _cache_key(path, algo)
+        fingerprint = stat_key(st)
+        entries = self._load()
+        entry = entries.get(key)
+        now_ns = time.time_ns()
+        if entry is not None and entry[:4] == fingerprint:
+            with self._lock:
+                self.hits += 1
+                if now_ns - entry[5] > LRU_TOUCH_INTERVAL_NS:
+                    entry[5] = now_ns
+                    self._dirty[key] = entry
+            return entry[4]
+        volatile = self._volatile.get(key)
+        if volatile is not None and volatile[0] == fingerprint:
+            with self._lock:
+                self.hits += 1
+            return volatile[1]
+
+        value = hash_file(path, algo)
+        with self._lock:
+            self.misses += 1
+        self._remember(path, st, value, algo)
+        return value
+
+    def cached(
+        self, path: Path, st: os.stat_result, algo: str = DEFAULT_ALGO
+    ) -> Optional[str]:
+        """Return the digest of ``path`` if known for this exact ``st``, without hashing."""
+        key = _cache_key(path, algo)
+        fingerprint = stat_key(st)
+        entry = self._load().get(key)
+        if entry is not None and entry[:4] == fingerprint:
+            return entry[4]
+        volatile = self._volatile.get(key)
+        if volatile is not None and volatile[0] == fingerprint:
+            return volatile[1]
+        return None
+
+    def copy(self, src: Path, dst: Path, algo: str = DEFAULT_ALGO) -> str:
+        """Single-pass copy of ``src`` to ``dst``; returns the digest of the copy.
+
+        Only ``src`` is cached: ``dst`` is usually a temp file that the caller
+        renames, so the caller records the final path with ``remember()``.
+        """
+        before = src.stat()
+        digest = copy_with_digest(
+            src, dst, self.cached(src, before, algo), algo=algo
+        )
+        after = src.stat()
+        if stat_key(after) == stat_key(before):
+            self._remember(src, after, digest, algo)
+        return digest
+
+    def remember(self, path: Path, digest: str, algo: str = DEFAULT_ALGO) -> None:
+        """Record the known ``digest`` of ``path`` as it is on disk now."""
+        self._remember(path, path.stat(), digest, algo)
+
+    def _remember(
+        self, path: Path, st: os.stat_result, digest: str, algo: str
+    ) -> None:
+        key = _cache_key(path, algo)
+        fingerprint = stat_key(st)
+        now_ns = time.time_ns()
+        entries = self._load()
+        with self._lock:
+            if is_racy(st, now_ns):
+                self._volatile[key] = (fingerprint, digest)
+            else:
+                entry = fingerprint + [digest, now_ns]
+                entries[key] = entry
+                self._dirty[key] = entry
+
+    def prefetch(
+        self,
+        paths: Iterable[Tuple[Path, str]],
+        jobs: int,
+        stat: Optional[Callable[[Path], Optional[os.stat_result]]] = None,
+    ) -> None:
+        """Hash all existing ``(path, algo)`` targets concurrently, warming ``digest``.
+
+        ``stat`` (path -> stat result or None) lets callers reuse stats they
+        already hold; by default each path is stat'ed here.
+        """
+        targets: List[Tuple[Path, os.stat_result, str]] = []
+        seen = set()
+        for path, algo in paths:
+            if algo not in ALGORITHMS:
+                continue
+            key = _cache_key(path, algo)
+            if key in seen:
+                continue
+            seen.add(key)
+            try:
+                st = path.stat() if stat is None else stat(path)
+            except OSError:
+                continue
+            if st is not None and st.st_size:
+                targets.append((path, st, algo))
+
+        self._load()
+        run_parallel(lambda item: self._digest_quietly(*item), targets, jobs)
+
+    def _digest_quietly(self, path: Path, st: os.stat_result, algo: str) -> None:
+        try:
+            self.digest(path, st, algo)
+        except OSError:
+            # Surfaced again (with context) when the caller reads this path.
+            pass
+
+    def _load(self) -> Dict[str, List[Any]]:
+        with self._lock:
+            if self._entries is None:
+                self._entries = (
+                    {} if self.path is None else self._read_entries(self.path)
+                )
+            return self._entries
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        import json
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with CacheLock(self.path.with_name(self.path.name + ".lock")):
+                merged = self._read_entries(self.path)
+                for key, entry in self._dirty.items():
+                    current = merged.get(key)
+                    if current is None or current[5] <= entry[5]:
+                        merged[key] = entry
+                if len(merged) > self.max_entries:
+                    newest = sorted(
+                        merged.items(), key=lambda item: item[1][5], reverse=True
+                    )
+                    merged = dict(newest[: self.max_entries])
+                tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+                with tmp.open("w", encoding="utf-8") as f:
+                    json.dump({"format": CACHE_FORMAT, "entries": merged}, f)
+                os.replace(tmp, self.path)
+        except OSError:
+            # The cache is an optimization only; never fail a command over it.
+            return
+        self._entries = merged
+        self._dirty = {}
+
+
+def _cache_key(path: Path, algo: str) -> str:
+    return f"{algo}:{os.path.abspath(path)}"
+
+
+class CacheLock:
+    """Exclusive advisory lock around cache read-merge-write (no-op without fcntl)."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: Optional[int] = None
+
+    def __enter__(self) -> "CacheLock":
+        try:
+            import fcntl
+        except ImportError:
+            return self
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,224 @@
+"""Directory watching for ``audit_workflow.py --watch``.
+
+``open_watcher`` returns an inotify watcher on Linux (through ctypes; no extra
+dependency) and a scandir polling watcher elsewhere or when inotify is not
+available. Both report changed absolute paths, coalesced over a debounce window.
+
+Roots are ``(directory, recursive)`` pairs. Roots that do not exist yet are
+picked up once they are created. When the kernel event queue overflows, every
+root is reported as changed.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+Root = Tuple[Path, bool]
+
+POLL_INTERVAL = 0.5
+
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    _IN_MODIFY
+    | _IN_ATTRIB
+    | _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_DELETE_SELF
+    | _IN_MOVE_SELF
+    | _IN_ONLYDIR
+)
+_EVENT = struct.Struct("iIII")
+
+
+def is_under(path: str, roots: Iterable[Root]) -> bool:
+    """True if ``path`` is a watched root's child (or any descendant if recursive)."""
+    for root, recursive in roots:
+        base = str(root)
+        if recursive:
+            if path == base or path.startswith(base + os.sep):
+                return True
+        elif path == base or os.path.dirname(path) == base:
+            return True
+    return False
+
+
+class PollingWatcher:
+    """Portable fallback: diff scandir stat snapshots of every root."""
+
+    def __init__(self, roots: List[Root], interval: float = POLL_INTERVAL) -> None:
+        self.roots = roots
+        self.interval = interval
+        self._state = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int, int, int]]:
+        state: Dict[str, Tuple[int, int, int, int]] = {}
+        for root, recursive in self.roots:
+            pending = [str(root)]
+            while pending:
+                directory = pending.pop()
+                try:
+                    with os.scandir(directory) as it:
+                        for entry in it:
+                            try:
+                                st = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            state[entry.path] = (
+                                st.st_size,
+                                st.st_mtime_ns,
+                                st.st_ino,
+                                st.st_ctime_ns,
+                            )
+                            if recursive and entry.is_dir(follow_symlinks=False):
+                                pending.append(entry.path)
+                except OSError:
+                    continue
+        return state
+
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {
+                path
+                for path in current.keys() | self._state.keys()
+                if current.get(path) != self._state.get(path)
+            }
+            self._state = current
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher; one watch per directory under each root."""
+
+    def __init__(self, roots: List[Root]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.roots = roots
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, str] = {}
+        self._sync()
+
+    def _watch(self, directory: str) -> None:
+        wd = self._add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _sync(self) -> None:
+        """Add watches for every existing root directory (and subdirectories)."""
+        watched = set(self._dirs.values())
+        for root, recursive in self.roots:
+            base = str(root)
+            if not os.path.isdir(base):
+                # Watch the nearest existing ancestor until the root appears.
+                parent = os.path.dirname(base)
+                while parent and not os.path.isdir(parent):
+                    parent = os.path.dirname(parent)
+                if parent and parent not in watched:
+                    self._watch(parent)
+                continue
+            if base not in watched:
+                self._watch(base)
+            if recursive:
+                for dirpath, dirnames, _ in os.walk(base):
+                    for name in dirnames:
+                        sub = os.path.join(dirpath, name)
+                        if sub not in watched:
+                            self._watch(sub)
+
+    def poll(self, timeout: Optional[float]) -> Set[str]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed: Set[str] = set()
+        resync = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & _IN_Q_OVERFLOW:
+                    changed.update(str(root) for root, _ in self.roots)
+                    resync = True
+                    continue
+                directory = self._dirs.get(wd)
+                if mask & _IN_IGNORED:
+                    self._dirs.pop(wd, None)
+                    continue
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name)) if name else directory
+                changed.add(path)
+                if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF) or (
+                    mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO)
+                ):
+                    resync = True
+        if resync:
+            self._sync()
+        return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(roots: List[Root], force_polling: bool = False):
+    if not force_polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return PollingWatcher(roots)
+
+
+def wait_for_changes(watcher, debounce: float) -> Set[str]:
+    """Block until something changes, then keep collecting until ``debounce``
+    seconds pass without further changes."""
+    changed = set(watcher.poll(None))
+    while not changed:
+        changed = set(watcher.poll(None))
+    while True:
+        more = watcher.poll(debounce)
+        if not more:
+            return changed
+        changed |= more
@@ -0,0 +1,475 @@
+"""SQLite catalog of milestone locks for milestone_lock.py.
+
+The catalog (default: .bmad/cache/milestones.sqlite) indexes every lock under
+workflow.milestone.dir: one row per milestone (creation time, source, Merkle
+root) and one per locked key (artifact, algorithm, digest, size), with an
+index on digests. It also records when milestones were created, imported,
+seeded with ``use`` or made active. Times are ordered as UTC epoch
+nanoseconds, so locks written under different UTC offsets sort correctly.
+
+create, import-archive and use update the catalog as they run. set-active only
+moves a pointer and does not open SQLite: it appends its event to a plain-text
+log that ``import_events()`` moves into the catalog before the next query.
+Before each query, ``sync()`` compares the stat fingerprint of every lock file
+with the one it was indexed at and re-parses only locks that changed, were
+added or were removed; a missing or outdated catalog is rebuilt from the
+filesystem the same way. A catalog file that is not a database, or fails
+``PRAGMA integrity_check``, is replaced; any other error (e.g. a database
+locked by another process) is raised, never "repaired". Events cannot be
+rebuilt: a rebuild keeps only the creation times stored in the locks.
+
+The catalog is an index only; commands never fail because of it.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
+
+from file_digest import CacheLock, is_racy, stat_key
+
+if TYPE_CHECKING:
+    # Imported where a connection is opened: append_event() must not pay it.
+    import sqlite3
+
+DEFAULT_CATALOG_PATH = ".bmad/cache/milestones.sqlite"
+CATALOG_VERSION = 2
+EVENT_KINDS = ("create", "import-archive", "use", "set-active")
+
+# Primary result codes (extended codes share the low byte).
+SQLITE_CORRUPT = 11
+SQLITE_NOTADB = 26
+
+SCHEMA = """
+CREATE TABLE milestones (
+    milestone_id TEXT PRIMARY KEY,
+    lock_path TEXT NOT NULL,
+    lock_stat TEXT,
+    created_at TEXT,
+    created_ns INTEGER,
+    source_type TEXT,
+    source_path TEXT,
+    merkle_root TEXT
+);
+CREATE TABLE files (
+    milestone_id TEXT NOT NULL REFERENCES milestones ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    artifact TEXT,
+    algo TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER,
+    PRIMARY KEY (milestone_id, key)
+);
+CREATE INDEX files_by_digest ON files (digest, key);
+CREATE INDEX files_by_key ON files (key);
+CREATE TABLE events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    at_ns INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    milestone_id TEXT NOT NULL
+);
+CREATE INDEX events_by_milestone ON events (milestone_id, at_ns);
+"""
+
+
+class MilestoneRow(NamedTuple):
+    milestone_id: str
+    lock_path: str
+    created_at: Optional[str]
+    source_type: Optional[str]
+    source_path: Optional[str]
+    merkle_root: Optional[str]
+    keys: int
+    last_active_at: Optional[str]  # latest use or set-active event, UTC
+
+
+class KeyRow(NamedTuple):
+    """One milestone's entry for a key."""
+
+    milestone_id: str
+    created_at: Optional[str]
+    key: str
+    artifact: Optional[str]
+    algo: str
+    digest: str
+    size: Optional[int]
+
+
+def _fingerprint(st: os.stat_result) -> str:
+    return " ".join(str(part) for part in stat_key(st))
+
+
+def _lock_fingerprint(st: os.stat_result) -> Optional[str]:
+    """Stat fingerprint to index a lock at; None (always re-parse) when racy."""
+    return None if is_racy(st) else _fingerprint(st)
+
+
+class MilestoneCatalog:
+    """Milestone/key/digest index over the lock files of one repository.
+
+    A catalog constructed with ``path=None`` lives in memory only.
+    """
+
+    def __init__(self, path: Optional[Path], repo_root: Path) -> None:
+        import sqlite3
+
+        self.path = path
+        self.repo_root = repo_root
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._db = self._connect()
+        except sqlite3.DatabaseError as exc:
+            if path is None or not _damaged(path, exc):
+                raise
+            # Not a database (e.g. truncated) or corrupt: start over from the locks.
+            for stale in (path, path.with_name(path.name + "-journal")):
+                stale.unlink(missing_ok=True)
+            self._db = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        import sqlite3
+
+        db = sqlite3.connect(
+            ":memory:" if self.path is None else str(self.path), timeout=5
+        )
+        try:
+            db.execute("PRAGMA foreign_keys = ON")
+            if db.execute("PRAGMA user_version").fetchone()[0] != CATALOG_VERSION:
+                _create_schema(db)
+        except sqlite3.Error:
+            db.close()
+            raise
+        return db
+
+    @classmethod
+    def for_repo(cls, repo_root: Path, enabled: bool = True) -> "MilestoneCatalog":
+        return cls(repo_root / DEFAULT_CATALOG_PATH if enabled else None, repo_root)
+
+    def __enter__(self) -> "MilestoneCatalog":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def rebuild(
+        self,
+        locks: Dict[str, Path],
+        load: Callable[[Path], Dict[str, Any]],
+    ) -> List[str]:
+        """Drop everything, events included, and re-index ``locks``."""
+        _create_schema(self._db, force=True)
+        return self.sync(locks, load)
+
+    def _relpath(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.repo_root))
+        except ValueError:
+            return str(path)
+
+    def index_lock(
+        self,
+        milestone_id: str,
+        lock_path: Path,
+        lock: Dict[str, Any],
+        st: Optional[os.stat_result] = None,
+    ) -> None:
+        """(Re)index one parsed lock; ``st`` is the lock file's stat from
+        before it was read (default: stat it now)."""
+        if st is None:
+            st = lock_path.stat()
+        source = lock.get("source")
+        source = source if isinstance(source, dict) else {}
+        files = lock.get("files")
+        files = files if isinstance(files, dict) else {}
+        rows = []
+        for key, entry in files.items():
+            if not isinstance(entry, dict):
+                continue
+            algo = entry.get("algo", "sha256")
+            digest = entry.get("digest", entry.get("sha256"))
+            if isinstance(digest, str) and digest:
+                rows.append(
+                    (
+                        milestone_id,
+                        str(key),
+                        entry.get("artifact"),
+                        str(algo),
+                        digest,
+                        entry.get("size"),
+                    )
+                )
+        created_at = lock.get("created_at")
+        with self._db:
+            self._db.execute(
+                "DELETE FROM milestones WHERE milestone_id = ?", (milestone_id,)
+            )
+            self._db.execute(
+                "INSERT INTO milestones VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    milestone_id,
+                    self._relpath(lock_path),
+                    _lock_fingerprint(st),
+                    _text(created_at),
+                    epoch_ns(created_at),
+                    _text(source.get("type")),
+                    _text(source.get("path")),
+                    _text(lock.get("merkle_root")),
+                ),
+            )
+            self._db.executemany(
+                "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def record_event(self, kind: str, milestone_id: str, at_ns: int) -> None:
+        """Record ``kind`` for ``milestone_id`` at ``at_ns`` (UTC epoch ns)."""
+        if kind not in EVENT_KINDS:
+            raise ValueError(f"unknown catalog event: {kind}")
+        with self._db:
+            self._db.execute(
+                "INSERT INTO events (at_ns, kind, milestone_id) VALUES (?, ?, ?)",
+                (at_ns, kind, milestone_id),
+            )
+
+    def import_events(self, log_path: Path) -> int:
+        """Move the events appended to ``log_path`` (see append_event) into
+        the catalog and empty the log; returns how many were imported."""
+        with CacheLock(log_path.with_name(log_path.name + ".lock")):
+            try:
+                f = log_path.open("r+b")
+            except FileNotFoundError:
+                return 0
+            with f:
+                rows = []
+                for line in f.read().decode("utf-8", "replace").splitlines():
+                    parts = line.split(" ", 2)
+                    if (
+                        len(parts) == 3
+                        and parts[0].isdigit()
+                        and parts[1] in EVENT_KINDS
+                    ):
+                        rows.append((int(parts[0]), parts[1], parts[2]))
+                with self._db:
+                    self._db.executemany(
+                        "INSERT INTO events (at_ns, kind, milestone_id)"
+                        " VALUES (?, ?, ?)",
+                        rows,
+                    )
+                f.truncate(0)
+        return len(rows)
+
+    def sync(
+        self,
+        locks: Dict[str, Path],
+        load: Callable[[Path], Dict[str, Any]],
+    ) -> List[str]:
+        """Bring the index in line with ``locks`` (milestone id -> lock path).
+
+        Only locks whose stat fingerprint changed since they were indexed are
+        loaded with ``load``; unreadable ones are left out of the index.
+        Returns the ids of the milestones that were re-indexed.
+        """
+        indexed = {
+            milestone_id: (lock_path, lock_stat)
+            for milestone_id, lock_path, lock_stat in self._db.execute(
+                "SELECT milestone_id, lock_path, lock_stat FROM milestones"
+            )
+        }
+        gone = [milestone_id for milestone_id in indexed if milestone_id not in locks]
+        if gone:
+            with self._db:
+                self._db.executemany(
+                    "DELETE FROM milestones WHERE milestone_id = ?",
+                    [(milestone_id,) for milestone_id in gone],
+                )
+
+        changed: List[str] = []
+        for milestone_id, lock_path in sorted(locks.items()):
+            try:
+                st = lock_path.stat()
+            except OSError:
+                continue
+            known = indexed.get(milestone_id)
+            if known == (self._relpath(lock_path), _fingerprint(st)):
+                continue
+            try:
+                lock = load(lock_path)
+            except Exception:
+                with self._db:
+                    self._db.execute(
+                        "DELETE FROM milestones WHERE milestone_id = ?",
+                        (milestone_id,),
+                    )
+                continue
+            self.index_lock(milestone_id, lock_path, lock, st)
+            changed.append(milestone_id)
+        return changed
+
+    def milestones(
+        self, *, key: Optional[str] = None, digest: Optional[str] = None
+    ) -> List[MilestoneRow]:
+        """Indexed milestones, oldest first; ``key`` and ``digest`` (a hex
+        prefix) keep only milestones locking that key and/or digest."""
+        query = """
+            SELECT m.milestone_id, m.lock_path, m.created_at, m.source_type,
+                   m.source_path, m.merkle_root,
+                   (SELECT COUNT(*) FROM files f WHERE f.milestone_id = m.milestone_id),
+                   (SELECT MAX(e.at_ns) FROM events e
+                    WHERE e.milestone_id = m.milestone_id
+                    AND e.kind IN ('use', 'set-active'))
+            FROM milestones m
+        """
+        conditions, params = _file_filter(key, digest)
+        if conditions:
+            query += (
+                " WHERE m.milestone_id IN (SELECT milestone_id FROM files f WHERE "
+                + " AND ".join(conditions)
+                + ")"
+            )
+        query += " ORDER BY m.created_ns, m.milestone_id"
+        return [
+            MilestoneRow(*row[:-1], utc_iso(row[-1]))
+            for row in self._db.execute(query, params)
+        ]
+
+    def entries(
+        self, *, key: Optional[str] = None, digest: Optional[str] = None
+    ) -> List[KeyRow]:
+        """Key entries matching ``key`` and/or ``digest`` (a hex prefix), by
+        milestone creation time; an index lookup on either column."""
+        conditions, params = _file_filter(key, digest)
+        query = """
+            SELECT f.milestone_id, m.created_at, f.key, f.artifact, f.algo,
+                   f.digest, f.size
+            FROM files f JOIN milestones m USING (milestone_id)
+        """
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY m.created_ns, f.milestone_id, f.key"
+        return [KeyRow(*row) for row in self._db.execute(query, params)]
+
+
+def _damaged(path: Path, exc: sqlite3.DatabaseError) -> bool:
+    """Whether ``exc`` means the catalog file itself is unusable, as opposed
+    to e.g. locked by another process."""
+    import sqlite3
+
+    code = getattr(exc, "sqlite_errorcode", None)  # Python 3.11+
+    if code is not None:
+        code &= 0xFF
+    if code == SQLITE_NOTADB or "file is not a database" in str(exc):
+        return True
+    if code == SQLITE_CORRUPT or "malformed" in str(exc):
+        try:
+            db = sqlite3.connect(str(path), timeout=5)
+            try:
+                result = db.execute("PRAGMA integrity_check").fetchall()
+            finally:
+                db.close()
+        except sqlite3.OperationalError:
+            return False  # busy or locked: not evidence of damage
+        except sqlite3.DatabaseError:
+            return True
+        return result != [("ok",)]
+    return False
+
+
+def _create_schema(db: sqlite3.Connection, *, force: bool = False) -> None:
+    """(Re)create every table, dropping whatever an older format left.
+
+    Runs in an exclusive transaction and, unless ``force``, re-checks the
+    version inside it, so a connection that lost the race keeps the schema
+    the winner just created instead of dropping it.
+    """
+    db.commit()
+    db.execute("BEGIN EXCLUSIVE")
+    try:
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if force or version != CATALOG_VERSION:
+            for (table,) in db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+                " AND name NOT LIKE 'sqlite_%'"
+            ).fetchall():
+                db.execute(f'DROP TABLE "{table}"')
+            for statement in SCHEMA.split(";"):
+                if statement.strip():
+                    db.execute(statement)
+            db.execute(f"PRAGMA user_version = {CATALOG_VERSION}")
+    except BaseException:
+        db.rollback()
+        raise
+    db.commit()
+
+
+def append_event(log_path: Path, kind: str, milestone_id: str, at_ns: int) -> None:
+    """Append an event for ``import_events``: one "<epoch ns> <kind>
+    <milestone id>" line, under the same lock the import takes."""
+    if kind not in EVENT_KINDS:
+        raise ValueError(f"unknown catalog event: {kind}")
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with CacheLock(log_path.with_name(log_path.name + ".lock")):
+        with log_path.open("ab") as f:
+            f.write(f"{at_ns} {kind} {milestone_id}\n".encode("utf-8"))
+
+
+def epoch_ns(value: Any) -> Optional[int]:
+    """UTC epoch nanoseconds of an ISO 8601 timestamp (string or parsed by
+    YAML); naive times are taken as UTC. None when it is not one."""
+    import datetime as dt
+
+    if isinstance(value, str):
+        text = value.strip()
+        if text.endswith(("Z", "z")):
+            text = text[:-1] + "+00:00"  # fromisoformat() before Python 3.11
+        try:
+            value = dt.datetime.fromisoformat(text)
+        except ValueError:
+            return None
+    if not isinstance(value, dt.datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    delta = value - dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 10**9 + delta.microseconds * 1000
+
+
+def utc_iso(at_ns: Optional[int]) -> Optional[str]:
+    """ISO 8601 UTC time (seconds) of UTC epoch nanoseconds."""
+    if at_ns is None:
+        return None
+    import datetime as dt
+
+    return dt.datetime.fromtimestamp(at_ns // 10**9, dt.timezone.utc).isoformat()
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _file_filter(
+    key: Optional[str], digest: Optional[str]
+) -> Tuple[List[str], List[str]]:
+    conditions: List[str] = []
+    params: List[str] = []
+    if key is not None:
+        conditions.append("f.key = ?")
+        params.append(key)
+    if digest is not None:
+        # Hex digests sort below "g": a prefix is a range scan on the index.
+        prefix = digest.lower()
+        conditions.append("f.digest >= ? AND f.digest < ?")
+        params += [prefix, prefix + "g"]
+    return conditions, params
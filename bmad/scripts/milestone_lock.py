@@ -1,6 +1,11 @@
 #!/usr/bin/env python3
 """Manage BMAD milestone locks.
 
+Locked spec files live in a content-addressed store
+(<milestone dir>/objects/<digest>, read-only) that lock entries point into;
+<milestone dir>/<id>/spec/ holds hardlinks for browsing. Files already in the
+store are linked rather than copied again.
+
 Commands:
   status         - show milestone configuration and active lock status
   create         - create lock from current artifacts
@@ -8,36 +13,91 @@ Commands:
   use            - seed artifacts from a lock
   verify         - verify artifacts match lock hashes
   set-active     - update active milestone pointer only
+  migrate        - rewrite schema_version 1 locks to schema_version 2
+  compare        - compare two milestones by Merkle root, then per key
+
+Each lock carries a ``merkle_root`` over its (key, algo, digest) entries. verify
+first rebuilds that root from the current artifacts and only walks individual
+keys (including the locked store objects) when the roots differ.
+
+Locks are written as YAML or canonical JSON per workflow.milestone.lock_format
+(default yaml); every command reads both, whichever format a lock was written in.
+
+Only argparse, pathlib and the helper modules are imported at startup; PyYAML,
+json, datetime, shutil, hashlib and the thread pool are imported by the code
+paths that need them. With a warm parse cache (.bmad/cache/parsed.marshal),
+commands that only read the workflow and locks never import PyYAML.
 """
 
 from __future__ import annotations
 
+import sys
+
+if __name__ == "__main__":
+    # Thin-client fast path: let a running bmad_daemon.py execute the command
+    # before paying for the imports below.
+    from bmad_daemon import forward
+
+    forward("milestone_lock", sys.argv[1:])
+
 import argparse
-import datetime as dt
-import hashlib
-import json
-import shutil
+import os
+import threading
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
-
-import yaml
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from file_digest import (
+    ALGORITHMS,
+    DEFAULT_ALGO,
+    LOCK_SCHEMA_VERSIONS,
+    DigestCache,
+    default_jobs,
+    entry_stat_matches,
+    lock_entry_digest,
+    lock_merkle_leaves,
+    merkle_root,
+    run_parallel,
+    stat_key,
+)
+from parse_cache import (
+    DEFAULT_LOCK_FILENAMES,
+    DEFAULT_LOCK_FORMAT,
+    LOCK_FORMATS,
+    ParsedCache,
+    dump_lock,
+    load_document,
+    lock_filename_candidates,
+    lock_filename_mismatch,
+    lock_format_of,
+    parse_yaml,
+    parsed_cache,
+    use_parsed_cache,
+)
 
 DEFAULT_KEYS = ["prd", "scope", "adr", "impact", "ui_ux_spec", "api_design"]
+DEFAULT_WORKFLOW = ".bmad/workflows/workflow.yml"
+DEFAULT_CREATE_REPORT = ".bmad/artifacts/milestone-lock-report.md"
+DEFAULT_VERIFY_REPORT = ".bmad/artifacts/milestone-verify-report.md"
+DEFAULT_USE_REPORT = ".bmad/artifacts/milestone-seed-report.md"
+LOCK_SCHEMA_VERSION = 2
 
 
 def now_iso() -> str:
+    import datetime as dt
+
     return dt.datetime.now(dt.timezone.utc).astimezone().isoformat()
 
 
 def load_yaml(path: Path) -> Dict[str, Any]:
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    data = parsed_cache().load(path, "yaml", parse_yaml)
     if not isinstance(data, dict):
         raise ValueError(f"invalid YAML object: {path}")
     return data
 
 
 def load_json(path: Path) -> Dict[str, Any]:
+    import json
+
     with path.open("r", encoding="utf-8") as f:
         data = json.load(f)
     if not isinstance(data, dict):
@@ -45,26 +105,12 @@ def load_json(path: Path) -> Dict[str, Any]:
     return data
 
 
-def dump_yaml(path: Path, data: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, allow_unicode=False, sort_keys=False)
-
-
 def write_report(path: Path, title: str, rows: List[str]) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     body = [f"# {title}", "", f"- Timestamp: {now_iso()}", ""] + rows + [""]
     path.write_text("\n".join(body), encoding="utf-8")
 
 
-def sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
 def relpath(path: Path, repo_root: Path) -> str:
     try:
         return str(path.relative_to(repo_root))
@@ -72,6 +118,40 @@ def relpath(path: Path, repo_root: Path) -> str:
         return str(path)
 
 
+def lock_digest_targets(
+    *,
+    repo_root: Path,
+    files: Dict[str, Any],
+    keys: List[str],
+    artifacts: Dict[str, str],
+    artifacts_dir: Path,
+    quick: bool = False,
+    locked: bool = True,
+) -> List[Tuple[Path, str]]:
+    targets: List[Tuple[Path, str]] = []
+    for key in keys:
+        entry = files.get(key)
+        if not isinstance(entry, dict):
+            continue
+        algo, _ = lock_entry_digest(entry)
+        paths: List[Path] = []
+        locked_path_value = entry.get("locked_path")
+        if locked and isinstance(locked_path_value, str) and locked_path_value.strip():
+            paths.append(repo_root / locked_path_value)
+        filename = artifacts.get(key)
+        if filename:
+            paths.append(artifacts_dir / filename)
+        for path in paths:
+            if quick:
+                try:
+                    if entry_stat_matches(entry, path.stat()):
+                        continue
+                except OSError:
+                    continue
+            targets.append((path, algo))
+    return targets
+
+
 def find_latest_archive_dir(repo_root: Path) -> Path | None:
     root = repo_root / ".bmad/archive"
     if not root.exists():
@@ -101,7 +181,8 @@ def resolve_config(
 
     mdir = milestone.get("dir", ".bmad/milestones")
     pointer = milestone.get("active_pointer", ".bmad/milestones/ACTIVE")
-    lock_filename = milestone.get("lock_filename", "milestone-lock.yml")
+    lock_format = resolve_lock_format(workflow)
+    lock_filename = milestone.get("lock_filename", DEFAULT_LOCK_FILENAMES[lock_format])
     keys = milestone.get("keys", DEFAULT_KEYS)
 
     if not isinstance(mdir, str) or not mdir.strip():
@@ -110,6 +191,9 @@ def resolve_config(
         raise ValueError("workflow.milestone.active_pointer must be non-empty string")
     if not isinstance(lock_filename, str) or not lock_filename.strip():
         raise ValueError("workflow.milestone.lock_filename must be non-empty string")
+    mismatch = lock_filename_mismatch(lock_filename, lock_format)
+    if mismatch:
+        raise ValueError(mismatch)
     if not isinstance(keys, list):
         raise ValueError("workflow.milestone.keys must be a list")
 
@@ -124,6 +208,30 @@ def resolve_config(
     )
 
 
+def resolve_hash_algo(workflow: Dict[str, Any]) -> str:
+    milestone = workflow.get("milestone", {})
+    algo = DEFAULT_ALGO
+    if isinstance(milestone, dict):
+        algo = milestone.get("hash_algo", DEFAULT_ALGO)
+    if algo not in ALGORITHMS:
+        raise ValueError(
+            f"workflow.milestone.hash_algo must be one of: {'|'.join(ALGORITHMS)}"
+        )
+    return str(algo)
+
+
+def resolve_lock_format(workflow: Dict[str, Any]) -> str:
+    milestone = workflow.get("milestone", {})
+    lock_format = DEFAULT_LOCK_FORMAT
+    if isinstance(milestone, dict):
+        lock_format = milestone.get("lock_format", DEFAULT_LOCK_FORMAT)
+    if lock_format not in LOCK_FORMATS:
+        raise ValueError(
+            f"workflow.milestone.lock_format must be one of: {'|'.join(LOCK_FORMATS)}"
+        )
+    return str(lock_format)
+
+
 def read_active_milestone(pointer_path: Path) -> str | None:
     if not pointer_path.exists():
         return None
@@ -137,19 +245,136 @@ def write_active_milestone(pointer_path: Path, milestone_id: str) -> None:
 
 
 def load_lock(lock_path: Path) -> Dict[str, Any]:
-    data = load_yaml(lock_path)
+    data = load_document(lock_path)
+    if not isinstance(data, dict):
+        raise ValueError(f"invalid lock document: {lock_path}")
     if not isinstance(data.get("files"), dict):
         raise ValueError(f"lock missing files mapping: {lock_path}")
+    if data.get("schema_version", 1) not in LOCK_SCHEMA_VERSIONS:
+        raise ValueError(
+            f"unsupported lock schema_version {data.get('schema_version')!r}: {lock_path}"
+        )
     return data
 
 
+def lock_merkle_root(lock: Dict[str, Any]) -> str:
+    """Root recorded in the lock, or computed from its entries (older locks)."""
+    root = lock.get("merkle_root")
+    if isinstance(root, str) and root:
+        return root
+    return merkle_root(lock_merkle_leaves(lock["files"]))
+
+
+def current_artifact_root(
+    *,
+    files: Dict[str, Any],
+    keys: List[str],
+    artifacts: Dict[str, str],
+    artifacts_dir: Path,
+    digests: DigestCache,
+    quick: bool = False,
+) -> str | None:
+    """Merkle root of the current artifacts for the lock's (key, algo) entries.
+
+    None when the root cannot match anyway (key set differs from the workflow,
+    unmapped or missing artifact, unsupported algo); callers then walk per key.
+    """
+    if set(files) != set(keys):
+        return None
+    leaves: List[Tuple[str, str, str]] = []
+    for key, entry in files.items():
+        filename = artifacts.get(key)
+        if not isinstance(entry, dict) or not filename:
+            return None
+        algo, expected = lock_entry_digest(entry)
+        if algo not in ALGORITHMS:
+            return None
+        path = artifacts_dir / filename
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if st.st_size == 0:
+            return None
+        if quick and entry_stat_matches(entry, st):
+            leaves.append((key, algo, expected))
+        else:
+            leaves.append((key, algo, digests.digest(path, st, algo)))
+    return merkle_root(leaves)
+
+
 def resolve_lock_path(
     milestone_dir: Path, milestone_id: str, lock_filename: str
 ) -> Path:
+    """Existing lock of ``milestone_id`` in either format; else where create
+    would write it."""
+    for name in lock_filename_candidates(lock_filename):
+        path = milestone_dir / milestone_id / name
+        if path.is_file():
+            return path
     return milestone_dir / milestone_id / lock_filename
 
 
+def list_milestone_ids(milestone_dir: Path, lock_filename: str) -> List[str]:
+    if not milestone_dir.is_dir():
+        return []
+    names = lock_filename_candidates(lock_filename)
+    return sorted(
+        p.name
+        for p in milestone_dir.iterdir()
+        if p.is_dir() and any((p / name).is_file() for name in names)
+    )
+
+
+def objects_dir_for(milestone_dir: Path) -> Path:
+    return milestone_dir / "objects"
+
+
+def store_object(
+    objects_dir: Path, src: Path, digests: DigestCache, algo: str
+) -> Tuple[Path, str, bool]:
+    """Add ``src`` to the object store; returns (object path, digest, reused).
+
+    Objects are named by their hex digest; sha256 and blake2b digests differ in
+    length, so both algorithms share one directory without collisions.
+    """
+    known = digests.cached(src, src.stat(), algo)
+    if known is not None:
+        obj = objects_dir / known
+        if obj.exists() and digests.digest(obj, algo=algo) == known:
+            return obj, known, True
+
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    tmp = objects_dir / f".tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        digest = digests.copy(src, tmp, algo)
+        obj = objects_dir / digest
+        if obj.exists() and digests.digest(obj, algo=algo) == digest:
+            return obj, digest, True
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, obj)
+        digests.remember(obj, digest, algo)
+        return obj, digest, False
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def link_spec_file(obj: Path, dst: Path) -> None:
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+    try:
+        os.link(obj, dst)
+    except OSError:
+        import shutil
+
+        shutil.copy2(obj, dst)
+
+
 def update_state_milestone(repo_root: Path, milestone_id: str, lock_path: Path) -> None:
+    import json
+
     state_path = repo_root / ".bmad/artifacts/workflow-state.json"
     if not state_path.exists():
         return
@@ -167,6 +392,100 @@ def update_state_milestone(repo_root: Path, milestone_id: str, lock_path: Path)
     )
 
 
+CATALOG_CREATE_EVENTS = {"artifacts": "create", "archive": "import-archive"}
+# Events of commands that do not open the catalog, imported on its next open.
+CATALOG_EVENT_LOG = ".bmad/cache/milestone-events.log"
+
+
+def catalog_locks(milestone_dir: Path, lock_filename: str) -> Dict[str, Path]:
+    """Milestone id -> lock path for every lock under ``milestone_dir``."""
+    return {
+        milestone_id: resolve_lock_path(milestone_dir, milestone_id, lock_filename)
+        for milestone_id in list_milestone_ids(milestone_dir, lock_filename)
+    }
+
+
+def record_catalog(
+    repo_root: Path,
+    milestone_id: str,
+    events: List[str],
+    *,
+    lock_path: Path | None = None,
+    lock: Dict[str, Any] | None = None,
+    enabled: bool = True,
+) -> None:
+    """Record ``events`` (and index a just-written ``lock``) in the milestone
+    catalog. Failures are ignored: the next list/history re-syncs the index."""
+    if not enabled:
+        return
+    import sqlite3
+    import time
+
+    from milestone_catalog import MilestoneCatalog
+
+    try:
+        with MilestoneCatalog.for_repo(repo_root) as catalog:
+            if lock_path is not None and lock is not None:
+                catalog.index_lock(milestone_id, lock_path, lock)
+            at_ns = time.time_ns()
+            for event in events:
+                catalog.record_event(event, milestone_id, at_ns)
+            catalog.import_events(repo_root / CATALOG_EVENT_LOG)
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def log_catalog_event(
+    repo_root: Path, milestone_id: str, event: str, *, enabled: bool = True
+) -> None:
+    """Append ``event`` to the catalog's event log without opening SQLite,
+    for pointer-only commands. Failures are ignored, as in record_catalog()."""
+    if not enabled:
+        return
+    import time
+
+    from milestone_catalog import append_event
+
+    try:
+        append_event(repo_root / CATALOG_EVENT_LOG, event, milestone_id, time.time_ns())
+    except OSError:
+        pass
+
+
+class CreateResult(NamedTuple):
+    """Outcome of create_lock(); ``error`` is None when the lock was written."""
+
+    milestone_id: str
+    lock_path: Path
+    report_path: Path
+    error: Optional[str] = None
+    merkle_root: Optional[str] = None
+    copied: Tuple[str, ...] = ()
+    reused: Tuple[str, ...] = ()
+    missing_source: Tuple[str, ...] = ()
+    missing_map: Tuple[str, ...] = ()
+    set_active: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def report_create(result: CreateResult) -> int:
+    """Print a create/import-archive result; returns the command's exit code."""
+    if result.error is not None:
+        print(result.error)
+        if result.missing_source or result.missing_map:
+            print(f"report={result.report_path}")
+        return 1
+    print(
+        f"milestone={result.milestone_id} copied={len(result.copied)} reused={len(result.reused)} missing_source={len(result.missing_source)} missing_map={len(result.missing_map)}"
+    )
+    print(f"lock={result.lock_path}")
+    print(f"report={result.report_path}")
+    return 0
+
+
 def create_lock(
     *,
     repo_root: Path,
@@ -178,8 +497,14 @@ def create_lock(
     allow_partial: bool,
     set_active: bool,
     report_path: Path,
-) -> int:
+    digests: DigestCache,
+    jobs: int = 1,
+    algo: str | None = None,
+    catalog: bool = True,
+) -> CreateResult:
     workflow = load_yaml(repo_root / workflow_path)
+    algo = algo or resolve_hash_algo(workflow)
+    lock_format = resolve_lock_format(workflow)
     (
         enabled,
         artifacts_dir,
@@ -196,14 +521,23 @@ def create_lock(
             "Milestone Create Report",
             ["## Summary", "- Milestone is disabled in workflow", "- No changes made"],
         )
-        print("milestone is disabled in workflow")
-        return 1
+        return CreateResult(
+            milestone_id,
+            milestone_dir / milestone_id / lock_filename,
+            report_path,
+            error="milestone is disabled in workflow",
+        )
 
-    lock_path = resolve_lock_path(milestone_dir, milestone_id, lock_filename)
+    existing_lock = resolve_lock_path(milestone_dir, milestone_id, lock_filename)
+    lock_path = milestone_dir / milestone_id / lock_filename
     spec_dir = lock_path.parent / "spec"
-    if lock_path.exists() and not force:
-        print(f"lock already exists: {lock_path} (use --force to overwrite)")
-        return 1
+    if existing_lock.exists() and not force:
+        return CreateResult(
+            milestone_id,
+            existing_lock,
+            report_path,
+            error=f"lock already exists: {existing_lock} (use --force to overwrite)",
+        )
 
     missing_map: List[str] = []
     missing_source: List[str] = []
@@ -233,28 +567,51 @@ def create_lock(
         ] + [f"- {item}" for item in missing_source]
         rows += ["", "## Missing Mapping"] + [f"- {item}" for item in missing_map]
         write_report(report_path, "Milestone Create Report", rows)
-        print("failed: missing sources or mapping (use --allow-partial to bypass)")
-        print(f"report={report_path}")
-        return 1
+        return CreateResult(
+            milestone_id,
+            lock_path,
+            report_path,
+            error="failed: missing sources or mapping (use --allow-partial to bypass)",
+            missing_source=tuple(missing_source),
+            missing_map=tuple(missing_map),
+        )
 
     copied: List[str] = []
-    files: Dict[str, Dict[str, str]] = {}
+    reused: List[str] = []
+    files: Dict[str, Dict[str, Any]] = {}
+    objects_dir = objects_dir_for(milestone_dir)
     spec_dir.mkdir(parents=True, exist_ok=True)
 
-    for key, filename, src in available:
-        dst = spec_dir / filename
-        dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
-        digest = sha256_file(dst)
+    def transfer(
+        item: Tuple[str, str, Path]
+    ) -> Tuple[Path, str, bool, os.stat_result | None]:
+        _, filename, src = item
+        before = src.stat()
+        obj, digest, object_reused = store_object(objects_dir, src, digests, algo)
+        link_spec_file(obj, spec_dir / filename)
+        # Only record metadata that provably belongs to the hashed content.
+        stable = stat_key(src.stat()) == stat_key(before)
+        return obj, digest, object_reused, before if stable else None
+
+    transferred = run_parallel(transfer, available, jobs)
+    for (key, filename, _), (obj, digest, object_reused, src_stat) in zip(
+        available, transferred
+    ):
         files[key] = {
             "artifact": filename,
-            "locked_path": relpath(dst, repo_root),
-            "sha256": digest,
+            "locked_path": relpath(obj, repo_root),
+            "algo": algo,
+            "digest": digest,
         }
-        copied.append(relpath(dst, repo_root))
+        if src_stat is not None:
+            files[key]["size"] = src_stat.st_size
+            files[key]["mtime_ns"] = src_stat.st_mtime_ns
+        copied.append(relpath(spec_dir / filename, repo_root))
+        if object_reused:
+            reused.append(f"{key}:{relpath(obj, repo_root)}")
 
     lock_data = {
-        "schema_version": 1,
+        "schema_version": LOCK_SCHEMA_VERSION,
         "workflow_path": workflow_path,
         "milestone_id": milestone_id,
         "created_at": now_iso(),
@@ -265,13 +622,26 @@ def create_lock(
         "artifacts_dir": relpath(artifacts_dir, repo_root),
         "keys": keys,
         "files": files,
+        "merkle_root": merkle_root(lock_merkle_leaves(files)),
     }
-    dump_yaml(lock_path, lock_data)
+    dump_lock(lock_path, lock_data, lock_format)
+    if existing_lock != lock_path and existing_lock.exists():
+        # Replaced a lock written in the other format; readers would prefer
+        # lock_path anyway, but a stale sibling is confusing.
+        existing_lock.unlink()
 
     if set_active:
         write_active_milestone(pointer_path, milestone_id)
 
     update_state_milestone(repo_root, milestone_id, lock_path)
+    record_catalog(
+        repo_root,
+        milestone_id,
+        [CATALOG_CREATE_EVENTS[source_label]] + (["set-active"] if set_active else []),
+        lock_path=lock_path,
+        lock=lock_data,
+        enabled=catalog,
+    )
 
     rows = [
         "## Summary",
@@ -279,29 +649,63 @@ def create_lock(
         f"- Milestone ID: {milestone_id}",
         f"- Lock File: {relpath(lock_path, repo_root)}",
         f"- Locked Keys: {', '.join(sorted(files.keys()))}",
+        f"- Merkle Root: {lock_data['merkle_root']}",
         f"- Copied: {len(copied)}",
+        f"- Reused objects: {len(reused)}",
         f"- Missing source: {len(missing_source)}",
         f"- Missing mapping: {len(missing_map)}",
         f"- Set Active: {'yes' if set_active else 'no'}",
         "",
         "## Copied Files",
     ] + [f"- {item}" for item in copied]
+    rows += ["", "## Reused Objects"] + [f"- {item}" for item in reused]
     rows += ["", "## Missing Source"] + [f"- {item}" for item in missing_source]
     rows += ["", "## Missing Mapping"] + [f"- {item}" for item in missing_map]
 
     write_report(report_path, "Milestone Create Report", rows)
-
-    print(
-        f"milestone={milestone_id} copied={len(copied)} missing_source={len(missing_source)} missing_map={len(missing_map)}"
+    return CreateResult(
+        milestone_id,
+        lock_path,
+        report_path,
+        merkle_root=lock_data["merkle_root"],
+        copied=tuple(copied),
+        reused=tuple(reused),
+        missing_source=tuple(missing_source),
+        missing_map=tuple(missing_map),
+        set_active=set_active,
     )
-    print(f"lock={lock_path}")
-    print(f"report={report_path}")
-    return 0
 
 
-def cmd_status(args: argparse.Namespace) -> int:
-    repo_root = Path.cwd()
-    workflow = load_yaml(repo_root / args.workflow)
+class KeyStatus(NamedTuple):
+    key: str
+    label: str  # OK, DRIFT, or what is missing/broken, e.g. "ARTIFACT MISSING"
+    detail: str
+
+
+class StatusResult(NamedTuple):
+    """Milestone configuration plus the state of the active lock's keys."""
+
+    workflow_path: str
+    enabled: bool
+    artifacts_dir: Path
+    milestone_dir: Path
+    pointer_path: Path
+    keys: List[str]
+    active_milestone: Optional[str] = None
+    lock_path: Optional[Path] = None
+    lock_found: bool = False
+    merkle_root: Optional[str] = None
+    entries: Tuple[KeyStatus, ...] = ()
+
+    @property
+    def problems(self) -> int:
+        return sum(1 for entry in self.entries if entry.label != "OK")
+
+
+def milestone_status(
+    *, repo_root: Path, workflow_path: str, digests: DigestCache, jobs: int = 1
+) -> StatusResult:
+    workflow = load_yaml(repo_root / workflow_path)
     (
         enabled,
         artifacts_dir,
@@ -311,75 +715,110 @@ def cmd_status(args: argparse.Namespace) -> int:
         artifacts,
         keys,
     ) = resolve_config(workflow, repo_root)
-
-    print(f"workflow: {args.workflow}")
-    print(f"enabled: {enabled}")
-    print(f"artifacts_dir: {artifacts_dir}")
-    print(f"milestone_dir: {milestone_dir}")
-    print(f"active_pointer: {pointer_path}")
-    print(f"keys: {', '.join(keys)}")
-
+    result = StatusResult(
+        workflow_path, enabled, artifacts_dir, milestone_dir, pointer_path, keys
+    )
     if not enabled:
-        return 0
+        return result
 
     active = read_active_milestone(pointer_path)
-    print(f"active_milestone: {active if active else '<none>'}")
     if not active:
-        return 1 if args.strict else 0
-
+        return result
     lock_path = resolve_lock_path(milestone_dir, active, lock_filename)
+    result = result._replace(active_milestone=active, lock_path=lock_path)
     if not lock_path.exists():
-        print(f"lock: MISSING ({lock_path})")
-        return 1 if args.strict else 0
+        return result
 
     lock = load_lock(lock_path)
     files = lock.get("files", {})
+    digests.prefetch(
+        lock_digest_targets(
+            repo_root=repo_root,
+            files=files,
+            keys=keys,
+            artifacts=artifacts,
+            artifacts_dir=artifacts_dir,
+        ),
+        jobs,
+    )
 
-    missing = 0
+    entries: List[KeyStatus] = []
     for key in keys:
         filename = artifacts.get(key)
         if not filename:
-            print(f"[MISSING MAP] {key} -> <not mapped in workflow.artifacts>")
-            missing += 1
+            entries.append(
+                KeyStatus(key, "MISSING MAP", "<not mapped in workflow.artifacts>")
+            )
             continue
         entry = files.get(key)
         if not isinstance(entry, dict):
-            print(f"[MISSING LOCK] {key} -> <entry missing in lock>")
-            missing += 1
+            entries.append(KeyStatus(key, "MISSING LOCK", "<entry missing in lock>"))
             continue
 
         locked_path = repo_root / str(entry.get("locked_path", ""))
         artifact_path = artifacts_dir / filename
 
         if not locked_path.exists() or locked_path.stat().st_size == 0:
-            print(f"[MISSING LOCK FILE] {key} -> {locked_path}")
-            missing += 1
+            entries.append(KeyStatus(key, "MISSING LOCK FILE", str(locked_path)))
             continue
 
-        digest = str(entry.get("sha256", ""))
-        lock_ok = digest == sha256_file(locked_path)
-        if not lock_ok:
-            print(f"[LOCK HASH MISMATCH] {key} -> {locked_path}")
-            missing += 1
+        algo, digest = lock_entry_digest(entry)
+        if algo not in ALGORITHMS:
+            entries.append(KeyStatus(key, "UNSUPPORTED ALGO", algo or "<none>"))
+            continue
+        if digest != digests.digest(locked_path, algo=algo):
+            entries.append(KeyStatus(key, "LOCK HASH MISMATCH", str(locked_path)))
             continue
 
         if not artifact_path.exists() or artifact_path.stat().st_size == 0:
-            print(f"[ARTIFACT MISSING] {key} -> {artifact_path}")
-            missing += 1
+            entries.append(KeyStatus(key, "ARTIFACT MISSING", str(artifact_path)))
             continue
 
-        artifact_ok = sha256_file(artifact_path) == digest
-        label = "OK" if artifact_ok else "DRIFT"
-        print(f"[{label}] {key} -> {artifact_path}")
-        if not artifact_ok:
-            missing += 1
+        artifact_ok = digests.digest(artifact_path, algo=algo) == digest
+        entries.append(
+            KeyStatus(key, "OK" if artifact_ok else "DRIFT", str(artifact_path))
+        )
 
-    return 1 if missing and args.strict else 0
+    return result._replace(
+        lock_found=True, merkle_root=lock_merkle_root(lock), entries=tuple(entries)
+    )
+
+
+def cmd_status(args: argparse.Namespace) -> int:
+    result = milestone_status(
+        repo_root=Path.cwd(),
+        workflow_path=args.workflow,
+        digests=args.digests,
+        jobs=args.jobs,
+    )
+    print(f"workflow: {result.workflow_path}")
+    print(f"enabled: {result.enabled}")
+    print(f"artifacts_dir: {result.artifacts_dir}")
+    print(f"milestone_dir: {result.milestone_dir}")
+    print(f"active_pointer: {result.pointer_path}")
+    print(f"keys: {', '.join(result.keys)}")
+
+    if not result.enabled:
+        return 0
+
+    active = result.active_milestone
+    print(f"active_milestone: {active if active else '<none>'}")
+    if not active:
+        return 1 if args.strict else 0
+
+    if not result.lock_found:
+        print(f"lock: MISSING ({result.lock_path})")
+        return 1 if args.strict else 0
+
+    print(f"merkle_root: {result.merkle_root}")
+    for entry in result.entries:
+        print(f"[{entry.label}] {entry.key} -> {entry.detail}")
+    return 1 if result.problems and args.strict else 0
 
 
 def cmd_create(args: argparse.Namespace) -> int:
     repo_root = Path.cwd()
-    return create_lock(
+    result = create_lock(
         repo_root=repo_root,
         workflow_path=args.workflow,
         source_dir=repo_root / ".bmad/artifacts",
@@ -389,7 +828,12 @@ def cmd_create(args: argparse.Namespace) -> int:
         allow_partial=args.allow_partial,
         set_active=args.set_active,
         report_path=repo_root / args.report,
+        digests=args.digests,
+        jobs=args.jobs,
+        algo=args.algo,
+        catalog=not args.no_catalog,
     )
+    return report_create(result)
 
 
 def cmd_import_archive(args: argparse.Namespace) -> int:
@@ -407,7 +851,7 @@ def cmd_import_archive(args: argparse.Namespace) -> int:
         print(f"archive dir not found: {source_dir}")
         return 1
 
-    return create_lock(
+    result = create_lock(
         repo_root=repo_root,
         workflow_path=args.workflow,
         source_dir=source_dir,
@@ -417,7 +861,12 @@ def cmd_import_archive(args: argparse.Namespace) -> int:
         allow_partial=args.allow_partial,
         set_active=args.set_active,
         report_path=repo_root / args.report,
+        digests=args.digests,
+        jobs=args.jobs,
+        algo=args.algo,
+        catalog=not args.no_catalog,
     )
+    return report_create(result)
 
 
 def resolve_target_lock(
@@ -452,26 +901,53 @@ def resolve_target_lock(
     return lock_path, lock, artifacts, artifacts_dir, resolved_id, lock_filename, keys
 
 
-def cmd_use(args: argparse.Namespace) -> int:
-    repo_root = Path.cwd()
+class UseResult(NamedTuple):
+    """Outcome of seeding .bmad/artifacts from a lock.
+
+    Items are artifact paths, or "<key>:<reason>" strings for failures.
+    """
+
+    milestone_id: str
+    lock_path: Path
+    copied: Tuple[str, ...]
+    skipped: Tuple[str, ...]
+    failed: Tuple[str, ...]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+# (outcome index, key, locked copy, artifact, algo, expected digest, copy?)
+SeedItem = Tuple[int, str, Path, Path, str, str, bool]
 
-    try:
-        (
-            lock_path,
-            lock,
-            artifacts,
-            artifacts_dir,
-            milestone_id,
-            _,
-            _keys,
-        ) = resolve_target_lock(
-            repo_root=repo_root,
-            workflow_path=args.workflow,
-            milestone_id=args.milestone_id,
-        )
-    except Exception as exc:
-        print(exc)
-        return 1
+
+def seed_milestone(
+    *,
+    repo_root: Path,
+    workflow_path: str,
+    milestone_id: str | None,
+    digests: DigestCache,
+    jobs: int = 1,
+    force: bool = False,
+    catalog: bool = True,
+) -> UseResult:
+    """Seed artifacts from a milestone (default: the active one); raises
+    ValueError when it cannot be resolved. The state's milestone section is
+    updated only when every entry was seeded."""
+    (
+        lock_path,
+        lock,
+        artifacts,
+        artifacts_dir,
+        milestone_id,
+        _,
+        _keys,
+    ) = resolve_target_lock(
+        repo_root=repo_root,
+        workflow_path=workflow_path,
+        milestone_id=milestone_id,
+    )
 
     files = lock.get("files", {})
     copied: List[str] = []
@@ -480,89 +956,277 @@ def cmd_use(args: argparse.Namespace) -> int:
 
     artifacts_dir.mkdir(parents=True, exist_ok=True)
 
+    # (kind, item) per lock entry in lock order; None for entries that still
+    # need hashing or copying.
+    outcomes: List[Tuple[str, str] | None] = []
+    pending: List[SeedItem] = []
+
     for key, entry in files.items():
         if not isinstance(entry, dict):
-            failed.append(f"{key}:invalid lock entry")
+            outcomes.append(("failed", f"{key}:invalid lock entry"))
             continue
 
         filename = artifacts.get(key)
         if not filename:
-            failed.append(f"{key}:not mapped in workflow.artifacts")
+            outcomes.append(("failed", f"{key}:not mapped in workflow.artifacts"))
             continue
 
         src = repo_root / str(entry.get("locked_path", ""))
-        expected_hash = str(entry.get("sha256", ""))
-        if not src.exists() or src.stat().st_size == 0:
-            failed.append(f"{key}:locked file missing {src}")
+        algo, expected_hash = lock_entry_digest(entry)
+        if algo not in ALGORITHMS:
+            outcomes.append(("failed", f"{key}:unsupported hash algo {algo!r}"))
             continue
-        if sha256_file(src) != expected_hash:
-            failed.append(f"{key}:locked file hash mismatch {src}")
+        if not src.exists() or src.stat().st_size == 0:
+            outcomes.append(("failed", f"{key}:locked file missing {src}"))
             continue
 
         dst = artifacts_dir / filename
-        if dst.exists() and not args.force:
-            skipped.append(relpath(dst, repo_root))
-            continue
-
+        copy = not dst.exists() or force
+        pending.append((len(outcomes), key, src, dst, algo, expected_hash, copy))
+        outcomes.append(None)
+
+    def seed(item: SeedItem) -> Tuple[str, str]:
+        _, key, src, dst, algo, expected_hash, copy = item
+        if not copy:
+            if digests.digest(src, algo=algo) != expected_hash:
+                return "failed", f"{key}:locked file hash mismatch {src}"
+            return "skipped", relpath(dst, repo_root)
+
+        # Copy to a sibling temp file so a corrupt lock never clobbers dst.
         dst.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(src, dst)
-        copied.append(relpath(dst, repo_root))
+        tmp = dst.with_name(f".{dst.name}.{os.getpid()}.tmp")
+        try:
+            digest = digests.copy(src, tmp, algo)
+            if digest != expected_hash:
+                return "failed", f"{key}:locked file hash mismatch {src}"
+            # Store objects are read-only; seeded artifacts must stay editable.
+            os.chmod(tmp, tmp.stat().st_mode | 0o200)
+            os.replace(tmp, dst)
+            digests.remember(dst, digest, algo)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        return "copied", relpath(dst, repo_root)
+
+    for item, outcome in zip(pending, run_parallel(seed, pending, jobs)):
+        outcomes[item[0]] = outcome
+
+    buckets = {"copied": copied, "skipped": skipped, "failed": failed}
+    for outcome in outcomes:
+        if outcome is not None:
+            buckets[outcome[0]].append(outcome[1])
 
     if not failed:
         update_state_milestone(repo_root, milestone_id, lock_path)
+        record_catalog(repo_root, milestone_id, ["use"], enabled=catalog)
 
-    report_path = repo_root / args.report
+    return UseResult(
+        milestone_id, lock_path, tuple(copied), tuple(skipped), tuple(failed)
+    )
+
+
+def write_use_report(path: Path, result: UseResult, repo_root: Path) -> None:
     rows = [
         "## Summary",
-        f"- Milestone ID: {milestone_id}",
-        f"- Lock File: {relpath(lock_path, repo_root)}",
-        f"- Copied: {len(copied)}",
-        f"- Skipped: {len(skipped)}",
-        f"- Failed: {len(failed)}",
+        f"- Milestone ID: {result.milestone_id}",
+        f"- Lock File: {relpath(result.lock_path, repo_root)}",
+        f"- Copied: {len(result.copied)}",
+        f"- Skipped: {len(result.skipped)}",
+        f"- Failed: {len(result.failed)}",
         "",
         "## Copied",
-    ] + [f"- {item}" for item in copied]
-    rows += ["", "## Skipped"] + [f"- {item}" for item in skipped]
-    rows += ["", "## Failed"] + [f"- {item}" for item in failed]
-    write_report(report_path, "Milestone Seed Report", rows)
+    ] + [f"- {item}" for item in result.copied]
+    rows += ["", "## Skipped"] + [f"- {item}" for item in result.skipped]
+    rows += ["", "## Failed"] + [f"- {item}" for item in result.failed]
+    write_report(path, "Milestone Seed Report", rows)
 
-    print(
-        f"milestone={milestone_id} copied={len(copied)} skipped={len(skipped)} failed={len(failed)}"
-    )
-    print(f"report={report_path}")
-    return 1 if failed else 0
 
-
-def cmd_verify(args: argparse.Namespace) -> int:
+def cmd_use(args: argparse.Namespace) -> int:
     repo_root = Path.cwd()
-
     try:
-        (
-            lock_path,
-            lock,
-            artifacts,
-            artifacts_dir,
-            milestone_id,
-            _,
-            keys,
-        ) = resolve_target_lock(
+        result = seed_milestone(
             repo_root=repo_root,
             workflow_path=args.workflow,
             milestone_id=args.milestone_id,
+            digests=args.digests,
+            jobs=args.jobs,
+            force=args.force,
+            catalog=not args.no_catalog,
         )
     except Exception as exc:
         print(exc)
         return 1
 
+    report_path = repo_root / args.report
+    write_use_report(report_path, result, repo_root)
+    print(
+        f"milestone={result.milestone_id} copied={len(result.copied)} skipped={len(result.skipped)} failed={len(result.failed)}"
+    )
+    print(f"report={report_path}")
+    return 0 if result.ok else 1
+
+
+def verify_mode(args: argparse.Namespace) -> str:
+    if getattr(args, "paranoid", False):
+        return "paranoid"
+    return "quick" if getattr(args, "quick", False) else "default"
+
+
+class VerifyResult(NamedTuple):
+    """Per-key outcome of verifying one milestone's artifacts against its lock.
+
+    Items are "<key>:<path or reason>" strings, as in the verify report.
+    """
+
+    milestone_id: str
+    lock_path: Path
+    mode: str
+    root_status: str  # match | mismatch | stale | skipped | absent
+    ok: Tuple[str, ...]
+    drift: Tuple[str, ...]
+    missing: Tuple[str, ...]
+    extra: Tuple[str, ...]
+    by_metadata: int  # keys reported OK from recorded size/mtime_ns alone
+
+    @property
+    def passed(self) -> bool:
+        return not (self.drift or self.missing)
+
+
+def verify_milestone(
+    *,
+    repo_root: Path,
+    workflow_path: str,
+    milestone_id: str | None,
+    digests: DigestCache,
+    jobs: int = 1,
+    mode: str = "default",
+) -> VerifyResult:
+    """Verify a milestone (default: the active one); raises ValueError when it
+    cannot be resolved."""
+    (
+        lock_path,
+        lock,
+        artifacts,
+        artifacts_dir,
+        milestone_id,
+        _,
+        keys,
+    ) = resolve_target_lock(
+        repo_root=repo_root,
+        workflow_path=workflow_path,
+        milestone_id=milestone_id,
+    )
+    return verify_lock(
+        repo_root=repo_root,
+        milestone_id=milestone_id,
+        lock_path=lock_path,
+        lock=lock,
+        artifacts=artifacts,
+        artifacts_dir=artifacts_dir,
+        keys=keys,
+        digests=digests,
+        jobs=jobs,
+        mode=mode,
+    )
+
+
+def lock_root_status(
+    *,
+    repo_root: Path,
+    lock: Dict[str, Any],
+    artifacts: Dict[str, str],
+    artifacts_dir: Path,
+    keys: List[str],
+    digests: DigestCache,
+    jobs: int,
+    mode: str,
+) -> str:
+    """Compare the current artifacts with the lock's stored Merkle root:
+    match | mismatch | stale | skipped | absent."""
+    files = lock.get("files", {})
+    # A hand-edited lock whose stored root no longer matches its own entries
+    # is "stale" and never takes the fast path.
+    stored_root = lock.get("merkle_root")
+    if not isinstance(stored_root, str) or not stored_root:
+        return "absent"
+    if mode == "paranoid":
+        return "skipped"
+    if stored_root != merkle_root(lock_merkle_leaves(files)):
+        return "stale"
+    quick = mode == "quick"
+    digests.prefetch(
+        lock_digest_targets(
+            repo_root=repo_root,
+            files=files,
+            keys=keys,
+            artifacts=artifacts,
+            artifacts_dir=artifacts_dir,
+            quick=quick,
+            locked=False,
+        ),
+        jobs,
+    )
+    current_root = current_artifact_root(
+        files=files,
+        keys=keys,
+        artifacts=artifacts,
+        artifacts_dir=artifacts_dir,
+        digests=digests,
+        quick=quick,
+    )
+    return "match" if current_root == stored_root else "mismatch"
+
+
+def verify_lock(
+    *,
+    repo_root: Path,
+    milestone_id: str,
+    lock_path: Path,
+    lock: Dict[str, Any],
+    artifacts: Dict[str, str],
+    artifacts_dir: Path,
+    keys: List[str],
+    digests: DigestCache,
+    jobs: int = 1,
+    mode: str = "default",
+) -> VerifyResult:
+    """Verify the artifacts against one loaded lock."""
+    quick = mode == "quick"
     files = lock.get("files", {})
     if not isinstance(files, dict):
-        print(f"invalid lock format, missing files mapping: {lock_path}")
-        return 1
+        raise ValueError(f"invalid lock format, missing files mapping: {lock_path}")
 
     ok: List[str] = []
     drift: List[str] = []
     missing: List[str] = []
     extra: List[str] = []
+    by_metadata = 0
+
+    digests.prefetch(
+        lock_digest_targets(
+            repo_root=repo_root,
+            files=files,
+            keys=keys,
+            artifacts=artifacts,
+            artifacts_dir=artifacts_dir,
+            quick=quick,
+        ),
+        jobs,
+    )
+    # Fast path: one root comparison covers every artifact. The root is built
+    # from the lock entries, not from the locked copies, so those are still
+    # checked key by key below.
+    root_status = lock_root_status(
+        repo_root=repo_root,
+        lock=lock,
+        artifacts=artifacts,
+        artifacts_dir=artifacts_dir,
+        keys=keys,
+        digests=digests,
+        jobs=jobs,
+        mode=mode,
+    )
 
     for key in keys:
         filename = artifacts.get(key)
@@ -576,29 +1240,43 @@ def cmd_verify(args: argparse.Namespace) -> int:
             continue
 
         locked_path_value = entry.get("locked_path")
-        expected_hash = str(entry.get("sha256", ""))
+        algo, expected_hash = lock_entry_digest(entry)
         if not isinstance(locked_path_value, str) or not locked_path_value.strip():
             missing.append(f"{key}:invalid locked_path in lock")
             continue
+        if algo not in ALGORITHMS:
+            missing.append(f"{key}:unsupported hash algo {algo!r} in lock")
+            continue
 
-        locked_path = resolve_lock_path(repo_root, locked_path_value)
+        locked_path = repo_root / locked_path_value
         if not locked_path.exists() or locked_path.stat().st_size == 0:
             missing.append(f"{key}:locked file missing {locked_path}")
             continue
 
-        locked_hash = sha256_file(locked_path)
-        if locked_hash != expected_hash:
-            drift.append(
-                f"{key}:locked file hash mismatch {relpath(locked_path, repo_root)}"
-            )
-            continue
+        locked_known = quick and entry_stat_matches(entry, locked_path.stat())
+        if not locked_known:
+            locked_hash = digests.digest(locked_path, algo=algo)
+            if locked_hash != expected_hash:
+                drift.append(
+                    f"{key}:locked file hash mismatch {relpath(locked_path, repo_root)}"
+                )
+                continue
 
         artifact_path = artifacts_dir / filename
+        if root_status == "match":
+            ok.append(f"{key}:{relpath(artifact_path, repo_root)}")
+            continue
+
         if not artifact_path.exists() or artifact_path.stat().st_size == 0:
             missing.append(f"{key}:{artifact_path}")
             continue
 
-        digest = sha256_file(artifact_path)
+        if quick and entry_stat_matches(entry, artifact_path.stat()):
+            ok.append(f"{key}:{relpath(artifact_path, repo_root)}")
+            by_metadata += 1
+            continue
+
+        digest = digests.digest(artifact_path, algo=algo)
         if digest == expected_hash:
             ok.append(f"{key}:{relpath(artifact_path, repo_root)}")
         else:
@@ -608,28 +1286,424 @@ def cmd_verify(args: argparse.Namespace) -> int:
         if key not in keys:
             extra.append(str(key))
 
-    report_path = repo_root / args.report
+    return VerifyResult(
+        milestone_id,
+        lock_path,
+        mode,
+        root_status,
+        tuple(ok),
+        tuple(drift),
+        tuple(missing),
+        tuple(extra),
+        by_metadata,
+    )
+
+
+def write_verify_report(path: Path, result: VerifyResult, repo_root: Path) -> None:
     rows = [
         "## Summary",
-        f"- Milestone ID: {milestone_id}",
-        f"- Lock File: {relpath(lock_path, repo_root)}",
-        f"- OK: {len(ok)}",
-        f"- Drift: {len(drift)}",
-        f"- Missing: {len(missing)}",
-        f"- Extra lock keys: {len(extra)}",
+        f"- Milestone ID: {result.milestone_id}",
+        f"- Lock File: {relpath(result.lock_path, repo_root)}",
+        f"- OK: {len(result.ok)}",
+        f"- Drift: {len(result.drift)}",
+        f"- Missing: {len(result.missing)}",
+        f"- Extra lock keys: {len(result.extra)}",
+        f"- Mode: {result.mode}",
+        f"- Merkle root: {result.root_status}",
+        f"- OK by size/mtime only: {result.by_metadata}",
         "",
         "## OK",
-    ] + [f"- {item}" for item in ok]
-    rows += ["", "## Drift"] + [f"- {item}" for item in drift]
-    rows += ["", "## Missing"] + [f"- {item}" for item in missing]
-    rows += ["", "## Extra Lock Keys"] + [f"- {item}" for item in extra]
-    write_report(report_path, "Milestone Verify Report", rows)
+    ] + [f"- {item}" for item in result.ok]
+    rows += ["", "## Drift"] + [f"- {item}" for item in result.drift]
+    rows += ["", "## Missing"] + [f"- {item}" for item in result.missing]
+    rows += ["", "## Extra Lock Keys"] + [f"- {item}" for item in result.extra]
+    write_report(path, "Milestone Verify Report", rows)
+
+
+VERIFY_CELLS = (("ok", "OK"), ("drift", "DRIFT"), ("missing", "MISSING"))
+
+
+class VerifyMatrix(NamedTuple):
+    """``verify --all``: one VerifyResult per milestone, in milestone order."""
 
+    keys: Tuple[str, ...]
+    mode: str
+    results: Tuple[VerifyResult, ...]
+    errors: Tuple[Tuple[str, str], ...]  # (milestone id, reason) per unreadable lock
+
+    @property
+    def passed(self) -> bool:
+        return not self.errors and all(result.passed for result in self.results)
+
+
+def verify_cells(result: VerifyResult) -> Dict[str, str]:
+    """Key -> OK | DRIFT | MISSING for one milestone."""
+    cells: Dict[str, str] = {}
+    for field, label in VERIFY_CELLS:
+        for item in getattr(result, field):
+            cells[item.split(":", 1)[0]] = label
+    return cells
+
+
+def verify_milestones(
+    *,
+    repo_root: Path,
+    workflow_path: str,
+    digests: DigestCache,
+    jobs: int = 1,
+    mode: str = "default",
+    milestone_ids: List[str] | None = None,
+) -> VerifyMatrix:
+    """Verify every milestone under workflow.milestone.dir (or ``milestone_ids``).
+
+    The workflow is parsed once and the files of all locks (locked copies and
+    artifacts) are hashed up front in one parallel batch, so a file shared by
+    several milestones (the current artifacts, deduplicated store objects) is
+    hashed once. Raises ValueError when milestones are disabled.
+    """
+    quick = mode == "quick"
+    workflow = load_yaml(repo_root / workflow_path)
+    (
+        enabled,
+        artifacts_dir,
+        milestone_dir,
+        lock_filename,
+        _pointer_path,
+        artifacts,
+        keys,
+    ) = resolve_config(workflow, repo_root)
+    if not enabled:
+        raise ValueError("milestone is disabled in workflow")
+
+    if milestone_ids is None:
+        milestone_ids = list_milestone_ids(milestone_dir, lock_filename)
+    errors: Dict[str, str] = {}
+    locks: List[Tuple[str, Path, Dict[str, Any]]] = []
+    for milestone_id in milestone_ids:
+        lock_path = resolve_lock_path(milestone_dir, milestone_id, lock_filename)
+        try:
+            locks.append((milestone_id, lock_path, load_lock(lock_path)))
+        except Exception as exc:
+            errors[milestone_id] = " ".join(str(exc).split())
+
+    # Every locked copy and artifact of every lock, in one parallel batch.
+    # The prefetch dedupes targets, so each file is hashed once; verify_lock()
+    # below only reads digests from the cache.
+    digests.prefetch(
+        (
+            target
+            for _, _, lock in locks
+            for target in lock_digest_targets(
+                repo_root=repo_root,
+                files=lock["files"],
+                keys=keys,
+                artifacts=artifacts,
+                artifacts_dir=artifacts_dir,
+                quick=quick,
+            )
+        ),
+        jobs,
+    )
+
+    def verify_one(item: Tuple[str, Path, Dict[str, Any]]) -> VerifyResult | str:
+        milestone_id, lock_path, lock = item
+        try:
+            return verify_lock(
+                repo_root=repo_root,
+                milestone_id=milestone_id,
+                lock_path=lock_path,
+                lock=lock,
+                artifacts=artifacts,
+                artifacts_dir=artifacts_dir,
+                keys=keys,
+                digests=digests,
+                mode=mode,
+            )
+        except Exception as exc:
+            return " ".join(str(exc).split())
+
+    results: Dict[str, VerifyResult] = {}
+    for item, outcome in zip(locks, run_parallel(verify_one, locks, jobs)):
+        if isinstance(outcome, str):
+            errors[item[0]] = outcome
+        else:
+            results[item[0]] = outcome
+
+    return VerifyMatrix(
+        tuple(keys),
+        mode,
+        tuple(results[mid] for mid in milestone_ids if mid in results),
+        tuple((mid, errors[mid]) for mid in milestone_ids if mid in errors),
+    )
+
+
+def write_verify_matrix_report(
+    path: Path, matrix: VerifyMatrix, repo_root: Path
+) -> None:
+    failed = [result for result in matrix.results if not result.passed]
+    rows = [
+        "## Summary",
+        f"- Milestones: {len(matrix.results) + len(matrix.errors)}",
+        f"- Passed: {len(matrix.results) - len(failed)}",
+        f"- Failed: {len(failed)}",
+        f"- Unreadable locks: {len(matrix.errors)}",
+        f"- Mode: {matrix.mode}",
+        "",
+        "## Matrix",
+        "| Milestone | " + " | ".join(matrix.keys) + " | Merkle root |",
+        "|" + " --- |" * (len(matrix.keys) + 2),
+    ]
+    for result in matrix.results:
+        cells = verify_cells(result)
+        rows.append(
+            f"| {result.milestone_id} | "
+            + " | ".join(cells.get(key, "-") for key in matrix.keys)
+            + f" | {result.root_status} |"
+        )
+    rows += ["", "## Drift"] + [
+        f"- {result.milestone_id} {item}" for result in failed for item in result.drift
+    ]
+    rows += ["", "## Missing"] + [
+        f"- {result.milestone_id} {item}"
+        for result in failed
+        for item in result.missing
+    ]
+    rows += ["", "## Unreadable Locks"] + [
+        f"- {milestone_id}: {reason}" for milestone_id, reason in matrix.errors
+    ]
+    write_report(path, "Milestone Verify Matrix", rows)
+
+
+def cmd_verify_all(args: argparse.Namespace) -> int:
+    repo_root = Path.cwd()
+    try:
+        matrix = verify_milestones(
+            repo_root=repo_root,
+            workflow_path=args.workflow,
+            digests=args.digests,
+            jobs=args.jobs,
+            mode=verify_mode(args),
+        )
+    except Exception as exc:
+        print(exc)
+        return 1
+
+    report_path = repo_root / args.report
+    write_verify_matrix_report(report_path, matrix, repo_root)
+    for result in matrix.results:
+        print(
+            f"milestone={result.milestone_id} ok={len(result.ok)} drift={len(result.drift)} missing={len(result.missing)} extra={len(result.extra)} root={result.root_status}"
+        )
+    for milestone_id, reason in matrix.errors:
+        print(f"milestone={milestone_id} error={reason}")
+    failed = sum(1 for result in matrix.results if not result.passed)
     print(
-        f"milestone={milestone_id} ok={len(ok)} drift={len(drift)} missing={len(missing)} extra={len(extra)}"
+        f"milestones={len(matrix.results) + len(matrix.errors)} passed={len(matrix.results) - failed} failed={failed} errors={len(matrix.errors)}"
     )
     print(f"report={report_path}")
-    return 1 if drift or missing else 0
+    return 0 if matrix.passed else 1
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    if args.all:
+        return cmd_verify_all(args)
+    repo_root = Path.cwd()
+    try:
+        result = verify_milestone(
+            repo_root=repo_root,
+            workflow_path=args.workflow,
+            milestone_id=args.milestone_id,
+            digests=args.digests,
+            jobs=args.jobs,
+            mode=verify_mode(args),
+        )
+    except Exception as exc:
+        print(exc)
+        return 1
+
+    report_path = repo_root / args.report
+    write_verify_report(report_path, result, repo_root)
+    print(
+        f"milestone={result.milestone_id} ok={len(result.ok)} drift={len(result.drift)} missing={len(result.missing)} extra={len(result.extra)} root={result.root_status}"
+    )
+    print(f"report={report_path}")
+    return 0 if result.passed else 1
+
+
+def migrate_lock(
+    *,
+    repo_root: Path,
+    lock_path: Path,
+    objects_dir: Path,
+    algo: str,
+    digests: DigestCache,
+) -> Tuple[bool, List[str]]:
+    """Rewrite one lock as schema_version 2 using ``algo``, keeping its
+    file format (YAML or JSON).
+
+    Returns (changed, problems); nothing is written when any entry fails its
+    current digest check.
+    """
+    lock = load_lock(lock_path)
+    changed = (
+        lock.get("schema_version", 1) != LOCK_SCHEMA_VERSION
+        or "merkle_root" not in lock
+    )
+    problems: List[str] = []
+    files: Dict[str, Dict[str, Any]] = {}
+
+    for key, entry in lock["files"].items():
+        if not isinstance(entry, dict):
+            problems.append(f"{key}:invalid lock entry")
+            continue
+        old_algo, old_digest = lock_entry_digest(entry)
+        locked_path = repo_root / str(entry.get("locked_path", ""))
+        if old_algo not in ALGORITHMS:
+            problems.append(f"{key}:unsupported hash algo {old_algo!r}")
+            continue
+        if not locked_path.is_file():
+            problems.append(f"{key}:locked file missing {locked_path}")
+            continue
+        if digests.digest(locked_path, algo=old_algo) != old_digest:
+            problems.append(f"{key}:locked file hash mismatch {locked_path}")
+            continue
+
+        migrated = {
+            k: v for k, v in entry.items() if k not in ("sha256", "algo", "digest")
+        }
+        digest = old_digest
+        if old_algo != algo:
+            changed = True
+            digest = digests.digest(locked_path, algo=algo)
+            # Objects are named by digest: re-address store entries, keeping the
+            # old name for locks that still use it.
+            if locked_path.parent.resolve() == objects_dir.resolve():
+                obj = objects_dir / digest
+                if not obj.exists():
+                    link_spec_file(locked_path, obj)
+                migrated["locked_path"] = relpath(obj, repo_root)
+        migrated["algo"] = algo
+        migrated["digest"] = digest
+        files[key] = migrated
+
+    if problems or not changed:
+        return False, problems
+
+    lock["schema_version"] = LOCK_SCHEMA_VERSION
+    lock["files"] = files
+    lock["merkle_root"] = merkle_root(lock_merkle_leaves(files))
+    lock["migrated_at"] = now_iso()
+    dump_lock(lock_path, lock, lock_format_of(lock_path.read_bytes()))
+    return True, []
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    repo_root = Path.cwd()
+    workflow = load_yaml(repo_root / args.workflow)
+    (
+        enabled,
+        _,
+        milestone_dir,
+        lock_filename,
+        pointer_path,
+        _,
+        _,
+    ) = resolve_config(workflow, repo_root)
+
+    if not enabled:
+        print("milestone is disabled in workflow")
+        return 1
+
+    algo = args.algo or resolve_hash_algo(workflow)
+    if args.all:
+        milestone_ids = list_milestone_ids(milestone_dir, lock_filename)
+    else:
+        resolved_id = args.milestone_id or read_active_milestone(pointer_path)
+        if not resolved_id:
+            print("milestone_id is required (or set an active milestone first)")
+            return 1
+        milestone_ids = [resolved_id]
+
+    migrated = unchanged = failed = 0
+    for milestone_id in milestone_ids:
+        lock_path = resolve_lock_path(milestone_dir, milestone_id, lock_filename)
+        try:
+            changed, problems = migrate_lock(
+                repo_root=repo_root,
+                lock_path=lock_path,
+                objects_dir=objects_dir_for(milestone_dir),
+                algo=algo,
+                digests=args.digests,
+            )
+        except (OSError, ValueError) as exc:
+            changed, problems = False, [str(exc)]
+        if problems:
+            failed += 1
+            print(f"[FAILED] {milestone_id}")
+            for item in problems:
+                print(f"  - {item}")
+        elif changed:
+            migrated += 1
+            print(f"[MIGRATED] {milestone_id} -> schema_version 2 ({algo})")
+        else:
+            unchanged += 1
+            print(f"[UP TO DATE] {milestone_id}")
+
+    print(f"algo={algo} migrated={migrated} unchanged={unchanged} failed={failed}")
+    return 1 if failed else 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    repo_root = Path.cwd()
+    workflow = load_yaml(repo_root / args.workflow)
+    (
+        enabled,
+        _,
+        milestone_dir,
+        lock_filename,
+        pointer_path,
+        _,
+        _,
+    ) = resolve_config(workflow, repo_root)
+
+    if not enabled:
+        print("milestone is disabled in workflow")
+        return 1
+
+    left_id = args.milestone_id or read_active_milestone(pointer_path)
+    if not left_id:
+        print("milestone_id is required (or set an active milestone first)")
+        return 1
+
+    locks: List[Dict[str, Any]] = []
+    for milestone_id in (left_id, args.against):
+        lock_path = resolve_lock_path(milestone_dir, milestone_id, lock_filename)
+        if not lock_path.exists():
+            print(f"lock not found: {lock_path}")
+            return 1
+        locks.append(load_lock(lock_path))
+
+    left_root, right_root = (lock_merkle_root(lock) for lock in locks)
+    if left_root == right_root:
+        print(f"[SAME] {left_id} == {args.against} root={left_root}")
+        return 0
+
+    # Roots differ: descend to the keys that account for it.
+    left_files, right_files = (
+        {key: (algo, digest) for key, algo, digest in lock_merkle_leaves(lock["files"])}
+        for lock in locks
+    )
+    print(f"[DIFFERENT] {left_id} != {args.against}")
+    for key in sorted(set(left_files) | set(right_files)):
+        if key not in right_files:
+            print(f"  - {key}: only in {left_id}")
+        elif key not in left_files:
+            print(f"  - {key}: only in {args.against}")
+        elif left_files[key] != right_files[key]:
+            left_algo, right_algo = left_files[key][0], right_files[key][0]
+            note = f" ({left_algo} vs {right_algo})" if left_algo != right_algo else ""
+            print(f"  - {key}: digest differs{note}")
+    return 1
 
 
 def cmd_set_active(args: argparse.Namespace) -> int:
@@ -655,15 +1729,105 @@ def cmd_set_active(args: argparse.Namespace) -> int:
         return 1
 
     write_active_milestone(pointer_path, args.milestone_id)
+    log_catalog_event(
+        repo_root, args.milestone_id, "set-active", enabled=not args.no_catalog
+    )
     print(f"active milestone set: {args.milestone_id}")
     print(f"pointer={pointer_path}")
     return 0
 
 
+def query_catalog(
+    args: argparse.Namespace, query: Callable[[Any], Any]
+) -> Tuple[str | None, Any]:
+    """Sync (or with --rebuild, rebuild) the milestone catalog from the lock
+    files, then run ``query`` on it; returns (active milestone, result)."""
+    from milestone_catalog import MilestoneCatalog
+
+    repo_root = Path.cwd()
+    workflow = load_yaml(repo_root / args.workflow)
+    (
+        enabled,
+        _,
+        milestone_dir,
+        lock_filename,
+        pointer_path,
+        _,
+        _,
+    ) = resolve_config(workflow, repo_root)
+    if not enabled:
+        raise ValueError("milestone is disabled in workflow")
+
+    locks = catalog_locks(milestone_dir, lock_filename)
+    with MilestoneCatalog.for_repo(repo_root, enabled=not args.no_catalog) as catalog:
+        if args.rebuild:
+            catalog.rebuild(locks, load_lock)
+        else:
+            catalog.sync(locks, load_lock)
+        if not args.no_catalog:
+            catalog.import_events(repo_root / CATALOG_EVENT_LOG)
+        return read_active_milestone(pointer_path), query(catalog)
+
+
+def cmd_list(args: argparse.Namespace) -> int:
+    try:
+        active, rows = query_catalog(
+            args, lambda catalog: catalog.milestones(key=args.key, digest=args.digest)
+        )
+    except Exception as exc:
+        print(exc)
+        return 1
+
+    for row in rows:
+        print(
+            f"milestone={row.milestone_id} created_at={row.created_at or '-'} source={row.source_type or '-'}:{row.source_path or '-'} keys={row.keys} merkle_root={row.merkle_root or '-'} last_active_at={row.last_active_at or '-'} active={'yes' if row.milestone_id == active else 'no'}"
+        )
+    print(f"milestones={len(rows)}")
+    return 0
+
+
+def cmd_history(args: argparse.Namespace) -> int:
+    try:
+        _, rows = query_catalog(args, lambda catalog: catalog.entries(key=args.key))
+    except Exception as exc:
+        print(exc)
+        return 1
+
+    previous: str | None = None
+    for row in rows:
+        if previous is None:
+            change = "new"
+        else:
+            change = "same" if row.digest == previous else "changed"
+        previous = row.digest
+        print(
+            f"milestone={row.milestone_id} created_at={row.created_at or '-'} artifact={row.artifact or '-'} {row.algo}={row.digest} size={row.size if row.size is not None else '-'} change={change}"
+        )
+    print(
+        f"key={args.key} milestones={len(rows)} distinct_digests={len({row.digest for row in rows})}"
+    )
+    return 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Manage BMAD milestone lock lifecycle")
+    p.add_argument("--workflow", default=DEFAULT_WORKFLOW, help="workflow YAML path")
     p.add_argument(
-        "--workflow", default=".bmad/workflows/workflow.yml", help="workflow YAML path"
+        "--no-digest-cache",
+        action="store_true",
+        help="do not read or update the on-disk digest and parse caches (.bmad/cache/)",
+    )
+    p.add_argument(
+        "--no-catalog",
+        action="store_true",
+        help="do not read or update the milestone catalog "
+        "(.bmad/cache/milestones.sqlite); list/history index the locks in memory",
+    )
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="parallel hashing threads (default: CPU count)",
     )
     sub = p.add_subparsers(dest="command", required=True)
 
@@ -687,9 +1851,14 @@ def build_parser() -> argparse.ArgumentParser:
         default=True,
         help="set ACTIVE pointer after create (default: true)",
     )
+    p_create.add_argument(
+        "--algo",
+        choices=sorted(ALGORITHMS),
+        help="digest algorithm (default: workflow.milestone.hash_algo or sha256)",
+    )
     p_create.add_argument(
         "--report",
-        default=".bmad/artifacts/milestone-lock-report.md",
+        default=DEFAULT_CREATE_REPORT,
         help="create report path",
     )
     p_create.set_defaults(func=cmd_create)
@@ -713,9 +1882,14 @@ def build_parser() -> argparse.ArgumentParser:
         default=True,
         help="set ACTIVE pointer after import (default: true)",
     )
+    p_import.add_argument(
+        "--algo",
+        choices=sorted(ALGORITHMS),
+        help="digest algorithm (default: workflow.milestone.hash_algo or sha256)",
+    )
     p_import.add_argument(
         "--report",
-        default=".bmad/artifacts/milestone-lock-report.md",
+        default=DEFAULT_CREATE_REPORT,
         help="import report path",
     )
     p_import.set_defaults(func=cmd_import_archive)
@@ -727,33 +1901,105 @@ def build_parser() -> argparse.ArgumentParser:
     )
     p_use.add_argument(
         "--report",
-        default=".bmad/artifacts/milestone-seed-report.md",
+        default=DEFAULT_USE_REPORT,
         help="seed report path",
     )
     p_use.set_defaults(func=cmd_use)
 
     p_verify = sub.add_parser("verify", help="verify artifacts match lock")
-    p_verify.add_argument(
+    verify_target = p_verify.add_mutually_exclusive_group()
+    verify_target.add_argument(
         "--milestone-id", help="milestone id (default: ACTIVE pointer)"
     )
+    verify_target.add_argument(
+        "--all",
+        action="store_true",
+        help="verify every milestone under workflow.milestone.dir; the report is a milestone x key matrix",
+    )
     p_verify.add_argument(
         "--report",
-        default=".bmad/artifacts/milestone-verify-report.md",
+        default=DEFAULT_VERIFY_REPORT,
         help="verify report path",
     )
+    verify_depth = p_verify.add_mutually_exclusive_group()
+    verify_depth.add_argument(
+        "--quick",
+        action="store_true",
+        help="trust files whose size and mtime_ns match the lock; hash only the rest",
+    )
+    verify_depth.add_argument(
+        "--paranoid",
+        action="store_true",
+        help="rehash every file, ignoring the digest cache",
+    )
     p_verify.set_defaults(func=cmd_verify)
 
     p_set = sub.add_parser("set-active", help="set ACTIVE pointer")
     p_set.add_argument("--milestone-id", required=True, help="milestone id")
     p_set.set_defaults(func=cmd_set_active)
 
+    p_migrate = sub.add_parser(
+        "migrate", help="rewrite schema_version 1 locks to schema_version 2"
+    )
+    target = p_migrate.add_mutually_exclusive_group()
+    target.add_argument("--milestone-id", help="milestone id (default: ACTIVE pointer)")
+    target.add_argument(
+        "--all", action="store_true", help="migrate every lock under milestone dir"
+    )
+    p_migrate.add_argument(
+        "--algo",
+        choices=sorted(ALGORITHMS),
+        help="target digest algorithm (default: workflow.milestone.hash_algo or sha256)",
+    )
+    p_migrate.set_defaults(func=cmd_migrate)
+
+    p_compare = sub.add_parser("compare", help="compare two milestones by Merkle root")
+    p_compare.add_argument("--milestone-id", help="milestone id (default: ACTIVE pointer)")
+    p_compare.add_argument("--against", required=True, help="milestone id to compare with")
+    p_compare.set_defaults(func=cmd_compare)
+
+    p_list = sub.add_parser(
+        "list", help="list milestones from the catalog (.bmad/cache/milestones.sqlite)"
+    )
+    p_list.add_argument("--key", help="only milestones that lock this key")
+    p_list.add_argument(
+        "--digest",
+        help="only milestones locking a file with this digest (hex prefix); combine with --key",
+    )
+    p_list.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="rebuild the catalog from the lock files first (drops recorded events)",
+    )
+    p_list.set_defaults(func=cmd_list)
+
+    p_history = sub.add_parser(
+        "history", help="digest of one key across milestones, oldest first"
+    )
+    p_history.add_argument("--key", required=True, help="artifact key, e.g. prd")
+    p_history.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="rebuild the catalog from the lock files first (drops recorded events)",
+    )
+    p_history.set_defaults(func=cmd_history)
+
     return p
 
 
-def main() -> int:
+def main(argv: Optional[List[str]] = None) -> int:
     parser = build_parser()
-    args = parser.parse_args()
-    return args.func(args)
+    args = parser.parse_args(argv)
+    args.digests = DigestCache.for_repo(
+        Path.cwd(),
+        enabled=not args.no_digest_cache and verify_mode(args) != "paranoid",
+    )
+    use_parsed_cache(ParsedCache.for_repo(Path.cwd(), enabled=not args.no_digest_cache))
+    try:
+        return args.func(args)
+    finally:
+        args.digests.save()
+        parsed_cache().save()
 
 
 if __name__ == "__main__":
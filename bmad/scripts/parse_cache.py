@@ -0,0 +1,363 @@
+"""Parsed-document cache shared by audit_workflow.py and milestone_lock.py.
+
+YAML is parsed with libyaml's ``CSafeLoader`` when PyYAML was built with it,
+and with the pure-Python ``SafeLoader`` otherwise; PyYAML is imported only when
+something actually has to be parsed. Parsed documents, and results derived from
+them such as validated workflow metadata, are remembered in
+.bmad/cache/parsed.marshal keyed by (kind, sha256 of the source bytes). A file
+is parsed again only when its content changes, whatever happens to its mtime.
+
+Entries are stored as ``marshal`` blobs: builtin containers and scalars only,
+decoded into fresh objects on every hit, so callers may mutate what they get.
+marshal's format belongs to the interpreter, so a cache written by another
+Python version is ignored. Values marshal cannot represent (e.g. YAML
+timestamps) are returned but not cached. Like the digest cache, the file is
+bounded (LRU eviction) and replaced atomically; a lost update only costs a
+future re-parse.
+
+Unmarshalling is only safe on data this user wrote, and the file lives in the
+repository, so it is authenticated: the payload is prefixed with an HMAC-SHA256
+under a per-user key kept outside the repository
+($XDG_CACHE_HOME/bmad/parsed-cache.key, mode 0600, created on first use). A
+file whose tag does not verify is discarded without being unmarshalled; when
+the key cannot be read or created safely the cache stays in memory only.
+
+Milestone locks are written as YAML or JSON (``workflow.milestone.lock_format``)
+and ``load_document`` reads either: a document starting with ``{`` goes to the
+stdlib C JSON parser, which beats hashing it for a cache lookup, and anything
+else (or a YAML flow mapping that is not JSON) to the cached YAML path.
+``dump_lock`` writes JSON canonically (sorted keys, fixed indent, UTF-8), so
+equal locks are byte-identical and their files can be hashed directly.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import marshal
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from file_digest import LRU_TOUCH_INTERVAL_NS, resident
+
+T = TypeVar("T")
+
+DEFAULT_PARSED_CACHE_PATH = ".bmad/cache/parsed.marshal"
+DEFAULT_MAX_ENTRIES = 256
+PARSED_CACHE_FORMAT = 2
+TAG_SIZE = 32  # HMAC-SHA256
+CACHE_KEY_NAME = "parsed-cache.key"
+
+LOCK_FORMATS = ("yaml", "json")
+DEFAULT_LOCK_FORMAT = "yaml"
+DEFAULT_LOCK_FILENAMES = {"yaml": "milestone-lock.yml", "json": "milestone-lock.json"}
+LOCK_FILENAME_SUFFIXES = {"yaml": (".yml", ".yaml"), "json": (".json",)}
+
+
+def yaml_loader() -> Any:
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_yaml(data: bytes) -> Any:
+    # PyYAML is imported on the first cache miss only; warm runs never load it.
+    import yaml
+
+    return yaml.load(data, Loader=yaml_loader())
+
+
+def _interpreter() -> str:
+    major, minor = sys.version_info[:2]
+    return f"{sys.implementation.name}-{major}.{minor}-{marshal.version}"
+
+
+def _key_path() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return Path(base) / "bmad" / CACHE_KEY_NAME
+
+
+def cache_key() -> Optional[bytes]:
+    """This user's key for authenticating cache files, or None when it cannot
+    be read or created with owner-only permissions."""
+    path = _key_path()
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except FileNotFoundError:
+        import secrets
+
+        try:
+            path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            return cache_key()  # another process created it first
+        except OSError:
+            return None
+        key = secrets.token_bytes(32)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+    except OSError:
+        return None
+    with os.fdopen(fd, "rb") as f:
+        st = os.fstat(f.fileno())
+        if st.st_mode & 0o077 or (
+            hasattr(os, "getuid") and st.st_uid != os.getuid()
+        ):
+            return None
+        key = f.read()
+    # A short key is a concurrent writer caught mid-write: do not trust it.
+    return key if len(key) == 32 else None
+
+
+def _tag(key: bytes, payload: bytes) -> bytes:
+    import hashlib
+    import hmac
+
+    return hmac.new(key, payload, hashlib.sha256).digest()
+
+
+class ParsedCache:
+    """Persistent (kind, content hash) -> parsed value cache.
+
+    A cache constructed with ``path=None`` keeps entries in memory only.
+    """
+
+    def __init__(
+        self, path: Optional[Path], max_entries: int = DEFAULT_MAX_ENTRIES
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # key -> [used_ns, marshal blob]
+        self._entries: Optional[Dict[str, List[Any]]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        # Read on first access to the file; None disables the file.
+        self._key: Optional[bytes] = None
+
+    @classmethod
+    def for_repo(cls, repo_root: Path, enabled: bool = True) -> "ParsedCache":
+        if not enabled:
+            return cls(None)
+        path = repo_root / DEFAULT_PARSED_CACHE_PATH
+        return resident(("parsed", str(path)), lambda: cls(path))
+
+    def load(self, path: Path, kind: str, build: Callable[[bytes], T]) -> T:
+        """``build(content of path)``, reused while the content is unchanged.
+
+        ``kind`` names what ``build`` computes; include a version or salt in it
+        when the result depends on code that may change.
+        """
+        return self.load_bytes(path.read_bytes(), kind, build)
+
+    def load_bytes(self, data: bytes, kind: str, build: Callable[[bytes], T]) -> T:
+        import hashlib
+
+        key = f"{kind}:{hashlib.sha256(data).hexdigest()}"
+        entries = self._load()
+        entry = entries.get(key)
+        if entry is not None:
+            try:
+                value = marshal.loads(entry[1])
+            except (EOFError, ValueError, TypeError):
+                pass  # an undecodable blob: rebuilt and replaced below
+            else:
+                now_ns = time.time_ns()
+                with self._lock:
+                    self.hits += 1
+                    if now_ns - entry[0] > LRU_TOUCH_INTERVAL_NS:
+                        entry[0] = now_ns
+                        self._dirty = True
+                return value
+
+        value = build(data)
+        with self._lock:
+            self.misses += 1
+        try:
+            blob = marshal.dumps(value)
+        except ValueError:
+            with self._lock:
+                entries.pop(key, None)
+            return value
+        with self._lock:
+            entries[key] = [time.time_ns(), blob]
+            self._dirty = True
+        return value
+
+    def _load(self) -> Dict[str, List[Any]]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    if self.path is not None:
+                        self._key = cache_key()
+                    self._entries = (
+                        {}
+                        if self.path is None or self._key is None
+                        else self._read_entries(self.path, self._key)
+                    )
+        return self._entries
+
+    @staticmethod
+    def _read_entries(path: Path, key: bytes) -> Dict[str, List[Any]]:
+        import hmac
+
+        try:
+            raw = path.read_bytes()
+        except OSError:
+            return {}
+        tag, payload = raw[:TAG_SIZE], raw[TAG_SIZE:]
+        # Written by someone without this user's key: never unmarshal it.
+        if not hmac.compare_digest(tag, _tag(key, payload)):
+            return {}
+        try:
+            data = marshal.loads(payload)
+        except (EOFError, ValueError, TypeError):
+            return {}
+        if (
+            not isinstance(data, dict)
+            or data.get("format") != PARSED_CACHE_FORMAT
+            or data.get("interpreter") != _interpreter()
+            or not isinstance(data.get("entries"), dict)
+        ):
+            return {}
+        return {
+            key: entry
+            for key, entry in data["entries"].items()
+            if isinstance(entry, list)
+            and len(entry) == 2
+            and isinstance(entry[0], int)
+            and isinstance(entry[1], bytes)
+        }
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        entries = self._load()
+        if self._key is None:
+            return
+        if len(entries) > self.max_entries:
+            newest = sorted(entries.items(), key=lambda item: item[1][0], reverse=True)
+            entries = dict(newest[: self.max_entries])
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            payload = marshal.dumps(
+                {
+                    "format": PARSED_CACHE_FORMAT,
+                    "interpreter": _interpreter(),
+                    "entries": entries,
+                }
+            )
+            with tmp.open("wb") as f:
+                f.write(_tag(self._key, payload))
+                f.write(payload)
+            os.replace(tmp, self.path)
+        except OSError:
+            # The cache is an optimization only; never fail the command over it.
+            return
+        self._entries = entries
+        self._dirty = False
+
+
+# Cache used by load_yaml() in both scripts: in memory until main() installs
+# the repository's persistent one.
+_ACTIVE = ParsedCache(None)
+# Set by using_parsed_cache() for the current thread / context only, so calls
+# on different repositories can run concurrently; file_digest.iter_parallel
+# workers inherit it.
+_SCOPED: "contextvars.ContextVar[Optional[ParsedCache]]" = contextvars.ContextVar(
+    "parsed_cache", default=None
+)
+
+
+def parsed_cache() -> ParsedCache:
+    scoped = _SCOPED.get()
+    return _ACTIVE if scoped is None else scoped
+
+
+def use_parsed_cache(cache: ParsedCache) -> None:
+    global _ACTIVE
+    _ACTIVE = cache
+
+
+@contextlib.contextmanager
+def using_parsed_cache(cache: ParsedCache) -> Iterator[ParsedCache]:
+    """Use ``cache`` in this context for the ``with`` block, then restore the
+    previous one; other threads are not affected."""
+    token = _SCOPED.set(cache)
+    try:
+        yield cache
+    finally:
+        _SCOPED.reset(token)
+
+
+def lock_filename_candidates(lock_filename: str) -> List[str]:
+    """lock_filename, then the default names of both lock formats, so locks
+    written before workflow.milestone.lock_format changed are still found."""
+    return [lock_filename] + [
+        name for name in DEFAULT_LOCK_FILENAMES.values() if name != lock_filename
+    ]
+
+
+def lock_filename_mismatch(lock_filename: str, lock_format: str) -> Optional[str]:
+    """Why ``lock_filename`` cannot hold a ``lock_format`` lock, else None."""
+    for other, suffixes in LOCK_FILENAME_SUFFIXES.items():
+        if other != lock_format and lock_filename.lower().endswith(suffixes):
+            return (
+                f"workflow.milestone.lock_filename {lock_filename!r} names a "
+                f"{other} file but lock_format is {lock_format} (use "
+                f"{DEFAULT_LOCK_FILENAMES[lock_format]!r} or drop lock_filename)"
+            )
+    return None
+
+
+def lock_format_of(data: bytes) -> str:
+    """"json" for a JSON document, else "yaml" (JSON text is valid YAML too)."""
+    if data.lstrip()[:1] == b"{":
+        import json
+
+        try:
+            json.loads(data)
+        except ValueError:
+            return "yaml"
+        return "json"
+    return "yaml"
+
+
+def load_document(path: Path) -> Any:
+    """Parse a YAML or JSON document, e.g. a milestone lock in either format."""
+    data = path.read_bytes()
+    if data.lstrip()[:1] == b"{":
+        import json
+
+        try:
+            return json.loads(data)
+        except ValueError:
+            pass  # a YAML flow mapping
+    return parsed_cache().load_bytes(data, "yaml", parse_yaml)
+
+
+def dump_lock(path: Path, data: Dict[str, Any], lock_format: str) -> None:
+    """Write a lock document; JSON output is canonical for equal data."""
+    if lock_format not in LOCK_FORMATS:
+        raise ValueError(f"unsupported lock format: {lock_format!r}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if lock_format == "json":
+        import json
+
+        text = json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+        path.write_bytes(text.encode("utf-8"))
+        return
+
+    import yaml
+
+    with path.open("w", encoding="utf-8") as f:
+        yaml.safe_dump(data, f, allow_unicode=False, sort_keys=False)
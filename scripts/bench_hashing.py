@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Micro-benchmark for the file hashing paths in bmad/scripts/file_digest.py.
+
+Compares the legacy buffered read (a fresh bytes object per 1 MiB chunk) with
+the readinto and mmap paths, over a temporary file of each requested size, and
+reports hash_file throughput for every supported digest algorithm.
+
+Usage:
+  python3 scripts/bench_hashing.py
+  python3 scripts/bench_hashing.py --sizes-mb 16 256 --repeat 5
+  python3 scripts/bench_hashing.py --algos blake2b sha256
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "bmad" / "scripts"))
+
+import file_digest  # noqa: E402
+
+
+def legacy_read(path: Path, chunk_size: int) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def readinto_path(path: Path, chunk_size: int) -> str:
+    h = hashlib.sha256()
+    with path.open("rb", buffering=0) as f:
+        file_digest._hash_readinto(h, f, chunk_size)
+    return h.hexdigest()
+
+
+def mmap_path(path: Path, chunk_size: int) -> str:
+    h = hashlib.sha256()
+    with path.open("rb", buffering=0) as f:
+        size = os.fstat(f.fileno()).st_size
+        file_digest._hash_mmap(h, f, size, chunk_size)
+    return h.hexdigest()
+
+
+def best_of(fn: Callable[..., Any], repeat: int, *args: Any) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def write_sample(directory: Path, size: int) -> Path:
+    path = directory / f"sample-{size}.bin"
+    block = os.urandom(1024 * 1024)
+    with path.open("wb") as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[: min(len(block), remaining)])
+            remaining -= len(block)
+    return path
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark BMAD file hashing paths")
+    p.add_argument("--sizes-mb", type=int, nargs="+", default=[4, 64, 256])
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument(
+        "--algos",
+        nargs="+",
+        choices=sorted(file_digest.ALGORITHMS),
+        default=sorted(file_digest.ALGORITHMS),
+        help="digest algorithms to measure (default: all)",
+    )
+    p.add_argument(
+        "--chunk-mb",
+        type=int,
+        default=0,
+        help="chunk size in MiB (default: adaptive, from HashTuning)",
+    )
+    args = p.parse_args()
+
+    tuning = file_digest.TUNING
+    paths: List[Callable[[Path, int], str]] = [legacy_read, readinto_path, mmap_path]
+    print(f"{'size':>8} {'path':<14} {'best (s)':>10} {'MiB/s':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.sizes_mb:
+            size = size_mb * file_digest.MIB
+            sample = write_sample(Path(tmp), size)
+            chunk = args.chunk_mb * file_digest.MIB or tuning.chunk_for(size)
+            expected = legacy_read(sample, chunk)
+            for fn in paths:
+                if fn(sample, chunk) != expected:
+                    print(f"digest mismatch in {fn.__name__}", file=sys.stderr)
+                    return 1
+                seconds = best_of(fn, args.repeat, sample, chunk)
+                rate = size_mb / seconds if seconds else float("inf")
+                print(f"{size_mb:>6}MB {fn.__name__:<14} {seconds:>10.4f} {rate:>10.1f}")
+            for algo in args.algos:
+                seconds = best_of(file_digest.hash_file, args.repeat, sample, algo)
+                rate = size_mb / seconds if seconds else float("inf")
+                label = f"algo:{algo}"
+                print(f"{size_mb:>6}MB {label:<14} {seconds:>10.4f} {rate:>10.1f}")
+            sample.unlink()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Startup-time benchmark for the bmad/scripts CLIs, with a regression budget.
+
+Builds a throwaway repository (workflows, placeholder artifacts, one milestone
+lock), then runs every milestone_lock.py subcommand and the audit under
+``python -X importtime``. For each it reports the median total import time and
+the heavy modules that were loaded, and fails when a command exceeds its
+import-time budget or loads a module it must not need (e.g. PyYAML for
+set-active once the parse cache is warm).
+
+Usage:
+  python3 scripts/bench_startup.py
+  python3 scripts/bench_startup.py --repeat 9 --budget-scale 1.5
+  python3 scripts/bench_startup.py --only set-active verify
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, NamedTuple, Set, Tuple
+
+BUNDLE = Path(__file__).resolve().parent.parent / "bmad"
+
+# Reported when loaded; only the ones in a command's ``forbidden`` set fail it.
+HEAVY_MODULES = [
+    "yaml",
+    "hashlib",
+    "json",
+    "shutil",
+    "datetime",
+    "concurrent.futures",
+    "dataclasses",
+    "ctypes",
+    "glob",
+    "mmap",
+    "sqlite3",
+]
+
+
+class Command(NamedTuple):
+    name: str
+    argv: List[str]
+    # Median total import time on a warm parse cache, with headroom for noisy
+    # machines; before the lazy imports every command took 100ms or more.
+    budget_ms: float
+    forbidden: Set[str]
+
+
+LOCK = [".bmad/scripts/milestone_lock.py"]
+AUDIT = [".bmad/scripts/audit_workflow.py"]
+
+# argparse itself imports shutil (terminal width), so it is not listed here.
+NEVER_AT_STARTUP = {"yaml", "concurrent.futures", "dataclasses"}
+
+COMMANDS = [
+    Command(
+        "set-active",
+        LOCK + ["set-active", "--milestone-id", "BENCH"],
+        70,
+        NEVER_AT_STARTUP | {"json", "datetime", "sqlite3"},
+    ),
+    Command("status", LOCK + ["status"], 70, NEVER_AT_STARTUP | {"sqlite3"}),
+    Command(
+        "verify",
+        LOCK + ["verify", "--milestone-id", "BENCH"],
+        75,
+        {"yaml", "sqlite3"},
+    ),
+    Command(
+        "compare",
+        LOCK + ["compare", "--milestone-id", "BENCH", "--against", "BENCH"],
+        70,
+        NEVER_AT_STARTUP | {"sqlite3"},
+    ),
+    Command(
+        "use",
+        LOCK + ["use", "--milestone-id", "BENCH", "--force"],
+        75,
+        {"yaml", "concurrent.futures"},
+    ),
+    Command(
+        "create",
+        LOCK + ["create", "--milestone-id", "BENCH2", "--force", "--no-set-active"],
+        100,
+        set(),
+    ),
+    Command("audit", AUDIT, 80, {"yaml", "ctypes", "dataclasses"}),
+]
+
+
+def build_repo(root: Path) -> None:
+    shutil.copytree(BUNDLE / "workflows", root / ".bmad" / "workflows")
+    shutil.copytree(BUNDLE / "scripts", root / ".bmad" / "scripts")
+    shutil.copytree(BUNDLE / "templates", root / ".bmad" / "templates")
+    artifacts = root / ".bmad" / "artifacts"
+    artifacts.mkdir(parents=True)
+    for name in [
+        "discovery-prd.md",
+        "discovery-scope-definition.md",
+        "architecture_design-adr.md",
+        "architecture_design-impact-analysis.md",
+        "ui-ux-design-spec.md",
+        "api-design.md",
+    ]:
+        (artifacts / name).write_text(f"# {name}\n" * 200, encoding="utf-8")
+    run(root, LOCK + ["create", "--milestone-id", "BENCH"])
+    # Warm the parse and digest caches the way a previous command would.
+    run(root, LOCK + ["verify", "--milestone-id", "BENCH"])
+    run(root, AUDIT)
+
+
+def run(root: Path, argv: List[str], importtime: bool = False) -> str:
+    """Run a bundle script in ``root``; returns its stderr (the importtime log).
+
+    A failing command would time its error path, so it aborts the benchmark.
+    """
+    cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + argv
+    # Measure the CLIs themselves, never a bmad_daemon.py the caller may run.
+    env = dict(os.environ, BMAD_NO_DAEMON="1")
+    proc = subprocess.run(cmd, cwd=root, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        log = "\n".join(
+            line
+            for line in (proc.stdout + proc.stderr).splitlines()
+            if not line.startswith("import time:")
+        )
+        raise SystemExit(f"{' '.join(argv)} exited {proc.returncode}:\n{log}")
+    return proc.stderr
+
+
+def parse_importtime(stderr: str) -> Tuple[float, Set[str]]:
+    """(total import time in ms, names of all imported modules)."""
+    total_us = 0
+    modules: Set[str] = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        modules.add(name.strip())
+        if not name.startswith("  "):  # top level: a single space after the bar
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def measure(root: Path, command: Command, repeat: int) -> Tuple[float, Set[str]]:
+    samples: List[float] = []
+    modules: Set[str] = set()
+    for _ in range(repeat):
+        total_ms, loaded = parse_importtime(run(root, command.argv, importtime=True))
+        samples.append(total_ms)
+        modules |= loaded
+    return statistics.median(samples), modules
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark BMAD CLI startup time")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument(
+        "--budget-scale",
+        type=float,
+        default=1.0,
+        help="multiply every budget (slow or loaded machines)",
+    )
+    p.add_argument("--only", nargs="+", choices=[c.name for c in COMMANDS])
+    args = p.parse_args()
+
+    failures: List[str] = []
+    with tempfile.TemporaryDirectory(prefix="bmad-bench-startup-") as tmp:
+        root = Path(tmp)
+        build_repo(root)
+        print(f"{'command':<12} {'imports':>9} {'budget':>8}  heavy modules loaded")
+        for command in COMMANDS:
+            if args.only and command.name not in args.only:
+                continue
+            median_ms, modules = measure(root, command, args.repeat)
+            budget = command.budget_ms * args.budget_scale
+            heavy = [m for m in HEAVY_MODULES if m in modules]
+            print(
+                f"{command.name:<12} {median_ms:>7.1f}ms {budget:>6.0f}ms  "
+                f"{', '.join(heavy) or '-'}"
+            )
+            if median_ms > budget:
+                failures.append(
+                    f"{command.name}: {median_ms:.1f}ms over {budget:.0f}ms budget"
+                )
+            unexpected = sorted(command.forbidden & modules)
+            if unexpected:
+                failures.append(
+                    f"{command.name}: imports {', '.join(unexpected)} at startup"
+                )
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -35,6 +35,14 @@ if [[ -d "$TARGET/bmad/workflows" ]]; then
 
   need bmad/scripts/milestone_lock.py
   need bmad/scripts/audit_workflow.py
+  need bmad/scripts/file_digest.py
+  need bmad/scripts/audit_snapshot.py
+  need bmad/scripts/fs_watch.py
+  need bmad/scripts/parse_cache.py
+  need bmad/scripts/bmad_daemon.py
+  need bmad/scripts/audit_session.py
+  need bmad/scripts/audit_async.py
+  need bmad/scripts/milestone_catalog.py
   need bmad/milestones/README.md
 
   need docs/development/ai-dev-launch-guide.md
@@ -70,6 +78,14 @@ else
 
   need .bmad/scripts/milestone_lock.py
   need .bmad/scripts/audit_workflow.py
+  need .bmad/scripts/file_digest.py
+  need .bmad/scripts/audit_snapshot.py
+  need .bmad/scripts/fs_watch.py
+  need .bmad/scripts/parse_cache.py
+  need .bmad/scripts/bmad_daemon.py
+  need .bmad/scripts/audit_session.py
+  need .bmad/scripts/audit_async.py
+  need .bmad/scripts/milestone_catalog.py
   need .bmad/milestones/README.md
 
   need docs/development/ai-dev-launch-guide.md